@@ -0,0 +1,107 @@
+"""Compare the feed interval statistic computed in SQL with the ORM implementation.
+
+The ORM variant is the previous implementation: load every `FeedBottleEvent` in the
+range and compute the time since the previous feed in a Python loop. The SQL variant
+is `StatsService.get_feed_statistic`, which selects only the needed columns and uses
+``LAG(time_start)``. Both are run against the same data, and their results are
+checked against each other.
+
+Usage:
+    cd src/backend
+    python benchmarks/bench_feed_stats.py --sizes 10000 100000
+"""
+
+import argparse
+import datetime
+import statistics
+
+import bench_utils
+
+
+def _orm_feed_statistic(session) -> list:
+    from events.feed.models import FeedBottleEvent
+    from stats import schemas
+
+    events = session.query(FeedBottleEvent).order_by(FeedBottleEvent.time_start).all()
+
+    stats = []
+    for i, event in enumerate(events):
+        time_since_last = (
+            (event.time_start - events[i - 1].time_start).total_seconds() / 60
+            if i > 0
+            else 0
+        )
+        stats.append(
+            schemas.BottleFeedStatistic(
+                time=event.time_start.replace(tzinfo=datetime.UTC),
+                amount_ml=event.amount_ml,
+                time_since_last_feed_minutes=time_since_last,
+            )
+        )
+
+    return stats
+
+
+def _measure(fn, repeats: int) -> tuple[float, list]:
+    timings = []
+    for _ in range(repeats):
+        with bench_utils.timed() as elapsed:
+            result = fn()
+        timings.append(elapsed[0])
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="Numbers of bottle feed events to measure at.",
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    bench_utils.use_scratch_database()
+    bench_utils.create_schema()
+
+    from persistence.database import SessionLocal
+    from stats.service import StatsService
+
+    seeded = 0
+    for size in sorted(args.sizes):
+        # `seed_events` cycles through four event types.
+        bench_utils.seed_events((size - seeded) * 4, seed=size)
+        seeded = size
+
+        with SessionLocal() as session:
+
+            def run_orm():
+                session.expunge_all()
+                return _orm_feed_statistic(session)
+
+            def run_sql():
+                return StatsService(db=session).get_feed_statistic(
+                    start_date=None, end_date=None
+                )
+
+            orm_seconds, orm_result = _measure(run_orm, args.repeats)
+            sql_seconds, sql_result = _measure(run_sql, args.repeats)
+
+        assert len(orm_result) == len(sql_result)
+        max_difference = max(
+            abs(a.time_since_last_feed_minutes - b.time_since_last_feed_minutes)
+            for a, b in zip(orm_result, sql_result)
+        )
+
+        print(
+            f"{size:>8} feeds  orm {orm_seconds * 1000:8.1f} ms  "
+            f"sql {sql_seconds * 1000:8.1f} ms  "
+            f"speedup {orm_seconds / sql_seconds:4.1f}x  "
+            f"max interval difference {max_difference:.2g} min"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measure bulk import throughput and memory by batch size.
+
+Writes a synthetic NDJSON file with events of every type, then imports it with
+`EventService.import_events` at several batch sizes. A batch size of 1 commits every
+event on its own, like importing through one create request per event. Each batch
+size reports events per second, and the peak memory traced by `tracemalloc` during
+a second, untimed import of the same file; compare the peaks of two `--events`
+values to check that memory does not grow with the file.
+
+Usage:
+    cd src/backend
+    python benchmarks/bench_import.py --events 50000 --batch-sizes 1 100 1000 5000
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import random
+import tempfile
+import tracemalloc
+from typing import Any
+
+import bench_utils
+
+
+def _write_file(path: str, count: int, seed: int = 0) -> None:
+    """Write `count` events, one JSON object per line, a few minutes apart."""
+    rng = random.Random(seed)
+    start = datetime.datetime(2022, 1, 1, tzinfo=datetime.UTC)
+
+    with open(path, "w", encoding="utf-8") as file:
+        for i in range(count):
+            time_start = start + datetime.timedelta(minutes=7 * i)
+            row: dict[str, Any] = {
+                "time_start": time_start.isoformat(),
+                "time_end": (time_start + datetime.timedelta(minutes=15)).isoformat(),
+            }
+            kind = i % 4
+            if kind == 0:
+                row |= {
+                    "name": "feed_bottle",
+                    "amount_ml": rng.randint(30, 240),
+                    "is_formula": rng.random() < 0.5,
+                }
+            elif kind == 1:
+                row |= {"name": "feed_breast", "side": rng.choice(["left", "right"])}
+            elif kind == 2:
+                row |= {"name": "diaper_change", "diaper_type": "pee"}
+            else:
+                row |= {"name": "pump", "amount_ml": round(rng.uniform(10, 200), 1)}
+            file.write(json.dumps(row) + "\n")
+
+
+def _import(path: str, batch_size: int):
+    """Import the file at `path` into the scratch database."""
+    from events.schemas import ExportFormat
+    from events.service import EventService
+    from persistence.database import SessionLocal
+
+    with open(path, encoding="utf-8") as lines, SessionLocal() as db:
+        return EventService(db=db).import_events(
+            lines=lines,
+            import_format=ExportFormat.NDJSON,
+            batch_size=batch_size,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 100, 1000, 5000]
+    )
+    parser.add_argument(
+        "--unbatched-events",
+        type=int,
+        default=2_000,
+        help="Events imported with batch size 1, which is slow.",
+    )
+    args = parser.parse_args()
+
+    bench_utils.use_scratch_database()
+    bench_utils.create_schema()
+
+    directory = tempfile.mkdtemp(prefix="open-baby-import-")
+
+    for batch_size in args.batch_sizes:
+        count = args.unbatched_events if batch_size == 1 else args.events
+        path = f"{directory}/events-{count}.ndjson"
+        _write_file(path, count)
+
+        run = functools.partial(_import, path, batch_size)
+
+        with bench_utils.timed() as elapsed:
+            report = run()
+
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(
+            f"batch {batch_size:>5}: {report.imported:>7} events  "
+            f"{report.imported / elapsed[0]:9.0f} events/s  "
+            f"peak {peak / 1024:8.1f} KiB  rejected {report.rejected}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare `GET /events` latency and memory with and without the fast JSON path.
+
+`config.fast_json_responses` is checked on every request, so both modes run in the
+same process against the same seeded events, alternating in rounds to even out
+noise. Requests are issued in-process through `httpx.ASGITransport`. Besides the
+median latency, each mode reports the peak memory traced by `tracemalloc` during one
+request, a proxy for how much the response path allocates, and whether both modes
+returned the same body.
+
+Usage:
+    cd src/backend
+    python benchmarks/bench_json_responses.py --limit 500 --rounds 10
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tracemalloc
+
+import bench_utils
+
+MODES = {"default": False, "fast": True}
+
+
+async def _run(limit: int, rounds: int, requests: int) -> None:
+    import httpx
+
+    from config import config
+    from main import app
+
+    params: dict[str, str | int] = {"limit": limit, "include_total": "false"}
+    timings: dict[str, list[float]] = {mode: [] for mode in MODES}
+    peaks: dict[str, float] = {}
+    bodies: dict[str, bytes] = {}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        for mode, enabled in MODES.items():
+            config.fast_json_responses = enabled
+            # Warm up, and keep the body to compare the modes.
+            response = await client.get("/events/", params=params)
+            response.raise_for_status()
+            bodies[mode] = response.content
+
+            tracemalloc.start()
+            await client.get("/events/", params=params)
+            peaks[mode] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        for _ in range(rounds):
+            for mode, enabled in MODES.items():
+                config.fast_json_responses = enabled
+                for _ in range(requests):
+                    with bench_utils.timed() as elapsed:
+                        await client.get("/events/", params=params)
+                    timings[mode].append(elapsed[0])
+
+    for mode in MODES:
+        print(
+            f"{mode:>7}: median {statistics.median(timings[mode]) * 1000:7.2f} ms  "
+            f"peak {peaks[mode] / 1024:8.1f} KiB  body {len(bodies[mode])} bytes"
+        )
+
+    same = json.loads(bodies["default"]) == json.loads(bodies["fast"])
+    print(f"same response data: {same}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument(
+        "--requests", type=int, default=20, help="Requests per mode and round."
+    )
+    parser.add_argument("--events", type=int, default=10_000)
+    args = parser.parse_args()
+
+    bench_utils.use_scratch_database()
+    bench_utils.create_schema()
+    bench_utils.seed_events(args.events)
+
+    print(f"GET /events/?limit={args.limit} rounds={args.rounds}")
+    asyncio.run(_run(args.limit, args.rounds, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Compare the column-based pump, diaper and breastfeeding statistics with ORM loops.
+
+The ORM variants are the straightforward implementation: load every event of the
+type as a model and accumulate the daily totals, intervals and durations in a loop
+over the objects. The column variants are the `stats.pump`, `stats.diaper` and
+`stats.feed` services, which select only the needed columns into arrays. Both run
+against the same multi-year data, and their daily rows are checked against each
+other.
+
+Usage:
+    cd src/backend
+    python benchmarks/bench_type_stats.py --sizes 10000 100000 --days 1095
+"""
+
+import argparse
+import datetime
+import functools
+import math
+import statistics
+from collections import defaultdict
+
+import bench_utils
+
+
+def _orm_days(events, accumulate) -> list[tuple]:
+    """Per-day accumulators of `events`, for every day from the first to the last."""
+    per_day: defaultdict[datetime.date, defaultdict[str, float]] = defaultdict(
+        lambda: defaultdict(float)
+    )
+    for event in events:
+        accumulate(per_day[event.time_start.date()], event)
+
+    if not per_day:
+        return []
+
+    first, last = min(per_day), max(per_day)
+    days = [first + datetime.timedelta(days=i) for i in range((last - first).days + 1)]
+    return [(day, per_day.get(day, {})) for day in days]
+
+
+def _orm_intervals(events) -> list[float]:
+    return [
+        (later.time_start - earlier.time_start).total_seconds() / 60
+        for earlier, later in zip(events, events[1:])
+    ]
+
+
+def _orm_rolling(values: list[float], window: int) -> list[float]:
+    return [
+        sum(values[max(0, i + 1 - window) : i + 1]) / min(i + 1, window)
+        for i in range(len(values))
+    ]
+
+
+def _orm_pump(session, rolling_days: int) -> list[tuple]:
+    from events.pump.models import PumpEvent
+    from stats import columns
+
+    events = session.query(PumpEvent).order_by(PumpEvent.time_start).all()
+
+    def accumulate(totals, event):
+        totals["count"] += 1
+        totals["amount_ml"] += event.amount_ml
+
+    days = _orm_days(events, accumulate)
+    amounts = [totals.get("amount_ml", 0.0) for _, totals in days]
+    columns.distribution([event.amount_ml for event in events], columns.AMOUNT_EDGES_ML)
+    columns.distribution(_orm_intervals(events), columns.INTERVAL_EDGES_MINUTES)
+
+    return [
+        (day, totals.get("count", 0), amount, rolling)
+        for (day, totals), amount, rolling in zip(
+            days, amounts, _orm_rolling(amounts, rolling_days)
+        )
+    ]
+
+
+def _orm_diaper(session, rolling_days: int) -> list[tuple]:
+    from events.diaper.models import DiaperEvent
+    from stats import columns
+
+    events = session.query(DiaperEvent).order_by(DiaperEvent.time_start).all()
+
+    def accumulate(totals, event):
+        totals["count"] += 1
+        totals[event.diaper_type.value] += 1
+
+    days = _orm_days(events, accumulate)
+    counts = [totals.get("count", 0) for _, totals in days]
+    columns.distribution(_orm_intervals(events), columns.INTERVAL_EDGES_MINUTES)
+
+    return [
+        (day, count, totals.get("pee", 0), rolling)
+        for (day, totals), count, rolling in zip(
+            days, counts, _orm_rolling(counts, rolling_days)
+        )
+    ]
+
+
+def _orm_breast(session, rolling_days: int) -> list[tuple]:
+    from events.feed.models import FeedBreastEvent
+    from stats import columns
+
+    events = session.query(FeedBreastEvent).order_by(FeedBreastEvent.time_start).all()
+
+    def duration(event):
+        if event.time_end is None or event.time_end < event.time_start:
+            return None
+        return (event.time_end - event.time_start).total_seconds() / 60
+
+    def accumulate(totals, event):
+        totals["count"] += 1
+        totals[event.side] += 1
+        if duration(event) is not None:
+            totals["duration"] += duration(event)
+
+    days = _orm_days(events, accumulate)
+    durations = [totals.get("duration", 0.0) for _, totals in days]
+    columns.distribution(
+        [d for d in map(duration, events) if d is not None],
+        columns.DURATION_EDGES_MINUTES,
+    )
+    columns.distribution(_orm_intervals(events), columns.INTERVAL_EDGES_MINUTES)
+
+    return [
+        (day, totals.get("count", 0), duration_total, rolling)
+        for (day, totals), duration_total, rolling in zip(
+            days, durations, _orm_rolling(durations, rolling_days)
+        )
+    ]
+
+
+def _column_rows(statistic, fields: tuple[str, ...]) -> list[tuple]:
+    return [tuple(getattr(day, field) for field in fields) for day in statistic.days]
+
+
+def _run_orm(orm_fn, session, rolling_days: int) -> list[tuple]:
+    session.expunge_all()
+    return orm_fn(session, rolling_days)
+
+
+def _run_columns(column_fn, fields, session, rolling_days: int) -> list[tuple]:
+    return _column_rows(column_fn(session, rolling_days), fields)
+
+
+def _measure(fn, repeats: int) -> tuple[float, list]:
+    timings = []
+    for _ in range(repeats):
+        with bench_utils.timed() as elapsed:
+            result = fn()
+        timings.append(elapsed[0])
+    return statistics.median(timings), result
+
+
+def _assert_same_days(orm_rows: list[tuple], column_rows: list[tuple]) -> None:
+    assert len(orm_rows) == len(column_rows), (len(orm_rows), len(column_rows))
+    for orm_row, column_row in zip(orm_rows, column_rows):
+        assert orm_row[:2] == column_row[:2], (orm_row, column_row)
+        for a, b in zip(orm_row[2:], column_row[2:]):
+            assert math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6), (orm_row, column_row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="Numbers of events per type to measure at.",
+    )
+    parser.add_argument(
+        "--days", type=int, default=365 * 3, help="Days the events are spread over."
+    )
+    parser.add_argument("--rolling-days", type=int, default=7)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    bench_utils.use_scratch_database()
+    bench_utils.create_schema()
+
+    from persistence.database import SessionLocal
+    from stats.diaper.service import DiaperStatsService
+    from stats.feed.service import FeedStatsService
+    from stats.pump.service import PumpStatsService
+
+    variants = {
+        "pump": (
+            _orm_pump,
+            lambda session, rolling_days: PumpStatsService(
+                db=session
+            ).get_pump_statistic(None, None, rolling_days),
+            ("day", "session_count", "amount_ml", "rolling_amount_ml"),
+        ),
+        "diaper": (
+            _orm_diaper,
+            lambda session, rolling_days: DiaperStatsService(
+                db=session
+            ).get_diaper_statistic(None, None, rolling_days),
+            ("day", "change_count", "pee_count", "rolling_change_count"),
+        ),
+        "breast": (
+            _orm_breast,
+            lambda session, rolling_days: FeedStatsService(
+                db=session
+            ).get_breast_feed_statistic(None, None, rolling_days),
+            ("day", "feed_count", "duration_minutes", "rolling_duration_minutes"),
+        ),
+    }
+
+    seeded = 0
+    for size in sorted(args.sizes):
+        # `seed_events` cycles through four event types; every call spreads its
+        # events over the same `--days`.
+        bench_utils.seed_events((size - seeded) * 4, days=args.days, seed=size)
+        seeded = size
+
+        for name, (orm_fn, column_fn, fields) in variants.items():
+            with SessionLocal() as session:
+                orm_seconds, orm_rows = _measure(
+                    functools.partial(_run_orm, orm_fn, session, args.rolling_days),
+                    args.repeats,
+                )
+                column_seconds, column_rows = _measure(
+                    functools.partial(
+                        _run_columns, column_fn, fields, session, args.rolling_days
+                    ),
+                    args.repeats,
+                )
+
+            _assert_same_days(orm_rows, column_rows)
+
+            print(
+                f"{name:>6} {size:>8} events over {len(column_rows):>5} days  "
+                f"orm {orm_seconds * 1000:8.1f} ms  "
+                f"columns {column_seconds * 1000:8.1f} ms  "
+                f"speedup {orm_seconds / column_seconds:4.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
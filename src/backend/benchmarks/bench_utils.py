@@ -0,0 +1,116 @@
+"""Shared helpers for the backend benchmarks.
+
+The benchmarks import the application modules directly, so they must be pointed at a
+scratch database *before* `config` is imported. `use_scratch_database` does that and
+adds `src/` to the import path.
+"""
+
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def use_scratch_database(**env: str) -> str:
+    """Point the application at a fresh SQLite file and make `src/` importable.
+
+    Args:
+        **env: Extra environment variables for `Config`, e.g. `SQLITE_SYNCHRONOUS="FULL"`.
+
+    Returns:
+        The database URL in use.
+    """
+    if "DATABASE_URL" not in os.environ:
+        directory = tempfile.mkdtemp(prefix="open-baby-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{directory}/bench.db"
+
+    os.environ.update(env)
+
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+    # Keep debug logging out of the timings.
+    import logging
+
+    import structlog
+
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    return os.environ["DATABASE_URL"]
+
+
+def create_schema() -> None:
+    """Create all tables in the scratch database."""
+    from events.diaper.models import DiaperEvent  # noqa: F401
+    from events.feed.models import FeedBottleEvent, FeedBreastEvent  # noqa: F401
+    from events.pump.models import PumpEvent  # noqa: F401
+    from persistence.database import Base, SessionLocal
+    from persistence.idempotency import IdempotencyRecord  # noqa: F401
+    from stats.models import EventRollup  # noqa: F401
+
+    Base.metadata.create_all(SessionLocal.kw["bind"])
+
+
+def seed_events(count: int, days: int = 365 * 2, seed: int = 0) -> None:
+    """Insert `count` synthetic events of every type spread over `days` days."""
+    from ulid import ULID
+
+    from events.diaper.models import DiaperEvent
+    from events.diaper.schemas import DiaperType
+    from events.feed.models import FeedBottleEvent, FeedBreastEvent
+    from events.pump.models import PumpEvent
+    from persistence.database import SessionLocal
+
+    rng = random.Random(seed)
+    end = datetime.datetime(2025, 1, 1)
+    step = datetime.timedelta(days=days) / max(count, 1)
+
+    with SessionLocal() as session:
+        batch = []
+        for i in range(count):
+            time_start = end - step * (count - i)
+            kind = i % 4
+            if kind == 0:
+                model = FeedBottleEvent(
+                    amount_ml=rng.randint(30, 240), is_formula=rng.random() < 0.5
+                )
+            elif kind == 1:
+                model = FeedBreastEvent(side=rng.choice(["left", "right", "both"]))
+            elif kind == 2:
+                model = DiaperEvent(diaper_type=rng.choice(list(DiaperType)))
+            else:
+                model = PumpEvent(amount_ml=rng.uniform(10, 200))
+
+            model.id = str(ULID())
+            model.time_start = time_start
+            model.time_end = time_start + datetime.timedelta(minutes=15)
+            model.description = "Benchmark event"
+            batch.append(model)
+
+            if len(batch) >= 5000:
+                session.add_all(batch)
+                session.commit()
+                batch = []
+
+        session.add_all(batch)
+        session.commit()
+
+
+@contextmanager
+def timed() -> Iterator[list[float]]:
+    """Measure the wall-clock seconds spent in the block."""
+    result: list[float] = []
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.append(time.perf_counter() - start)
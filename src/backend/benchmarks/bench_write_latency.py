@@ -0,0 +1,97 @@
+"""Measure per-write latency and statement count of the persistence write paths.
+
+Runs each write through the service layer against a scratch SQLite database and
+reports the mean and p95 latency plus the number of SQL statements issued per write.
+Run it on two revisions to compare write paths.
+
+Usage:
+    cd src/backend
+    python benchmarks/bench_write_latency.py --writes 2000
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+
+import bench_utils
+
+
+def _report(name: str, latencies: list[float], statements: int) -> None:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1]
+    print(
+        f"{name:<14} mean {statistics.mean(latencies_ms):6.3f} ms  "
+        f"p95 {p95:6.3f} ms  statements/write {statements / len(latencies):.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    bench_utils.use_scratch_database()
+    bench_utils.create_schema()
+
+    from sqlalchemy import event
+
+    from events.feed.schemas import FeedBottleEvent, FeedBottleEventPatch
+    from events.feed.service import FeedService
+    from persistence.database import SessionLocal
+
+    engine = SessionLocal.kw["bind"]
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+    ids: list[str] = []
+
+    with SessionLocal() as session:
+        service = FeedService(db=session)
+
+        latencies = []
+        statements = 0
+        for i in range(args.writes):
+            item = FeedBottleEvent(
+                id="",
+                time_start=start + datetime.timedelta(minutes=i),
+                amount_ml=90,
+                is_formula=True,
+            )
+            began = time.perf_counter()
+            ids.append(service.create_bottle_feed_event(event=item).id)
+            latencies.append(time.perf_counter() - began)
+        _report("insert", latencies, statements)
+
+        latencies = []
+        statements = 0
+        for i, event_id in enumerate(ids):
+            item = FeedBottleEvent(
+                id=event_id,
+                time_start=start + datetime.timedelta(minutes=i),
+                amount_ml=120,
+                is_formula=False,
+                notes="updated",
+            )
+            began = time.perf_counter()
+            service.update_bottle_feed_event(event_id=event_id, event=item)
+            latencies.append(time.perf_counter() - began)
+        _report("update", latencies, statements)
+
+        latencies = []
+        statements = 0
+        for event_id in ids:
+            patch = FeedBottleEventPatch(amount_ml=150)
+            began = time.perf_counter()
+            service.patch_bottle_feed_event(event_id=event_id, patch=patch)
+            latencies.append(time.perf_counter() - began)
+        _report("patch", latencies, statements)
+
+
+if __name__ == "__main__":
+    main()
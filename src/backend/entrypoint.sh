@@ -9,6 +9,13 @@ fi
 if [ "$1" = "migrate" ]; then
     echo "Running database migrations"
     /app/venv/bin/alembic upgrade head
+elif [ "$1" = "rebuild-rollups" ]; then
+    echo "Rebuilding statistics rollups"
+    PYTHONPATH=src /app/venv/bin/python -m stats.rollups
+elif [ "$1" = "import" ]; then
+    shift
+    echo "Importing events"
+    PYTHONPATH=src /app/venv/bin/python -m events.importing "$@"
 elif [ "$ENVIRONMENT" = "dev" ]; then
     echo "Running in development mode"
     /app/venv/bin/fastapi dev src/main.py --host 0.0.0.0
@@ -5,6 +5,7 @@ from sqlalchemy import pool
 
 from alembic import context
 
+import os
 import sys
 from os.path import abspath
 
@@ -32,6 +33,16 @@ from persistence.database import Base  # noqa: E402
 from events.feed.models import FeedBottleEvent, FeedBreastEvent  # noqa: F401, E402
 from events.diaper.models import DiaperEvent  # noqa: F401, E402
 from events.pump.models import PumpEvent  # noqa: F401, E402
+from events.models import EventChangeLog  # noqa: F401, E402
+from stats.models import EventRollup  # noqa: F401, E402
+from persistence.idempotency import IdempotencyRecord  # noqa: F401, E402
+from persistence.households import (  # noqa: E402
+    household_database_url,
+    household_mode,
+    is_valid_household,
+    list_households,
+    sqlite_file,
+)
 
 target_metadata = Base.metadata
 
@@ -65,24 +76,53 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def database_urls() -> list[str]:
+    """URLs of the databases to migrate.
+
+    In household mode these are the databases of all households, or of the ones
+    passed as `alembic -x households=a,b upgrade head`, which also creates the
+    databases of new households. Otherwise it is the configured database.
+    """
+    if not household_mode():
+        return [app_config.database_url]
+
+    selected = context.get_x_argument(as_dictionary=True).get("households")
+    households = selected.split(",") if selected else list_households()
+
+    for household in households:
+        if not is_valid_household(household):
+            raise ValueError(f"Invalid household ID: {household!r}")
+
+    return [household_database_url(household) for household in households]
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
     In this scenario we need to create an Engine
     and associate a connection with the context.
 
+    Every database returned by `database_urls` is migrated in turn.
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-
-        with context.begin_transaction():
-            context.run_migrations()
+    for url in database_urls():
+        path = sqlite_file(url)
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        connectable = engine_from_config(
+            {
+                **config.get_section(config.config_ini_section, {}),
+                "sqlalchemy.url": url,
+            },
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+        )
+
+        with connectable.connect() as connection:
+            context.configure(connection=connection, target_metadata=target_metadata)
+
+            with context.begin_transaction():
+                context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,37 @@
+"""Add time_start indexes to events
+
+Revision ID: 5c1f0e7a9b3d
+Revises: a08be7491865
+Create Date: 2025-09-14 20:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1f0e7a9b3d"
+down_revision: Union[str, Sequence[str], None] = "a08be7491865"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_events_time_start"), "events", ["time_start"], unique=False
+    )
+    op.create_index(
+        "ix_events_name_time_start",
+        "events",
+        ["name", "time_start"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_events_name_time_start", table_name="events")
+    op.drop_index(op.f("ix_events_time_start"), table_name="events")
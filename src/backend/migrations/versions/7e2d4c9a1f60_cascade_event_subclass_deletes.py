@@ -0,0 +1,58 @@
+"""Cascade deletes from events to the event subclass tables
+
+Revision ID: 7e2d4c9a1f60
+Revises: 5c1f0e7a9b3d
+Create Date: 2025-09-21 18:04:12.530187
+
+"""
+
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7e2d4c9a1f60"
+down_revision: Union[str, Sequence[str], None] = "5c1f0e7a9b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUBCLASS_TABLES = (
+    "bottle_feed_events",
+    "breast_feed_events",
+    "diaper_events",
+    "pump_events",
+)
+
+# The foreign keys were created unnamed. SQLite reports them without a name, so
+# batch mode needs a naming convention to be able to drop them.
+NAMING_CONVENTION = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+
+
+def _replace_events_foreign_key(table: str, ondelete: Optional[str]) -> None:
+    """Recreate the `id` -> `events.id` foreign key of `table`."""
+    existing_name = next(
+        fk["name"]
+        for fk in sa.inspect(op.get_bind()).get_foreign_keys(table)
+        if fk["referred_table"] == "events"
+    )
+    name = f"fk_{table}_id_events"
+
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(existing_name or name, type_="foreignkey")
+        batch_op.create_foreign_key(name, "events", ["id"], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in SUBCLASS_TABLES:
+        _replace_events_foreign_key(table, ondelete="CASCADE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in SUBCLASS_TABLES:
+        _replace_events_foreign_key(table, ondelete=None)
@@ -0,0 +1,142 @@
+"""Add event rollups
+
+Revision ID: 9b4e6f2d8c15
+Revises: 7e2d4c9a1f60
+Create Date: 2025-09-27 15:41:06.208733
+
+The table is filled from the existing events as part of the upgrade. The backfill
+reads the event tables as they are at this revision, through the definitions below
+rather than the application's models, and sums the rollups the way
+`stats.rollups` did when this revision was written.
+"""
+
+import datetime
+from typing import Any, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b4e6f2d8c15"
+down_revision: Union[str, Sequence[str], None] = "7e2d4c9a1f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_events = sa.table(
+    "events",
+    sa.column("id", sa.String),
+    sa.column("name", sa.String),
+    sa.column("time_start", sa.DateTime),
+)
+
+# Subclass table and rollup columns of each event type, by the stored type name.
+_subclass_tables = {
+    "FEED_BOTTLE": sa.table(
+        "bottle_feed_events",
+        sa.column("id", sa.String),
+        sa.column("amount_ml", sa.Float),
+        sa.column("is_formula", sa.Boolean),
+    ),
+    "FEED_BREAST": sa.table("breast_feed_events", sa.column("id", sa.String)),
+    "DIAPER_CHANGE": sa.table(
+        "diaper_events", sa.column("id", sa.String), sa.column("diaper_type", sa.String)
+    ),
+    "PUMP": sa.table(
+        "pump_events", sa.column("id", sa.String), sa.column("amount_ml", sa.Float)
+    ),
+}
+
+_totals = (
+    "event_count",
+    "amount_ml",
+    "formula_ml",
+    "breast_milk_ml",
+    "pee_count",
+    "poop_count",
+    "both_count",
+)
+
+
+def _rollups(event_type: str, rows: Any) -> list[dict[str, Any]]:
+    """Sum the events of one type into hour and day rollup rows."""
+    buckets: dict[tuple[str, datetime.datetime], dict[str, Any]] = {}
+
+    for row in rows:
+        hour = row.time_start.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+
+        for granularity, bucket_start in (
+            ("HOUR", hour),
+            ("DAY", hour.replace(hour=0)),
+        ):
+            totals = buckets.get((granularity, bucket_start))
+            if totals is None:
+                totals = buckets[(granularity, bucket_start)] = {
+                    **dict.fromkeys(_totals, 0),
+                    "granularity": granularity,
+                    "event_type": event_type,
+                    "bucket_start": bucket_start,
+                }
+
+            totals["event_count"] += 1
+
+            if event_type == "FEED_BOTTLE":
+                totals["amount_ml"] += row.amount_ml
+                totals["formula_ml" if row.is_formula else "breast_milk_ml"] += (
+                    row.amount_ml
+                )
+            elif event_type == "PUMP":
+                totals["amount_ml"] += row.amount_ml
+            elif event_type == "DIAPER_CHANGE":
+                totals[f"{row.diaper_type.lower()}_count"] += 1
+
+    return list(buckets.values())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    event_rollups = op.create_table(
+        "event_rollups",
+        sa.Column(
+            "granularity",
+            sa.Enum("HOUR", "DAY", name="rollupgranularity"),
+            nullable=False,
+        ),
+        sa.Column(
+            "event_type",
+            sa.Enum(
+                "FEED_BOTTLE", "FEED_BREAST", "DIAPER_CHANGE", "PUMP", name="eventtype"
+            ),
+            nullable=False,
+        ),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("amount_ml", sa.Float(), nullable=False),
+        sa.Column("formula_ml", sa.Float(), nullable=False),
+        sa.Column("breast_milk_ml", sa.Float(), nullable=False),
+        sa.Column("pee_count", sa.Integer(), nullable=False),
+        sa.Column("poop_count", sa.Integer(), nullable=False),
+        sa.Column("both_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("granularity", "event_type", "bucket_start"),
+    )
+
+    connection = op.get_bind()
+
+    for event_type, subclass_table in _subclass_tables.items():
+        rows = connection.execute(
+            sa.select(
+                _events.c.time_start,
+                *(c for c in subclass_table.c if c.key != "id"),
+            )
+            .join_from(_events, subclass_table, _events.c.id == subclass_table.c.id)
+            .where(_events.c.name == event_type)
+        )
+        values = _rollups(event_type, rows)
+
+        if values:
+            op.bulk_insert(event_rollups, values)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("event_rollups")
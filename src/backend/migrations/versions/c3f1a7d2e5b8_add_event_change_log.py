@@ -0,0 +1,56 @@
+"""Add the event change log
+
+Revision ID: c3f1a7d2e5b8
+Revises: 9b4e6f2d8c15
+Create Date: 2025-10-04 10:12:45.118392
+
+Existing events are logged as created, oldest first, so that a client syncing
+from the beginning receives all of them.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f1a7d2e5b8"
+down_revision: Union[str, Sequence[str], None] = "9b4e6f2d8c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "event_changes",
+        sa.Column("seq", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("event_id", sa.String(), nullable=False),
+        sa.Column(
+            "event_type",
+            sa.Enum(
+                "FEED_BOTTLE", "FEED_BREAST", "DIAPER_CHANGE", "PUMP", name="eventtype"
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "action",
+            sa.Enum("CREATED", "UPDATED", "DELETED", "RESYNC", name="changeaction"),
+            nullable=False,
+        ),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("seq"),
+        sa.UniqueConstraint("event_id"),
+        sqlite_autoincrement=True,
+    )
+    op.execute(
+        "INSERT INTO event_changes (event_id, event_type, action, changed_at) "
+        "SELECT id, name, 'CREATED', CURRENT_TIMESTAMP FROM events "
+        "ORDER BY time_start, id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("event_changes")
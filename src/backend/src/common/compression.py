@@ -0,0 +1,205 @@
+"""Negotiated brotli/gzip compression of responses.
+
+`CompressionMiddleware` compresses responses of at least `minimum_size` bytes with
+the encoding the client prefers among brotli (``br``) and ``gzip``, going by the
+quality values of its Accept-Encoding header; brotli wins a tie. Smaller responses,
+responses that already have a Content-Encoding and event streams are passed through
+unchanged.
+
+Streaming responses are compressed chunk by chunk, and every chunk is flushed so
+the client can decode it as soon as it arrives instead of when the compressor's
+window fills up.
+"""
+
+import zlib
+from typing import Optional, Protocol
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Encodings in order of preference when the client accepts several equally.
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+# Responses of these types are never compressed; event streams must reach the
+# client message by message.
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick the supported encoding the client prefers, or None for identity.
+
+    Args:
+        accept_encoding: Value of the Accept-Encoding request header, e.g.
+            ``"gzip, deflate, br;q=0.9"``.
+    """
+    qualities: dict[str, float] = {}
+
+    for item in accept_encoding.split(","):
+        coding, *parameters = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+class Compressor(Protocol):
+    """Compresses the body of one response, chunk by chunk."""
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        """Compress the next chunk; flush it, or finish the stream if it is the
+        last."""
+        ...
+
+
+class GzipCompressor:
+    """Compresses a response with gzip, flushing after every chunk."""
+
+    def __init__(self, level: int):
+        # The window bits offset makes zlib write a gzip header and trailer.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        return self._compressor.compress(body) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH
+        )
+
+
+class BrotliCompressor:
+    """Compresses a response with brotli, flushing after every chunk."""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self._compressor.process(body)
+
+        if more_body:
+            return compressed + self._compressor.flush()
+
+        return compressed + self._compressor.finish()
+
+
+class _CompressingSend:
+    """The `send` of one response, compressing its body on the way."""
+
+    def __init__(
+        self, send: Send, encoding: str, compressor: Compressor, minimum_size: int
+    ):
+        self._send = send
+        self._encoding = encoding
+        self._compressor = compressor
+        self._minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._compressing = False
+
+    def _should_compress(self, start: Message, first_body: Message) -> bool:
+        headers = Headers(raw=start["headers"])
+
+        if "content-encoding" in headers:
+            return False
+        if headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES):
+            return False
+
+        return first_body.get("more_body", False) or (
+            len(first_body.get("body", b"")) >= self._minimum_size
+        )
+
+    def _compress(self, message: Message) -> Message:
+        return {
+            **message,
+            "body": self._compressor.compress(
+                message.get("body", b""), more_body=message.get("more_body", False)
+            ),
+        }
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first chunk of the body shows whether to compress
+            # and, for a complete body, its compressed length.
+            self._start = message
+            return
+
+        if self._start is not None:
+            start, self._start = self._start, None
+
+            if message["type"] == "http.response.body" and self._should_compress(
+                start, message
+            ):
+                self._compressing = True
+                message = self._compress(message)
+
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                headers["Content-Encoding"] = self._encoding
+                if message.get("more_body", False):
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(message["body"]))
+
+            await self._send(start)
+        elif self._compressing and message["type"] == "http.response.body":
+            message = self._compress(message)
+
+        await self._send(message)
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as negotiated with the client."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        """
+        Args:
+            app: The application to wrap.
+            minimum_size: Responses with a smaller body are sent uncompressed.
+            gzip_level: zlib compression level, 1 (fastest) to 9 (smallest).
+            brotli_quality: Brotli quality, 0 (fastest) to 11 (smallest).
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+
+        compressor: Compressor
+        if encoding == "br":
+            compressor = BrotliCompressor(quality=self.brotli_quality)
+        elif encoding == "gzip":
+            compressor = GzipCompressor(level=self.gzip_level)
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(
+            scope,
+            receive,
+            _CompressingSend(send, encoding, compressor, self.minimum_size),
+        )
@@ -0,0 +1,231 @@
+"""Replay of create requests retried with the same `Idempotency-Key`.
+
+A client that does not know whether a create request went through, e.g. after its
+connection dropped, sends it again with the same Idempotency-Key header. The first
+request with a key runs as usual and its response is stored under the key, see
+`persistence.idempotency`; every retry is answered with the stored response, marked
+with an `Idempotent-Replayed: true` header, without running the request again. A
+retry therefore costs a cache lookup instead of a write transaction, and never
+creates a duplicate.
+
+Keys apply to POST requests only; requests without the header, and in household
+mode requests without a known household, are passed through unchanged. A key reused
+for a different request (method, path, query or body) is rejected with 422, and a
+retry that arrives while the first request is still running with 409. Server errors
+are not stored, so that the request can be retried.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import config
+from persistence.database import db_config
+from persistence.households import (
+    household_databases,
+    household_mode,
+    is_valid_household,
+)
+from persistence.idempotency import (
+    IdempotencyStore,
+    Pending,
+    StoredResponse,
+    idempotency_store,
+)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+MAX_KEY_LENGTH = 255
+
+
+class _Fingerprint:
+    """Hashes a request, reading its body as the application receives it."""
+
+    def __init__(self, scope: Scope, receive: Receive):
+        self._receive = receive
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._hash.update(scope["method"].encode("latin-1") + b" ")
+        self._hash.update(scope["path"].encode("utf-8") + b"?")
+        self._hash.update(scope["query_string"] + b"\n")
+        self.body_complete = False
+
+    async def receive(self) -> Message:
+        message = await self._receive()
+
+        if message["type"] == "http.request" and not self.body_complete:
+            self._hash.update(message.get("body", b""))
+            self.body_complete = not message.get("more_body", False)
+
+        return message
+
+    async def hexdigest(self) -> str:
+        """The fingerprint, after reading what is left of the body."""
+        while not self.body_complete:
+            message = await self.receive()
+            if message["type"] == "http.disconnect":
+                break
+
+        return self._hash.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Answer retried POST requests with the response to the first attempt."""
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore = idempotency_store):
+        """
+        Args:
+            app: The application to wrap.
+            store: Where keys are reserved and responses stored.
+        """
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_KEY_HEADER)
+        engine = self._engine(headers) if key is not None else None
+
+        if engine is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {
+                    "detail": f"{IDEMPOTENCY_KEY_HEADER} must be 1 to "
+                    f"{MAX_KEY_LENGTH} characters long"
+                },
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+
+        fingerprint = _Fingerprint(scope, receive)
+        stored = await run_in_threadpool(self.store.get, engine, key)
+
+        if stored is None and not await run_in_threadpool(
+            self.store.reserve, engine, key
+        ):
+            # Another request reserved the key in the meantime.
+            stored = Pending()
+
+        if isinstance(stored, StoredResponse):
+            await self._replay(
+                stored, await fingerprint.hexdigest(), scope, receive, send
+            )
+            return
+
+        if isinstance(stored, Pending):
+            response = JSONResponse(
+                {"detail": "A request with this idempotency key is in progress"},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self._run(engine, key, fingerprint, scope, send)
+
+    @staticmethod
+    def _engine(headers: Headers) -> Optional[Engine]:
+        """Engine of the database the request is for.
+
+        None for a missing, malformed or unknown household, which the route rejects.
+        """
+        if not household_mode():
+            return db_config.engine
+
+        household = headers.get(config.household_header)
+
+        if household is None or not is_valid_household(household):
+            return None
+
+        try:
+            return household_databases.get(household).db_config.engine
+        except HTTPException:
+            return None
+
+    async def _replay(
+        self,
+        stored: StoredResponse,
+        fingerprint: str,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if stored.fingerprint != fingerprint:
+            response = JSONResponse(
+                {
+                    "detail": "The idempotency key was already used for a "
+                    "different request"
+                },
+                status_code=422,
+            )
+            await response(scope, receive, send)
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": stored.status_code,
+                "headers": [
+                    *stored.headers,
+                    (REPLAYED_HEADER.lower().encode(), b"true"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _run(
+        self,
+        engine: Engine,
+        key: str,
+        fingerprint: _Fingerprint,
+        scope: Scope,
+        send: Send,
+    ) -> None:
+        """Run the request and store its response under `key`."""
+        start: Message = {}
+        body: list[bytes] = []
+        stored = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, stored
+
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+
+                if not message.get("more_body", False) and start["status"] < 500:
+                    await run_in_threadpool(
+                        self.store.complete,
+                        engine,
+                        key,
+                        StoredResponse(
+                            fingerprint=await fingerprint.hexdigest(),
+                            status_code=start["status"],
+                            headers=list(start.get("headers", [])),
+                            body=b"".join(body),
+                        ),
+                    )
+                    stored = True
+
+            await send(message)
+
+        try:
+            await self.app(scope, fingerprint.receive, send_wrapper)
+        finally:
+            if not stored:
+                await run_in_threadpool(self.store.release, engine, key)
@@ -0,0 +1,154 @@
+"""Route class that encodes endpoint results straight to JSON bytes.
+
+FastAPI treats whatever an endpoint returns as untrusted: it validates the result
+against the route's `response_model`, dumps it to Python dicts and lists, and then
+encodes those with the standard `json` module. The services here already return
+validated pydantic objects, so while `config.fast_json_responses` is enabled
+`TrustedResponseRoute` skips all of that: pydantic-core encodes the result to JSON
+bytes in one pass, using the schema of `response_model`. Fields such as
+`dict[str, Any]` are encoded by pydantic-core as well instead of by the generic
+Python encoder. The OpenAPI schema does not change.
+
+Results that do not match the response model, e.g. ORM objects, are still validated
+first, exactly as FastAPI would. Routes without a `response_model` and endpoints
+that return a `Response` are left alone.
+
+Example:
+    ```python
+    router = APIRouter(route_class=TrustedResponseRoute)
+    ```
+"""
+
+import functools
+import inspect
+import weakref
+from typing import Any, Callable
+
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from pydantic_core import PydanticSerializationError
+
+from config import config
+
+# Extra endpoint parameter through which FastAPI passes the response that
+# dependencies and the endpoint set headers and the status code on.
+_SUB_RESPONSE_PARAMETER = "trusted_response_sub_response"
+
+# Endpoints returned by `_encode_results`, which must not be wrapped again.
+_encoded_endpoints: "weakref.WeakSet[Callable[..., Any]]" = weakref.WeakSet()
+
+
+def _encode_results(
+    endpoint: Callable[..., Any],
+    response_model: Any,
+    status_code: int | None,
+    by_alias: bool = True,
+) -> Callable[..., Any]:
+    """Wrap `endpoint` to return its result as a JSON `Response`.
+
+    Fields are named by their alias unless `by_alias` is false, as FastAPI does
+    with `response_model_by_alias`.
+    """
+    adapter = TypeAdapter(response_model)
+    signature = inspect.signature(endpoint)
+
+    # FastAPI passes the sub-response to one parameter only, so an endpoint that
+    # takes it already shares its parameter.
+    response_parameter = next(
+        (
+            name
+            for name, parameter in signature.parameters.items()
+            if isinstance(parameter.annotation, type)
+            and issubclass(parameter.annotation, Response)
+        ),
+        None,
+    )
+
+    def sub_response_of(kwargs: dict[str, Any]) -> Response:
+        if response_parameter is None:
+            return kwargs.pop(_SUB_RESPONSE_PARAMETER)
+        return kwargs[response_parameter]
+
+    def encode(result: Any, sub_response: Response) -> Any:
+        # Disabled, FastAPI validates and encodes the result as usual.
+        if not config.fast_json_responses or isinstance(result, Response):
+            return result
+
+        try:
+            body = adapter.dump_json(result, by_alias=by_alias, warnings="error")
+        except PydanticSerializationError:
+            body = adapter.dump_json(
+                adapter.validate_python(result, from_attributes=True),
+                by_alias=by_alias,
+            )
+
+        response = Response(
+            content=body,
+            status_code=sub_response.status_code or status_code or 200,
+            media_type="application/json",
+        )
+        response.headers.raw.extend(sub_response.headers.raw)
+
+        return response
+
+    encoded: Callable[..., Any]
+
+    # A sync endpoint stays sync, so that FastAPI still runs it, and the encoding,
+    # on the threadpool.
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def encoded(*args: Any, **kwargs: Any) -> Any:
+            sub_response = sub_response_of(kwargs)
+            return encode(await endpoint(*args, **kwargs), sub_response)
+
+    else:
+
+        @functools.wraps(endpoint)
+        def encoded(*args: Any, **kwargs: Any) -> Any:
+            sub_response = sub_response_of(kwargs)
+            return encode(endpoint(*args, **kwargs), sub_response)
+
+    # FastAPI reads the parameters from the signature; add the sub-response to them.
+    if response_parameter is None:
+        setattr(
+            encoded,
+            "__signature__",
+            signature.replace(
+                parameters=[
+                    *signature.parameters.values(),
+                    inspect.Parameter(
+                        _SUB_RESPONSE_PARAMETER,
+                        inspect.Parameter.KEYWORD_ONLY,
+                        annotation=Response,
+                    ),
+                ]
+            ),
+        )
+    _encoded_endpoints.add(encoded)
+
+    return encoded
+
+
+class TrustedResponseRoute(APIRoute):
+    """An `APIRoute` that trusts its endpoint to return `response_model` objects."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        response_model = kwargs.get("response_model")
+
+        # Including a router re-creates its routes from their (wrapped) endpoints.
+        if (
+            response_model is not None
+            and not isinstance(response_model, DefaultPlaceholder)
+            and endpoint not in _encoded_endpoints
+        ):
+            endpoint = _encode_results(
+                endpoint,
+                response_model,
+                kwargs.get("status_code"),
+                by_alias=kwargs.get("response_model_by_alias", True),
+            )
+
+        super().__init__(path, endpoint, **kwargs)
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,15 +14,101 @@ class Config(BaseSettings):
 
     # Define your settings here, for example:
     database_url: str = "sqlite:///./db/db.db"
+
+    # Read-only endpoints use a separate connection pool. It connects to
+    # `read_database_url` when set, e.g. a replica, and otherwise to the primary.
+    # SQLite read connections are opened with `PRAGMA query_only`; to open a replica
+    # file strictly read-only use a URI such as
+    # 'sqlite:///file:./db/replica.db?mode=ro&uri=true'.
+    read_database_url: Optional[str] = None
+
+    # Household mode: with `household_database_url` set, every household has a
+    # database of its own, the URL with `{household}` replaced by the household ID,
+    # e.g. 'sqlite:///./db/households/{household}.db'. Requests name their
+    # household in the `household_header` header. The engines of the
+    # `household_cache_size` most recently used households are kept open, and
+    # those unused for `household_idle_seconds` are closed.
+    household_database_url: Optional[str] = None
+    household_header: str = "X-Household-ID"
+    household_cache_size: int = 32
+    household_idle_seconds: float = 300.0
+
+    # Connection pool sizing, passed to SQLAlchemy's QueuePool. Use `GET /health/db`
+    # to see live checked-in/checked-out/overflow counts when tuning these.
+    # In-memory SQLite databases use a single shared connection and ignore them.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    # Seconds after which a connection is replaced; -1 keeps connections forever.
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+
+    # SQLite tuning applied to every pooled connection. Ignored for other databases.
+    # WAL lets readers proceed while a write is in progress, and with it
+    # synchronous=NORMAL only fsyncs at checkpoints instead of on every commit.
+    sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL"] = (
+        "WAL"
+    )
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    # Page cache size. Negative values are KiB, positive values are pages.
+    sqlite_cache_size: int = -20000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    # How long a writer waits for a lock before failing with "database is locked".
+    sqlite_busy_timeout_ms: int = 5000
+
     debug: bool = False
 
+    # Encode route results straight to JSON bytes with pydantic-core instead of
+    # re-validating them against the route's response model first. See
+    # `common.routing.TrustedResponseRoute`.
+    fast_json_responses: bool = True
+
     root_path: str = ""
 
+    # Responses of at least `compression_minimum_size` bytes are compressed with
+    # brotli or gzip, whichever the client prefers. 0 compresses every response,
+    # and `compression_enabled=false` leaves compression to a proxy.
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1000
+    # zlib level 1 (fastest) to 9 (smallest); brotli quality 0 to 11.
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
     # CORS allowed origins. To specify multiple origins as
     # an environment variable, specify the list as a JSON-encoded string.
     # Example: '["http://localhost:3000", "https://example.com"]
     allow_origins: list[str] = []
 
+    # Largest number of events accepted by a single `/batch` create request.
+    max_batch_size: int = 500
+
+    # `POST /events/import` inserts `import_batch_size` events per transaction,
+    # unless the request asks for another size, and lists at most
+    # `import_max_errors` rejected rows in its report.
+    import_batch_size: int = 1000
+    import_max_errors: int = 1000
+
+    # `GET /events/stream` clients are sent a `resync` instead of the changes once
+    # they fall `change_feed_queue_size` changes behind, and a keep-alive comment
+    # after `change_feed_heartbeat_seconds` without changes. On SQLite, writes of
+    # other processes are looked for every `change_feed_poll_seconds`; 0 disables
+    # that.
+    change_feed_queue_size: int = 100
+    change_feed_heartbeat_seconds: float = 15.0
+    change_feed_poll_seconds: float = 1.0
+
+    # Totals returned by `GET /events` are cached per time window. Any commit clears
+    # the cache; the TTL bounds staleness across worker processes. 0 disables it.
+    event_count_cache_size: int = 128
+    event_count_cache_ttl_seconds: float = 30.0
+
+    # Create requests sent with an `Idempotency-Key` header are answered once and
+    # replayed on retries for `idempotency_ttl_seconds`; the latest
+    # `idempotency_cache_size` responses are also kept in memory.
+    idempotency_ttl_seconds: float = 86400.0
+    idempotency_cache_size: int = 1024
+
 
 config = Config()
 
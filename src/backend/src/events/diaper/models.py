@@ -15,7 +15,9 @@ class DiaperEvent(models.Event):
 
     __tablename__ = "diaper_events"
 
-    id: Mapped[str] = mapped_column(ForeignKey("events.id"), primary_key=True)
+    id: Mapped[str] = mapped_column(
+        ForeignKey("events.id", ondelete="CASCADE"), primary_key=True
+    )
     diaper_type: Mapped[DiaperType] = mapped_column(Enum(DiaperType), nullable=False)
     diaper_contents_color: Mapped[DiaperContentsColor] = mapped_column(
         Enum(DiaperContentsColor), nullable=True
@@ -1,10 +1,20 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from sqlalchemy.orm import Session
 from structlog import get_logger
 from events.diaper.model_schema_translation import DiaperModelSchemaTranslation
 from events.diaper import schemas, models
 from fastapi import HTTPException, status
-from sqlalchemy.orm.attributes import set_attribute
+from persistence.direct_delete import delete_event_row
+from persistence.pagination import paginate_newest_first
+from events.schemas import ChangeAction, EventType
+from persistence.change_feed import record_change
+from stats.rollups import ROLLUP_COLUMNS, mark_changed
+from events.model_schema_translation import EventModelSchemaTranslation
+from persistence.direct_update import (
+    model_column_values,
+    patch_event_row,
+    update_event_row,
+)
 
 
 class DiaperPersistence:
@@ -21,9 +31,12 @@ class DiaperPersistence:
 
         try:
             self._db.add(model)
+            mark_changed(self._db, EventType.DIAPER_CHANGE, model.time_start)
+            record_change(
+                self._db, ChangeAction.CREATED, EventType.DIAPER_CHANGE, model.id
+            )
 
             self._db.commit()
-            self._db.refresh(model)
         except Exception as e:
             self._log.error("Failed to insert diaper event", error=repr(e))
             self._db.rollback()
@@ -33,6 +46,40 @@ class DiaperPersistence:
 
         return self._translation.model_to_schema(model=model)
 
+    def insert_diaper_events(
+        self, events: Sequence[schemas.DiaperEvent]
+    ) -> list[schemas.DiaperEvent]:
+        """Insert several diaper events in a single transaction."""
+        self._log.debug("Inserting diaper events", count=len(events))
+
+        if not events:
+            return []
+
+        models_list = [
+            self._translation.schema_to_model(schema=event) for event in events
+        ]
+
+        try:
+            self._db.add_all(models_list)
+            for model in models_list:
+                mark_changed(self._db, EventType.DIAPER_CHANGE, model.time_start)
+                record_change(
+                    self._db, ChangeAction.CREATED, EventType.DIAPER_CHANGE, model.id
+                )
+            self._db.commit()
+        except Exception as e:
+            self._log.error("Failed to insert diaper events", error=repr(e))
+            self._db.rollback()
+            raise
+
+        inserted = [
+            self._translation.model_to_schema(model=model) for model in models_list
+        ]
+
+        self._log.debug("Diaper events inserted successfully", count=len(inserted))
+
+        return inserted
+
     def get_diaper_event(self, event_id: str) -> schemas.DiaperEvent:
         """Retrieve a diaper event by its ID."""
         self._log.debug("Retrieving diaper event", event_id=event_id)
@@ -55,25 +102,33 @@ class DiaperPersistence:
         return self._translation.model_to_schema(model=model)
 
     def list_diaper_events(
-        self, limit: int = 100, offset: int = 0
-    ) -> Sequence[schemas.DiaperEvent]:
-        """List diaper events with pagination."""
-        self._log.debug("Listing diaper events", limit=limit, offset=offset)
+        self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None
+    ) -> tuple[Sequence[schemas.DiaperEvent], Optional[str]]:
+        """List diaper events with pagination.
+
+        Returns the page and the cursor for the next page, if any.
+        """
+        self._log.debug(
+            "Listing diaper events", limit=limit, offset=offset, cursor=cursor
+        )
 
-        models_list = (
-            self._db.query(models.DiaperEvent)
-            .order_by(models.DiaperEvent.time_start.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        models_list, next_cursor = paginate_newest_first(
+            self._db.query(models.DiaperEvent),
+            time_start_column=models.DiaperEvent.time_start,
+            id_column=models.DiaperEvent.id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
 
         if not models_list:
             self._log.info("No diaper events found")
-            return []
+            return [], None
         self._log.debug("Diaper events listed successfully", count=len(models_list))
 
-        return [self._translation.model_to_schema(model=model) for model in models_list]
+        return [
+            self._translation.model_to_schema(model=model) for model in models_list
+        ], next_cursor
 
     def update_diaper_event(
         self, event_id: str, event: schemas.DiaperEvent
@@ -81,67 +136,106 @@ class DiaperPersistence:
         """Update an existing diaper event."""
         self._log.debug("Updating diaper event", event_id=event_id, evt=event)
 
+        model = self._translation.schema_to_model(schema=event)
+        model.id = event_id
+
         try:
-            model = (
-                self._db.query(models.DiaperEvent)
-                .filter(models.DiaperEvent.id == event_id)
-                .first()
-            )
-        except LookupError as e:
-            self._log.error("Invalid event type", error=repr(e))
-            raise HTTPException(
-                detail=f"Invalid event type for ID {event_id}",
-                status_code=status.HTTP_400_BAD_REQUEST,
+            previous_time_start = update_event_row(
+                self._db,
+                models.DiaperEvent,
+                event_id=event_id,
+                values=model_column_values(model),
             )
+            if previous_time_start is not None:
+                mark_changed(self._db, EventType.DIAPER_CHANGE, previous_time_start)
+                mark_changed(self._db, EventType.DIAPER_CHANGE, model.time_start)
+                record_change(
+                    self._db, ChangeAction.UPDATED, EventType.DIAPER_CHANGE, event_id
+                )
+            self._db.commit()
+        except Exception as e:
+            self._log.error("Failed to update diaper event", error=repr(e))
+            self._db.rollback()
+            raise
 
-        if not model:
+        if previous_time_start is None:
             self._log.error("Diaper event not found", event_id=event_id)
             raise HTTPException(
                 detail=f"Diaper event with ID {event_id} not found",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
-        for key, value in event.model_dump().items():
-            if key != "id":  # Avoid changing the ID
-                set_attribute(model, key, value)
+        self._log.debug("Diaper event updated successfully", model=model)
+
+        return self._translation.model_to_schema(model=model)
+
+    def patch_diaper_event(
+        self, event_id: str, patch: schemas.DiaperEventPatch
+    ) -> schemas.DiaperEvent:
+        """Change only the fields set on `patch` of an existing diaper event."""
+        self._log.debug("Patching diaper event", event_id=event_id, patch=patch)
+
+        values = EventModelSchemaTranslation.event_patch_to_values(patch)
 
         try:
+            patched = patch_event_row(
+                self._db, models.DiaperEvent, event_id=event_id, values=values
+            )
+
+            if patched is not None and not ROLLUP_COLUMNS.isdisjoint(values):
+                mark_changed(
+                    self._db, EventType.DIAPER_CHANGE, patched.previous_time_start
+                )
+                mark_changed(
+                    self._db, EventType.DIAPER_CHANGE, patched.values["time_start"]
+                )
+
+            if patched is not None:
+                record_change(
+                    self._db, ChangeAction.UPDATED, EventType.DIAPER_CHANGE, event_id
+                )
+
             self._db.commit()
-            self._db.refresh(model)
         except Exception as e:
-            self._log.error("Failed to update diaper event", error=repr(e))
+            self._log.error("Failed to patch diaper event", error=repr(e))
             self._db.rollback()
             raise
 
-        self._log.debug("Diaper event updated successfully", model=model)
-
-        return self._translation.model_to_schema(model=model)
-
-    def delete_diaper_event(self, event_id: str) -> None:
-        """Delete a diaper event by its ID."""
-        self._log.debug("Deleting diaper event", event_id=event_id)
-
-        model = (
-            self._db.query(models.DiaperEvent)
-            .filter(models.DiaperEvent.id == event_id)
-            .first()
-        )
-
-        if not model:
+        if patched is None:
             self._log.error("Diaper event not found", event_id=event_id)
             raise HTTPException(
                 detail=f"Diaper event with ID {event_id} not found",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
+        self._log.debug("Diaper event patched successfully", event_id=event_id)
+
+        return self._translation.model_to_schema(
+            model=models.DiaperEvent(**patched.values)
+        )
+
+    def delete_diaper_event(self, event_id: str) -> None:
+        """Delete a diaper event by its ID."""
+        self._log.debug("Deleting diaper event", event_id=event_id)
+
         try:
-            self._db.delete(model)
+            deleted = delete_event_row(self._db, models.DiaperEvent, event_id=event_id)
+            if deleted is not None:
+                mark_changed(self._db, deleted.name, deleted.time_start)
+                record_change(self._db, ChangeAction.DELETED, deleted.name, deleted.id)
             self._db.commit()
         except Exception as e:
             self._log.error("Failed to delete diaper event", error=repr(e))
             self._db.rollback()
             raise
 
+        if deleted is None:
+            self._log.error("Diaper event not found", event_id=event_id)
+            raise HTTPException(
+                detail=f"Diaper event with ID {event_id} not found",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+
         self._log.debug("Diaper event deleted successfully", event_id=event_id)
 
         return None
@@ -1,13 +1,18 @@
 """Router for diaper-related events."""
 
-from fastapi import APIRouter, Depends
-from typing import Sequence
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
+from common.routing import TrustedResponseRoute
+from typing import Annotated, Optional, Sequence
+from pydantic import Field
+from config import config
 from events.diaper.service import DiaperService
 from events.diaper import schemas
-from persistence.dependencies import get_db
+from events.schemas import BatchCreateResponse
+from persistence.dependencies import conditional_get, get_db, get_db_read_only
+from persistence.pagination import NEXT_CURSOR_HEADER
 
-router = APIRouter()
+router = APIRouter(route_class=TrustedResponseRoute)
 
 
 @router.post("/", response_model=schemas.DiaperEvent)
@@ -17,20 +22,56 @@ def create_diaper_event(event: schemas.DiaperEvent, db: Session = Depends(get_db
     return service.create_diaper_event(event=event)
 
 
-@router.get("/{event_id}", response_model=schemas.DiaperEvent)
-def get_diaper_event(event_id: str, db: Session = Depends(get_db)):
+@router.post("/batch", response_model=BatchCreateResponse[schemas.DiaperEvent])
+def create_diaper_events(
+    events: Annotated[
+        list[schemas.DiaperEventBatchItem], Field(max_length=config.max_batch_size)
+    ],
+    db: Session = Depends(get_db),
+):
+    """Create several diaper events in one transaction.
+
+    If any item fails validation nothing is created; the errors locate the items by
+    index.
+    """
+    service = DiaperService(db=db)
+    return service.create_diaper_events(events=events)
+
+
+@router.get(
+    "/{event_id}",
+    response_model=schemas.DiaperEvent,
+    dependencies=[Depends(conditional_get)],
+)
+def get_diaper_event(event_id: str, db: Session = Depends(get_db_read_only)):
     """Retrieve a diaper event by its ID."""
     service = DiaperService(db=db)
     return service.get_diaper_event(event_id=event_id)
 
 
-@router.get("/", response_model=Sequence[schemas.DiaperEvent])
+@router.get(
+    "/",
+    response_model=Sequence[schemas.DiaperEvent],
+    dependencies=[Depends(conditional_get)],
+)
 def list_diaper_events(
-    limit: int = 100, offset: int = 0, db: Session = Depends(get_db)
+    response: Response,
+    limit: int = 100,
+    offset: int = 0,
+    cursor: Optional[str] = Query(
+        None,
+        description=f"`{NEXT_CURSOR_HEADER}` header of the previous page. Takes precedence over offset.",
+    ),
+    db: Session = Depends(get_db_read_only),
 ):
     """List diaper events with pagination."""
     service = DiaperService(db=db)
-    return service.list_diaper_events(limit=limit, offset=offset)
+    events, next_cursor = service.list_diaper_events(
+        limit=limit, offset=offset, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return events
 
 
 @router.put("/{event_id}", response_model=schemas.DiaperEvent)
@@ -42,6 +83,17 @@ def update_diaper_event(
     return service.update_diaper_event(event_id=event_id, event=event)
 
 
+@router.patch("/{event_id}", response_model=schemas.DiaperEvent)
+def patch_diaper_event(
+    event_id: str,
+    patch: schemas.DiaperEventPatch,
+    db: Session = Depends(get_db),
+):
+    """Change only the fields present in the request body of a diaper event."""
+    service = DiaperService(db=db)
+    return service.patch_diaper_event(event_id=event_id, patch=patch)
+
+
 @router.delete("/{event_id}")
 def delete_diaper_event(event_id: str, db: Session = Depends(get_db)):
     """Delete a diaper event by its ID."""
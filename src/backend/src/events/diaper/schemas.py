@@ -1,5 +1,5 @@
 from pydantic import Field
-from events.schemas import Event
+from events.schemas import Event, EventPatch
 from events.schemas import EventType
 from enum import Enum
 
@@ -46,3 +46,20 @@ class DiaperEvent(Event):
     diaper_contents_color: DiaperContentsColor | None = None
     diaper_contents_consistency: DiaperContentsConsistency | None = None
     diaper_contents_size: DiaperContentsSize | None = None
+
+
+class DiaperEventBatchItem(DiaperEvent):
+    """A diaper change event of a batch create; the server assigns the ID."""
+
+    id: str = ""
+
+
+class DiaperEventPatch(EventPatch):
+    """Partial update of a diaper change event."""
+
+    non_nullable_fields = EventPatch.non_nullable_fields | {"diaper_type"}
+
+    diaper_type: DiaperType | None = None
+    diaper_contents_color: DiaperContentsColor | None = None
+    diaper_contents_consistency: DiaperContentsConsistency | None = None
+    diaper_contents_size: DiaperContentsSize | None = None
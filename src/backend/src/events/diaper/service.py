@@ -1,8 +1,9 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from common.service import CommonService
 from sqlalchemy.orm import Session
 from events.diaper.model_schema_translation import DiaperModelSchemaTranslation
 from events.diaper import schemas
+from events.schemas import BatchCreateResponse
 from ulid import ULID
 from events.diaper.persistence import DiaperPersistence
 
@@ -32,6 +33,19 @@ class DiaperService(CommonService):
 
         return inserted_event
 
+    def create_diaper_events(
+        self, events: Sequence[schemas.DiaperEvent]
+    ) -> BatchCreateResponse[schemas.DiaperEvent]:
+        """Create several diaper events at once, inserted together in one transaction."""
+        self._log.debug("Creating diaper events", count=len(events))
+
+        for event in events:
+            event.id = str(ULID())
+
+        inserted_events = self._persistence.insert_diaper_events(events=events)
+
+        return BatchCreateResponse[schemas.DiaperEvent](created=inserted_events)
+
     def get_diaper_event(self, event_id: str) -> schemas.DiaperEvent:
         """Retrieve a diaper event by its ID."""
         self._log.debug("Retrieving diaper event", event_id=event_id)
@@ -39,12 +53,19 @@ class DiaperService(CommonService):
         return self._persistence.get_diaper_event(event_id=event_id)
 
     def list_diaper_events(
-        self, limit: int = 100, offset: int = 0
-    ) -> Sequence[schemas.DiaperEvent]:
-        """List diaper events with pagination."""
-        self._log.debug("Listing diaper events", limit=limit, offset=offset)
+        self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None
+    ) -> tuple[Sequence[schemas.DiaperEvent], Optional[str]]:
+        """List diaper events with pagination.
 
-        return self._persistence.list_diaper_events(limit=limit, offset=offset)
+        Returns the page and the cursor for the next page, if any.
+        """
+        self._log.debug(
+            "Listing diaper events", limit=limit, offset=offset, cursor=cursor
+        )
+
+        return self._persistence.list_diaper_events(
+            limit=limit, offset=offset, cursor=cursor
+        )
 
     def update_diaper_event(
         self, event_id: str, event: schemas.DiaperEvent
@@ -54,6 +75,14 @@ class DiaperService(CommonService):
 
         return self._persistence.update_diaper_event(event_id=event_id, event=event)
 
+    def patch_diaper_event(
+        self, event_id: str, patch: schemas.DiaperEventPatch
+    ) -> schemas.DiaperEvent:
+        """Change only the given fields of an existing diaper event."""
+        self._log.debug("Patching diaper event", event_id=event_id, patch=patch)
+
+        return self._persistence.patch_diaper_event(event_id=event_id, patch=patch)
+
     def delete_diaper_event(self, event_id: str) -> None:
         """Delete a diaper event by its ID."""
         self._log.debug("Deleting diaper event", event_id=event_id)
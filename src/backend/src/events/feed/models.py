@@ -9,7 +9,9 @@ class FeedBottleEvent(models.Event):
 
     __tablename__ = "bottle_feed_events"
 
-    id: Mapped[str] = mapped_column(ForeignKey("events.id"), primary_key=True)
+    id: Mapped[str] = mapped_column(
+        ForeignKey("events.id", ondelete="CASCADE"), primary_key=True
+    )
     amount_ml: Mapped[int] = mapped_column(nullable=False)
     is_formula: Mapped[bool] = mapped_column(nullable=False)
 
@@ -27,7 +29,9 @@ class FeedBreastEvent(models.Event):
 
     __tablename__ = "breast_feed_events"
 
-    id: Mapped[str] = mapped_column(ForeignKey("events.id"), primary_key=True)
+    id: Mapped[str] = mapped_column(
+        ForeignKey("events.id", ondelete="CASCADE"), primary_key=True
+    )
     side: Mapped[str] = mapped_column(nullable=False)  # Use enum or string for side
 
     __mapper_args__ = {"polymorphic_identity": EventType.FEED_BREAST.value}
@@ -1,10 +1,20 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from sqlalchemy.orm import Session
 from structlog import get_logger
 from events.feed.model_schema_translation import FeedModelSchemaTranslation
 from events.feed import schemas, models
 from fastapi import HTTPException, status
-from sqlalchemy.orm.attributes import set_attribute
+from persistence.direct_delete import delete_event_row
+from persistence.pagination import paginate_newest_first
+from events.schemas import ChangeAction, EventType
+from persistence.change_feed import record_change
+from stats.rollups import ROLLUP_COLUMNS, mark_changed
+from events.model_schema_translation import EventModelSchemaTranslation
+from persistence.direct_update import (
+    model_column_values,
+    patch_event_row,
+    update_event_row,
+)
 
 
 class FeedPersistence:
@@ -23,9 +33,12 @@ class FeedPersistence:
 
         try:
             self._db.add(model)
+            mark_changed(self._db, EventType.FEED_BOTTLE, model.time_start)
+            record_change(
+                self._db, ChangeAction.CREATED, EventType.FEED_BOTTLE, model.id
+            )
 
             self._db.commit()
-            self._db.refresh(model)
         except Exception as e:
             self._log.error("Failed to insert bottle feed event", error=repr(e))
             self._db.rollback()
@@ -35,6 +48,42 @@ class FeedPersistence:
 
         return self._translation.bottle_feed_model_to_schema(model=model)
 
+    def insert_bottle_feed_events(
+        self, events: Sequence[schemas.FeedBottleEvent]
+    ) -> list[schemas.FeedBottleEvent]:
+        """Insert several bottle feed events in a single transaction."""
+        self._log.debug("Inserting bottle feed events", count=len(events))
+
+        if not events:
+            return []
+
+        models_list = [
+            self._translation.bottle_feed_schema_to_model(schema=event)
+            for event in events
+        ]
+
+        try:
+            self._db.add_all(models_list)
+            for model in models_list:
+                mark_changed(self._db, EventType.FEED_BOTTLE, model.time_start)
+                record_change(
+                    self._db, ChangeAction.CREATED, EventType.FEED_BOTTLE, model.id
+                )
+            self._db.commit()
+        except Exception as e:
+            self._log.error("Failed to insert bottle feed events", error=repr(e))
+            self._db.rollback()
+            raise
+
+        inserted = [
+            self._translation.bottle_feed_model_to_schema(model=model)
+            for model in models_list
+        ]
+
+        self._log.debug("Bottle feed events inserted successfully", count=len(inserted))
+
+        return inserted
+
     def get_bottle_feed_event(self, event_id: str) -> schemas.FeedBottleEvent:
         """Retrieve a bottle feed event by its ID."""
         self._log.debug("Retrieving bottle feed event", event_id=event_id)
@@ -57,30 +106,39 @@ class FeedPersistence:
         return self._translation.bottle_feed_model_to_schema(model=model)
 
     def list_bottle_feed_events(
-        self, limit: int = 100, offset: int = 0
-    ) -> Sequence[schemas.FeedBottleEvent]:
-        """List bottle feed events with pagination."""
-        self._log.debug("Listing bottle feed events", limit=limit, offset=offset)
+        self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None
+    ) -> tuple[Sequence[schemas.FeedBottleEvent], Optional[str]]:
+        """List bottle feed events with pagination.
 
-        models_list = (
-            self._db.query(models.FeedBottleEvent)
-            .order_by(models.FeedBottleEvent.time_start.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        Returns the page and the cursor for the next page, if any.
+        """
+        self._log.debug(
+            "Listing bottle feed events", limit=limit, offset=offset, cursor=cursor
+        )
+
+        models_list, next_cursor = paginate_newest_first(
+            self._db.query(models.FeedBottleEvent),
+            time_start_column=models.FeedBottleEvent.time_start,
+            id_column=models.FeedBottleEvent.id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
 
         if not models_list:
             self._log.info("No bottle feed events found")
-            return []
+            return [], None
         self._log.debug(
             "Bottle feed events listed successfully", count=len(models_list)
         )
 
-        return [
-            self._translation.bottle_feed_model_to_schema(model=model)
-            for model in models_list
-        ]
+        return (
+            [
+                self._translation.bottle_feed_model_to_schema(model=model)
+                for model in models_list
+            ],
+            next_cursor,
+        )
 
     def update_bottle_feed_event(
         self, event_id: str, event: schemas.FeedBottleEvent
@@ -88,67 +146,108 @@ class FeedPersistence:
         """Update an existing bottle feed event."""
         self._log.debug("Updating bottle feed event", event_id=event_id, evt=event)
 
+        model = self._translation.bottle_feed_schema_to_model(schema=event)
+        model.id = event_id
+
         try:
-            model = (
-                self._db.query(models.FeedBottleEvent)
-                .filter(models.FeedBottleEvent.id == event_id)
-                .first()
-            )
-        except LookupError as e:
-            self._log.error("Invalid event type", error=repr(e))
-            raise HTTPException(
-                detail=f"Invalid event type for ID {event_id}",
-                status_code=status.HTTP_400_BAD_REQUEST,
+            previous_time_start = update_event_row(
+                self._db,
+                models.FeedBottleEvent,
+                event_id=event_id,
+                values=model_column_values(model),
             )
+            if previous_time_start is not None:
+                mark_changed(self._db, EventType.FEED_BOTTLE, previous_time_start)
+                mark_changed(self._db, EventType.FEED_BOTTLE, model.time_start)
+                record_change(
+                    self._db, ChangeAction.UPDATED, EventType.FEED_BOTTLE, event_id
+                )
+            self._db.commit()
+        except Exception as e:
+            self._log.error("Failed to update bottle feed event", error=repr(e))
+            self._db.rollback()
+            raise
 
-        if not model:
+        if previous_time_start is None:
             self._log.error("Bottle feed event not found", event_id=event_id)
             raise HTTPException(
                 detail=f"Bottle feed event with ID {event_id} not found",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
-        for key, value in event.model_dump().items():
-            if key != "id":  # Avoid changing the ID
-                set_attribute(model, key, value)
+        self._log.debug("Bottle feed event updated successfully", model=model)
+
+        return self._translation.bottle_feed_model_to_schema(model=model)
+
+    def patch_bottle_feed_event(
+        self, event_id: str, patch: schemas.FeedBottleEventPatch
+    ) -> schemas.FeedBottleEvent:
+        """Change only the fields set on `patch` of an existing bottle feed event."""
+        self._log.debug("Patching bottle feed event", event_id=event_id, patch=patch)
+
+        values = EventModelSchemaTranslation.event_patch_to_values(patch)
 
         try:
+            patched = patch_event_row(
+                self._db, models.FeedBottleEvent, event_id=event_id, values=values
+            )
+
+            if patched is not None and not ROLLUP_COLUMNS.isdisjoint(values):
+                mark_changed(
+                    self._db, EventType.FEED_BOTTLE, patched.previous_time_start
+                )
+                mark_changed(
+                    self._db, EventType.FEED_BOTTLE, patched.values["time_start"]
+                )
+
+            if patched is not None:
+                record_change(
+                    self._db, ChangeAction.UPDATED, EventType.FEED_BOTTLE, event_id
+                )
+
             self._db.commit()
-            self._db.refresh(model)
         except Exception as e:
-            self._log.error("Failed to update bottle feed event", error=repr(e))
+            self._log.error("Failed to patch bottle feed event", error=repr(e))
             self._db.rollback()
             raise
 
-        self._log.debug("Bottle feed event updated successfully", model=model)
-
-        return self._translation.bottle_feed_model_to_schema(model=model)
-
-    def delete_bottle_feed_event(self, event_id: str) -> None:
-        """Delete a bottle feed event by its ID."""
-        self._log.debug("Deleting bottle feed event", event_id=event_id)
-
-        model = (
-            self._db.query(models.FeedBottleEvent)
-            .filter(models.FeedBottleEvent.id == event_id)
-            .first()
-        )
-
-        if not model:
+        if patched is None:
             self._log.error("Bottle feed event not found", event_id=event_id)
             raise HTTPException(
                 detail=f"Bottle feed event with ID {event_id} not found",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
+        self._log.debug("Bottle feed event patched successfully", event_id=event_id)
+
+        return self._translation.bottle_feed_model_to_schema(
+            model=models.FeedBottleEvent(**patched.values)
+        )
+
+    def delete_bottle_feed_event(self, event_id: str) -> None:
+        """Delete a bottle feed event by its ID."""
+        self._log.debug("Deleting bottle feed event", event_id=event_id)
+
         try:
-            self._db.delete(model)
+            deleted = delete_event_row(
+                self._db, models.FeedBottleEvent, event_id=event_id
+            )
+            if deleted is not None:
+                mark_changed(self._db, deleted.name, deleted.time_start)
+                record_change(self._db, ChangeAction.DELETED, deleted.name, deleted.id)
             self._db.commit()
         except Exception as e:
             self._log.error("Failed to delete bottle feed event", error=repr(e))
             self._db.rollback()
             raise
 
+        if deleted is None:
+            self._log.error("Bottle feed event not found", event_id=event_id)
+            raise HTTPException(
+                detail=f"Bottle feed event with ID {event_id} not found",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+
     def insert_breast_feed_event(
         self, event: schemas.FeedBreastEvent
     ) -> schemas.FeedBreastEvent:
@@ -159,8 +258,11 @@ class FeedPersistence:
 
         try:
             self._db.add(model)
+            mark_changed(self._db, EventType.FEED_BREAST, model.time_start)
+            record_change(
+                self._db, ChangeAction.CREATED, EventType.FEED_BREAST, model.id
+            )
             self._db.commit()
-            self._db.refresh(model)
         except Exception as e:
             self._log.error("Failed to insert breast feed event", error=repr(e))
             self._db.rollback()
@@ -170,6 +272,42 @@ class FeedPersistence:
 
         return self._translation.breast_feed_model_to_schema(model=model)
 
+    def insert_breast_feed_events(
+        self, events: Sequence[schemas.FeedBreastEvent]
+    ) -> list[schemas.FeedBreastEvent]:
+        """Insert several breast feed events in a single transaction."""
+        self._log.debug("Inserting breast feed events", count=len(events))
+
+        if not events:
+            return []
+
+        models_list = [
+            self._translation.breast_feed_schema_to_model(schema=event)
+            for event in events
+        ]
+
+        try:
+            self._db.add_all(models_list)
+            for model in models_list:
+                mark_changed(self._db, EventType.FEED_BREAST, model.time_start)
+                record_change(
+                    self._db, ChangeAction.CREATED, EventType.FEED_BREAST, model.id
+                )
+            self._db.commit()
+        except Exception as e:
+            self._log.error("Failed to insert breast feed events", error=repr(e))
+            self._db.rollback()
+            raise
+
+        inserted = [
+            self._translation.breast_feed_model_to_schema(model=model)
+            for model in models_list
+        ]
+
+        self._log.debug("Breast feed events inserted successfully", count=len(inserted))
+
+        return inserted
+
     def get_breast_feed_event(self, event_id: str) -> schemas.FeedBreastEvent:
         """Retrieve a breast feed event by its ID."""
         self._log.debug("Retrieving breast feed event", event_id=event_id)
@@ -192,30 +330,39 @@ class FeedPersistence:
         return self._translation.breast_feed_model_to_schema(model=model)
 
     def list_breast_feed_events(
-        self, limit: int = 100, offset: int = 0
-    ) -> Sequence[schemas.FeedBreastEvent]:
-        """List breast feed events with pagination."""
-        self._log.debug("Listing breast feed events", limit=limit, offset=offset)
+        self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None
+    ) -> tuple[Sequence[schemas.FeedBreastEvent], Optional[str]]:
+        """List breast feed events with pagination.
 
-        models_list = (
-            self._db.query(models.FeedBreastEvent)
-            .order_by(models.FeedBreastEvent.time_start.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        Returns the page and the cursor for the next page, if any.
+        """
+        self._log.debug(
+            "Listing breast feed events", limit=limit, offset=offset, cursor=cursor
+        )
+
+        models_list, next_cursor = paginate_newest_first(
+            self._db.query(models.FeedBreastEvent),
+            time_start_column=models.FeedBreastEvent.time_start,
+            id_column=models.FeedBreastEvent.id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
 
         if not models_list:
             self._log.info("No breast feed events found")
-            return []
+            return [], None
         self._log.debug(
             "Breast feed events listed successfully", count=len(models_list)
         )
 
-        return [
-            self._translation.breast_feed_model_to_schema(model=model)
-            for model in models_list
-        ]
+        return (
+            [
+                self._translation.breast_feed_model_to_schema(model=model)
+                for model in models_list
+            ],
+            next_cursor,
+        )
 
     def update_breast_feed_event(
         self, event_id: str, event: schemas.FeedBreastEvent
@@ -223,67 +370,108 @@ class FeedPersistence:
         """Update an existing breast feed event."""
         self._log.debug("Updating breast feed event", event_id=event_id, evt=event)
 
+        model = self._translation.breast_feed_schema_to_model(schema=event)
+        model.id = event_id
+
         try:
-            model = (
-                self._db.query(models.FeedBreastEvent)
-                .filter(models.FeedBreastEvent.id == event_id)
-                .first()
-            )
-        except LookupError as e:
-            self._log.error("Invalid event type", error=repr(e))
-            raise HTTPException(
-                detail=f"Invalid event type for ID {event_id}",
-                status_code=status.HTTP_400_BAD_REQUEST,
+            previous_time_start = update_event_row(
+                self._db,
+                models.FeedBreastEvent,
+                event_id=event_id,
+                values=model_column_values(model),
             )
+            if previous_time_start is not None:
+                mark_changed(self._db, EventType.FEED_BREAST, previous_time_start)
+                mark_changed(self._db, EventType.FEED_BREAST, model.time_start)
+                record_change(
+                    self._db, ChangeAction.UPDATED, EventType.FEED_BREAST, event_id
+                )
+            self._db.commit()
+        except Exception as e:
+            self._log.error("Failed to update breast feed event", error=repr(e))
+            self._db.rollback()
+            raise
 
-        if not model:
+        if previous_time_start is None:
             self._log.error("Breast feed event not found", event_id=event_id)
             raise HTTPException(
                 detail=f"Breast feed event with ID {event_id} not found",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
-        for key, value in event.model_dump().items():
-            if key != "id":  # Avoid changing the ID
-                set_attribute(model, key, value)
+        self._log.debug("Breast feed event updated successfully", model=model)
+
+        return self._translation.breast_feed_model_to_schema(model=model)
+
+    def patch_breast_feed_event(
+        self, event_id: str, patch: schemas.FeedBreastEventPatch
+    ) -> schemas.FeedBreastEvent:
+        """Change only the fields set on `patch` of an existing breast feed event."""
+        self._log.debug("Patching breast feed event", event_id=event_id, patch=patch)
+
+        values = EventModelSchemaTranslation.event_patch_to_values(patch)
 
         try:
+            patched = patch_event_row(
+                self._db, models.FeedBreastEvent, event_id=event_id, values=values
+            )
+
+            if patched is not None and not ROLLUP_COLUMNS.isdisjoint(values):
+                mark_changed(
+                    self._db, EventType.FEED_BREAST, patched.previous_time_start
+                )
+                mark_changed(
+                    self._db, EventType.FEED_BREAST, patched.values["time_start"]
+                )
+
+            if patched is not None:
+                record_change(
+                    self._db, ChangeAction.UPDATED, EventType.FEED_BREAST, event_id
+                )
+
             self._db.commit()
-            self._db.refresh(model)
         except Exception as e:
-            self._log.error("Failed to update breast feed event", error=repr(e))
+            self._log.error("Failed to patch breast feed event", error=repr(e))
             self._db.rollback()
             raise
 
-        self._log.debug("Breast feed event updated successfully", model=model)
-
-        return self._translation.breast_feed_model_to_schema(model=model)
-
-    def delete_breast_feed_event(self, event_id: str) -> None:
-        """Delete a breast feed event by its ID."""
-        self._log.debug("Deleting breast feed event", event_id=event_id)
-
-        model = (
-            self._db.query(models.FeedBreastEvent)
-            .filter(models.FeedBreastEvent.id == event_id)
-            .first()
-        )
-
-        if not model:
+        if patched is None:
             self._log.error("Breast feed event not found", event_id=event_id)
             raise HTTPException(
                 detail=f"Breast feed event with ID {event_id} not found",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
+        self._log.debug("Breast feed event patched successfully", event_id=event_id)
+
+        return self._translation.breast_feed_model_to_schema(
+            model=models.FeedBreastEvent(**patched.values)
+        )
+
+    def delete_breast_feed_event(self, event_id: str) -> None:
+        """Delete a breast feed event by its ID."""
+        self._log.debug("Deleting breast feed event", event_id=event_id)
+
         try:
-            self._db.delete(model)
+            deleted = delete_event_row(
+                self._db, models.FeedBreastEvent, event_id=event_id
+            )
+            if deleted is not None:
+                mark_changed(self._db, deleted.name, deleted.time_start)
+                record_change(self._db, ChangeAction.DELETED, deleted.name, deleted.id)
             self._db.commit()
         except Exception as e:
             self._log.error("Failed to delete breast feed event", error=repr(e))
             self._db.rollback()
             raise
 
+        if deleted is None:
+            self._log.error("Breast feed event not found", event_id=event_id)
+            raise HTTPException(
+                detail=f"Breast feed event with ID {event_id} not found",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+
         self._log.debug("Breast feed event deleted successfully", event_id=event_id)
 
         return None
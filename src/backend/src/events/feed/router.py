@@ -1,13 +1,18 @@
 """Router for feed-related events."""
 
-from fastapi import APIRouter, Depends
-from typing import Sequence
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
+from common.routing import TrustedResponseRoute
+from typing import Annotated, Optional, Sequence
+from pydantic import Field
+from config import config
 from events.feed.service import FeedService
 from events.feed import schemas
-from persistence.dependencies import get_db
+from events.schemas import BatchCreateResponse
+from persistence.dependencies import conditional_get, get_db, get_db_read_only
+from persistence.pagination import NEXT_CURSOR_HEADER
 
-router = APIRouter()
+router = APIRouter(route_class=TrustedResponseRoute)
 
 
 @router.post("/bottle", response_model=schemas.FeedBottleEvent)
@@ -19,20 +24,58 @@ def create_bottle_feed_event(
     return service.create_bottle_feed_event(event=event)
 
 
-@router.get("/bottle/{event_id}", response_model=schemas.FeedBottleEvent)
-def get_bottle_feed_event(event_id: str, db: Session = Depends(get_db)):
+@router.post(
+    "/bottle/batch", response_model=BatchCreateResponse[schemas.FeedBottleEvent]
+)
+def create_bottle_feed_events(
+    events: Annotated[
+        list[schemas.FeedBottleEventBatchItem], Field(max_length=config.max_batch_size)
+    ],
+    db: Session = Depends(get_db),
+):
+    """Create several bottle feed events in one transaction.
+
+    If any item fails validation nothing is created; the errors locate the items by
+    index.
+    """
+    service = FeedService(db=db)
+    return service.create_bottle_feed_events(events=events)
+
+
+@router.get(
+    "/bottle/{event_id}",
+    response_model=schemas.FeedBottleEvent,
+    dependencies=[Depends(conditional_get)],
+)
+def get_bottle_feed_event(event_id: str, db: Session = Depends(get_db_read_only)):
     """Retrieve a bottle feed event by its ID."""
     service = FeedService(db=db)
     return service.get_bottle_feed_event(event_id=event_id)
 
 
-@router.get("/bottle", response_model=Sequence[schemas.FeedBottleEvent])
+@router.get(
+    "/bottle",
+    response_model=Sequence[schemas.FeedBottleEvent],
+    dependencies=[Depends(conditional_get)],
+)
 def list_bottle_feed_events(
-    limit: int = 100, offset: int = 0, db: Session = Depends(get_db)
+    response: Response,
+    limit: int = 100,
+    offset: int = 0,
+    cursor: Optional[str] = Query(
+        None,
+        description=f"`{NEXT_CURSOR_HEADER}` header of the previous page. Takes precedence over offset.",
+    ),
+    db: Session = Depends(get_db_read_only),
 ):
     """List bottle feed events with pagination."""
     service = FeedService(db=db)
-    return service.list_bottle_feed_events(limit=limit, offset=offset)
+    events, next_cursor = service.list_bottle_feed_events(
+        limit=limit, offset=offset, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return events
 
 
 @router.put("/bottle/{event_id}", response_model=schemas.FeedBottleEvent)
@@ -44,6 +87,17 @@ def update_bottle_feed_event(
     return service.update_bottle_feed_event(event_id=event_id, event=event)
 
 
+@router.patch("/bottle/{event_id}", response_model=schemas.FeedBottleEvent)
+def patch_bottle_feed_event(
+    event_id: str,
+    patch: schemas.FeedBottleEventPatch,
+    db: Session = Depends(get_db),
+):
+    """Change only the fields present in the request body of a bottle feed event."""
+    service = FeedService(db=db)
+    return service.patch_bottle_feed_event(event_id=event_id, patch=patch)
+
+
 @router.delete("/bottle/{event_id}")
 def delete_bottle_feed_event(event_id: str, db: Session = Depends(get_db)):
     """Delete a bottle feed event by its ID."""
@@ -61,20 +115,58 @@ def create_breast_feed_event(
     return service.create_breast_feed_event(event=event)
 
 
-@router.get("/breast/{event_id}", response_model=schemas.FeedBreastEvent)
-def get_breast_feed_event(event_id: str, db: Session = Depends(get_db)):
+@router.post(
+    "/breast/batch", response_model=BatchCreateResponse[schemas.FeedBreastEvent]
+)
+def create_breast_feed_events(
+    events: Annotated[
+        list[schemas.FeedBreastEventBatchItem], Field(max_length=config.max_batch_size)
+    ],
+    db: Session = Depends(get_db),
+):
+    """Create several breast feed events in one transaction.
+
+    If any item fails validation nothing is created; the errors locate the items by
+    index.
+    """
+    service = FeedService(db=db)
+    return service.create_breast_feed_events(events=events)
+
+
+@router.get(
+    "/breast/{event_id}",
+    response_model=schemas.FeedBreastEvent,
+    dependencies=[Depends(conditional_get)],
+)
+def get_breast_feed_event(event_id: str, db: Session = Depends(get_db_read_only)):
     """Retrieve a breast feed event by its ID."""
     service = FeedService(db=db)
     return service.get_breast_feed_event(event_id=event_id)
 
 
-@router.get("/breast", response_model=Sequence[schemas.FeedBreastEvent])
+@router.get(
+    "/breast",
+    response_model=Sequence[schemas.FeedBreastEvent],
+    dependencies=[Depends(conditional_get)],
+)
 def list_breast_feed_events(
-    limit: int = 100, offset: int = 0, db: Session = Depends(get_db)
+    response: Response,
+    limit: int = 100,
+    offset: int = 0,
+    cursor: Optional[str] = Query(
+        None,
+        description=f"`{NEXT_CURSOR_HEADER}` header of the previous page. Takes precedence over offset.",
+    ),
+    db: Session = Depends(get_db_read_only),
 ):
     """List breast feed events with pagination."""
     service = FeedService(db=db)
-    return service.list_breast_feed_events(limit=limit, offset=offset)
+    events, next_cursor = service.list_breast_feed_events(
+        limit=limit, offset=offset, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return events
 
 
 @router.put("/breast/{event_id}", response_model=schemas.FeedBreastEvent)
@@ -86,6 +178,17 @@ def update_breast_feed_event(
     return service.update_breast_feed_event(event_id=event_id, event=event)
 
 
+@router.patch("/breast/{event_id}", response_model=schemas.FeedBreastEvent)
+def patch_breast_feed_event(
+    event_id: str,
+    patch: schemas.FeedBreastEventPatch,
+    db: Session = Depends(get_db),
+):
+    """Change only the fields present in the request body of a breast feed event."""
+    service = FeedService(db=db)
+    return service.patch_breast_feed_event(event_id=event_id, patch=patch)
+
+
 @router.delete("/breast/{event_id}")
 def delete_breast_feed_event(event_id: str, db: Session = Depends(get_db)):
     """Delete a breast feed event by its ID."""
@@ -1,5 +1,5 @@
 from pydantic import Field
-from events.schemas import Event
+from events.schemas import Event, EventPatch
 from enum import Enum
 from events.schemas import EventType
 
@@ -22,6 +22,21 @@ class FeedBottleEvent(Event):
     is_formula: bool  # True if formula, false if breast milk
 
 
+class FeedBottleEventBatchItem(FeedBottleEvent):
+    """A bottle feeding event of a batch create; the server assigns the ID."""
+
+    id: str = ""
+
+
+class FeedBottleEventPatch(EventPatch):
+    """Partial update of a bottle feeding event."""
+
+    non_nullable_fields = EventPatch.non_nullable_fields | {"amount_ml", "is_formula"}
+
+    amount_ml: int | None = None
+    is_formula: bool | None = None
+
+
 class FeedBreastEvent(Event):
     """Event for breastfeeding."""
 
@@ -29,3 +44,17 @@ class FeedBreastEvent(Event):
     description: str = Field(default="Breastfeeding event", frozen=True)
 
     side: BreastSide = BreastSide.BOTH
+
+
+class FeedBreastEventBatchItem(FeedBreastEvent):
+    """A breastfeeding event of a batch create; the server assigns the ID."""
+
+    id: str = ""
+
+
+class FeedBreastEventPatch(EventPatch):
+    """Partial update of a breastfeeding event."""
+
+    non_nullable_fields = EventPatch.non_nullable_fields | {"side"}
+
+    side: BreastSide | None = None
@@ -1,8 +1,9 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from common.service import CommonService
 from sqlalchemy.orm import Session
 from events.feed.model_schema_translation import FeedModelSchemaTranslation
 from events.feed import schemas
+from events.schemas import BatchCreateResponse
 from ulid import ULID
 from events.feed.persistence import FeedPersistence
 
@@ -34,6 +35,19 @@ class FeedService(CommonService):
 
         return inserted_event
 
+    def create_bottle_feed_events(
+        self, events: Sequence[schemas.FeedBottleEvent]
+    ) -> BatchCreateResponse[schemas.FeedBottleEvent]:
+        """Create several bottle feed events at once, inserted together in one transaction."""
+        self._log.debug("Creating bottle feed events", count=len(events))
+
+        for event in events:
+            event.id = str(ULID())
+
+        inserted_events = self._persistence.insert_bottle_feed_events(events=events)
+
+        return BatchCreateResponse[schemas.FeedBottleEvent](created=inserted_events)
+
     def get_bottle_feed_event(self, event_id: str) -> schemas.FeedBottleEvent:
         """Retrieve a bottle feed event by its ID."""
         self._log.debug("Retrieving bottle feed event", event_id=event_id)
@@ -41,12 +55,19 @@ class FeedService(CommonService):
         return self._persistence.get_bottle_feed_event(event_id=event_id)
 
     def list_bottle_feed_events(
-        self, limit: int = 100, offset: int = 0
-    ) -> Sequence[schemas.FeedBottleEvent]:
-        """List bottle feed events with pagination."""
-        self._log.debug("Listing bottle feed events", limit=limit, offset=offset)
+        self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None
+    ) -> tuple[Sequence[schemas.FeedBottleEvent], Optional[str]]:
+        """List bottle feed events with pagination.
 
-        return self._persistence.list_bottle_feed_events(limit=limit, offset=offset)
+        Returns the page and the cursor for the next page, if any.
+        """
+        self._log.debug(
+            "Listing bottle feed events", limit=limit, offset=offset, cursor=cursor
+        )
+
+        return self._persistence.list_bottle_feed_events(
+            limit=limit, offset=offset, cursor=cursor
+        )
 
     def update_bottle_feed_event(
         self, event_id: str, event: schemas.FeedBottleEvent
@@ -58,6 +79,14 @@ class FeedService(CommonService):
             event_id=event_id, event=event
         )
 
+    def patch_bottle_feed_event(
+        self, event_id: str, patch: schemas.FeedBottleEventPatch
+    ) -> schemas.FeedBottleEvent:
+        """Change only the given fields of an existing bottle feed event."""
+        self._log.debug("Patching bottle feed event", event_id=event_id, patch=patch)
+
+        return self._persistence.patch_bottle_feed_event(event_id=event_id, patch=patch)
+
     def delete_bottle_feed_event(self, event_id: str) -> None:
         """Delete a bottle feed event by its ID."""
         self._log.debug("Deleting bottle feed event", event_id=event_id)
@@ -76,6 +105,19 @@ class FeedService(CommonService):
 
         return inserted_event
 
+    def create_breast_feed_events(
+        self, events: Sequence[schemas.FeedBreastEvent]
+    ) -> BatchCreateResponse[schemas.FeedBreastEvent]:
+        """Create several breast feed events at once, inserted together in one transaction."""
+        self._log.debug("Creating breast feed events", count=len(events))
+
+        for event in events:
+            event.id = str(ULID())
+
+        inserted_events = self._persistence.insert_breast_feed_events(events=events)
+
+        return BatchCreateResponse[schemas.FeedBreastEvent](created=inserted_events)
+
     def get_breast_feed_event(self, event_id: str) -> schemas.FeedBreastEvent:
         """Retrieve a breast feed event by its ID."""
         self._log.debug("Retrieving breast feed event", event_id=event_id)
@@ -83,12 +125,19 @@ class FeedService(CommonService):
         return self._persistence.get_breast_feed_event(event_id=event_id)
 
     def list_breast_feed_events(
-        self, limit: int = 100, offset: int = 0
-    ) -> Sequence[schemas.FeedBreastEvent]:
-        """List breast feed events with pagination."""
-        self._log.debug("Listing breast feed events", limit=limit, offset=offset)
+        self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None
+    ) -> tuple[Sequence[schemas.FeedBreastEvent], Optional[str]]:
+        """List breast feed events with pagination.
 
-        return self._persistence.list_breast_feed_events(limit=limit, offset=offset)
+        Returns the page and the cursor for the next page, if any.
+        """
+        self._log.debug(
+            "Listing breast feed events", limit=limit, offset=offset, cursor=cursor
+        )
+
+        return self._persistence.list_breast_feed_events(
+            limit=limit, offset=offset, cursor=cursor
+        )
 
     def update_breast_feed_event(
         self, event_id: str, event: schemas.FeedBreastEvent
@@ -100,6 +149,14 @@ class FeedService(CommonService):
             event_id=event_id, event=event
         )
 
+    def patch_breast_feed_event(
+        self, event_id: str, patch: schemas.FeedBreastEventPatch
+    ) -> schemas.FeedBreastEvent:
+        """Change only the given fields of an existing breast feed event."""
+        self._log.debug("Patching breast feed event", event_id=event_id, patch=patch)
+
+        return self._persistence.patch_breast_feed_event(event_id=event_id, patch=patch)
+
     def delete_breast_feed_event(self, event_id: str) -> None:
         """Delete a breast feed event by its ID."""
         self._log.debug("Deleting breast feed event", event_id=event_id)
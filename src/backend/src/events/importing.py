@@ -0,0 +1,261 @@
+"""Reading and validating event files for the bulk import.
+
+The import reads the formats written by the export (`GET /events/export`): NDJSON
+with one event object per line, or CSV with a header row. A row is validated
+against the schema of its `name` (e.g. `pump` rows against `PumpEvent`), so it is
+accepted exactly when the create endpoint of its type would accept it. Empty CSV
+cells count as missing, which lets a CSV file hold rows of several types side by
+side.
+
+Files are read line by line, so only the current row is held in memory.
+
+The module also imports a file from the command line, `batch_size` events per
+transaction, logging progress after every batch and writing the rejected rows as
+NDJSON next to the file:
+
+```
+PYTHONPATH=src python -m events.importing events.csv --batch-size 5000
+```
+
+In household mode (see `persistence.households`) the file is imported into the
+database of the household passed with `--household`.
+
+A running server sees the imported events right away: the ETags of its conditional
+GETs follow the change log, which the import writes to. Its cached totals follow the
+file's data version on SQLite (see `DatabaseConfig.data_version`); on other
+databases they may be stale for up to `config.event_count_cache_ttl_seconds`.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, cast
+
+from pydantic import ValidationError
+from structlog import get_logger
+from ulid import ULID
+
+from events.diaper.schemas import DiaperEvent
+from events.feed.schemas import FeedBottleEvent, FeedBreastEvent
+from events.pump.schemas import PumpEvent
+from events.schemas import Event, EventType, ExportFormat, ImportRowError
+
+# Schema each row is validated against, by the event type in its `name`.
+IMPORT_SCHEMAS: dict[EventType, type[Event]] = {
+    EventType.FEED_BOTTLE: FeedBottleEvent,
+    EventType.FEED_BREAST: FeedBreastEvent,
+    EventType.DIAPER_CHANGE: DiaperEvent,
+    EventType.PUMP: PumpEvent,
+}
+
+log = get_logger()
+
+# A row, or the error (shaped like a pydantic error) of a row that cannot be read.
+ParsedRow = tuple[int, Optional[dict[str, Any]], Optional[dict[str, Any]]]
+
+
+def _error(error_type: str, msg: str, loc: tuple = ()) -> dict[str, Any]:
+    """An error in the shape of pydantic's `ValidationError.errors()` items."""
+    return {"type": error_type, "loc": loc, "msg": msg}
+
+
+def _records(lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+    """Join lines into CSV records, numbered by their first line.
+
+    A quoted CSV value may span lines; a record is complete once its quotes are
+    balanced (an escaped quote is written as two).
+    """
+    pending: list[str] = []
+    quotes = 0
+    start = 0
+
+    for number, line in enumerate(lines, start=1):
+        if not pending:
+            start = number
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield start, "".join(pending)
+            pending.clear()
+            quotes = 0
+
+    if pending:
+        yield start, "".join(pending)
+
+
+def _read_ndjson(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, _error("json_invalid", f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield number, None, _error("dict_type", "Line is not a JSON object")
+            continue
+        yield number, row, None
+
+
+def _read_csv(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    header: Optional[list[str]] = None
+
+    for number, record in _records(lines):
+        if not record.strip():
+            continue
+        try:
+            (values,) = csv.reader([record])
+        except (csv.Error, ValueError) as e:
+            yield number, None, _error("csv_invalid", f"Invalid CSV: {e}")
+            continue
+
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        if len(values) != len(header):
+            yield (
+                number,
+                None,
+                _error(
+                    "csv_invalid",
+                    f"Expected {len(header)} values, found {len(values)}",
+                ),
+            )
+            continue
+
+        yield number, {k: v for k, v in zip(header, values) if v != ""}, None
+
+
+def read_rows(lines: Iterable[str], file_format: ExportFormat) -> Iterator[ParsedRow]:
+    """Read the rows of an event file one at a time.
+
+    Args:
+        lines: Lines of the file, with or without their line endings.
+        file_format: Format of the file.
+
+    Yields:
+        (line number, row, None) for every row, or (line number, None, error) for a
+        row that cannot be read. Blank lines are skipped.
+    """
+    if file_format == ExportFormat.CSV:
+        return _read_csv(lines)
+
+    return _read_ndjson(lines)
+
+
+def validate_row(
+    row: dict[str, Any], default_type: Optional[EventType] = None
+) -> tuple[Optional[Event], list[dict[str, Any]]]:
+    """Validate a row against the schema of its event type.
+
+    The event gets a new ID; an `id` in the row is ignored, as in the create
+    endpoints.
+
+    Args:
+        row: The row as read by `read_rows`.
+        default_type: Type of rows that have no `name`.
+
+    Returns:
+        (event, []) for a valid row, (None, errors) otherwise.
+    """
+    name = row.get("name", default_type)
+
+    try:
+        schema = IMPORT_SCHEMAS[EventType(name)]
+    except ValueError:
+        allowed = ", ".join(event_type.value for event_type in IMPORT_SCHEMAS)
+        return None, [
+            _error("enum", f"Input should be one of: {allowed}", loc=("name",))
+        ]
+
+    try:
+        return schema.model_validate({**row, "id": str(ULID())}), []
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False)
+        return None, cast(list[dict[str, Any]], errors)
+
+
+def main() -> None:
+    """Import an event file into the configured database."""
+    from events.service import EventService
+    from persistence.households import (
+        household_mode,
+        is_valid_household,
+        session_factory,
+    )
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("file", type=Path, help="NDJSON or CSV file to import.")
+    parser.add_argument(
+        "--format",
+        choices=[file_format.value for file_format in ExportFormat],
+        help="Format of the file. Defaults to csv for .csv files, ndjson otherwise.",
+    )
+    parser.add_argument(
+        "--type",
+        choices=[event_type.value for event_type in EventType],
+        help="Type of the rows that have no `name`.",
+    )
+    parser.add_argument(
+        "--household", help="Household to import into, required in household mode."
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--rejected",
+        type=Path,
+        help="Where to write the rejected rows. Defaults to <file>.rejected.ndjson.",
+    )
+    args = parser.parse_args()
+
+    if household_mode() and (
+        args.household is None or not is_valid_household(args.household)
+    ):
+        parser.error("a valid --household is required in household mode")
+
+    SessionLocal = session_factory(args.household if household_mode() else None)
+
+    if args.format:
+        file_format = ExportFormat(args.format)
+    elif args.file.suffix.lower() == ".csv":
+        file_format = ExportFormat.CSV
+    else:
+        file_format = ExportFormat.NDJSON
+    rejected_path = args.rejected or args.file.with_name(
+        f"{args.file.name}.rejected.ndjson"
+    )
+
+    with (
+        open(args.file, encoding="utf-8-sig", errors="replace", newline="") as lines,
+        open(rejected_path, "w", encoding="utf-8") as rejected,
+        SessionLocal() as db,
+    ):
+
+        def write_rejected(error: ImportRowError) -> None:
+            rejected.write(error.model_dump_json() + "\n")
+
+        report = EventService(db=db).import_events(
+            lines=lines,
+            import_format=file_format,
+            default_type=EventType(args.type) if args.type else None,
+            batch_size=args.batch_size,
+            max_errors=0,
+            on_rejected=write_rejected,
+        )
+
+    log.info(
+        "Imported events",
+        imported=report.imported,
+        rejected=report.rejected,
+        rejected_rows=str(rejected_path),
+    )
+
+    if report.rejected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """Translation of model schemas for events."""
 
+from typing import Any
 from events import schemas, models
 import datetime
 
@@ -36,3 +37,14 @@ class EventModelSchemaTranslation:
             time_end=schema.time_end.replace(tzinfo=None) if schema.time_end else None,
             notes=schema.notes,
         )
+
+    @staticmethod
+    def event_patch_to_values(schema: schemas.EventPatch) -> dict[str, Any]:
+        """Convert the fields set on an EventPatch schema to model column values."""
+        values = schema.model_dump(exclude_unset=True)
+
+        for key in ("time_start", "time_end"):
+            if values.get(key) is not None:
+                values[key] = values[key].replace(tzinfo=datetime.UTC)
+
+        return values
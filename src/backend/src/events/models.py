@@ -1,7 +1,7 @@
-from events.schemas import EventType
+from events.schemas import ChangeAction, EventType
 from persistence.database import Base
 from datetime import datetime
-from sqlalchemy import DateTime, Enum
+from sqlalchemy import DateTime, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -14,11 +14,16 @@ class Event(Base):
     name: Mapped[EventType] = mapped_column(Enum(EventType), index=True)
     description: Mapped[str] = mapped_column(index=True)
     time_start: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        DateTime(timezone=True), nullable=False, index=True
     )
     time_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     notes: Mapped[str] = mapped_column(nullable=True)
 
+    __table_args__ = (
+        # Serves "newest N events of type X" and per-type time range queries.
+        Index("ix_events_name_time_start", "name", "time_start"),
+    )
+
     __mapper_args__ = {
         "polymorphic_on": name,
         "polymorphic_identity": EventType.__base__,
@@ -29,3 +34,27 @@ class Event(Base):
 
     def __str__(self):
         return f"Event {self.name} at {self.time_start}"
+
+
+class EventChangeLog(Base):
+    """The latest change of every event, in commit order.
+
+    Written by `persistence.change_feed` in the transaction that changes the event.
+    Each event keeps only its latest row, so the table grows with the number of
+    events rather than of changes; a deleted event keeps its row as a tombstone.
+    """
+
+    __tablename__ = "event_changes"
+
+    # Numbers the changes in commit order. AUTOINCREMENT keeps SQLite from reusing
+    # the number of a row that was replaced by a later change.
+    seq: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    event_id: Mapped[str] = mapped_column(unique=True)
+    event_type: Mapped[EventType] = mapped_column(Enum(EventType))
+    action: Mapped[ChangeAction] = mapped_column(Enum(ChangeAction))
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    def __repr__(self):
+        return f"<EventChangeLog(seq={self.seq}, event_id={self.event_id}, action={self.action})>"
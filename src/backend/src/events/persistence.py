@@ -1,11 +1,45 @@
-from typing import Optional, Sequence
-from sqlalchemy.orm import Session
+from typing import Any, Callable, Iterator, Optional, Sequence
+from sqlalchemy import ColumnElement, RowMapping, func, insert, select
+from sqlalchemy.orm import Session, class_mapper, with_polymorphic
 from structlog import get_logger
 from events.model_schema_translation import EventModelSchemaTranslation
 from events import schemas, models
+from events.diaper.model_schema_translation import DiaperModelSchemaTranslation
+from events.feed.model_schema_translation import FeedModelSchemaTranslation
+from events.pump.model_schema_translation import PumpModelSchemaTranslation
 from fastapi import HTTPException, status
-from sqlalchemy.orm.attributes import set_attribute
+from persistence.change_feed import record_change
+from persistence.count_cache import event_count_cache
+from persistence.households import HOUSEHOLD_KEY, database_config
+from persistence.direct_delete import delete_event_row, delete_event_rows
+from persistence.direct_update import model_column_values, update_event_row
+from persistence.pagination import paginate_newest_first
+from stats.rollups import mark_changed
 import datetime
+import functools
+
+# Rows fetched from the database cursor at a time while exporting.
+EXPORT_BATCH_SIZE = 1000
+
+# Converts an event schema of each type to its model.
+_SCHEMA_TO_MODEL: dict[schemas.EventType, Callable[[Any], models.Event]] = {
+    schemas.EventType.FEED_BOTTLE: FeedModelSchemaTranslation.bottle_feed_schema_to_model,
+    schemas.EventType.FEED_BREAST: FeedModelSchemaTranslation.breast_feed_schema_to_model,
+    schemas.EventType.DIAPER_CHANGE: DiaperModelSchemaTranslation.schema_to_model,
+    schemas.EventType.PUMP: PumpModelSchemaTranslation.schema_to_model,
+}
+
+
+@functools.cache
+def export_columns() -> dict[schemas.EventType, tuple[str, ...]]:
+    """Keys of the subclass columns of every event type, in table order."""
+    return {
+        schemas.EventType(mapper.polymorphic_identity): tuple(
+            column.key for column in mapper.local_table.columns if column.key != "id"
+        )
+        for mapper in models.Event.__mapper__.self_and_descendants
+        if mapper is not models.Event.__mapper__
+    }
 
 
 class EventPersistence:
@@ -22,9 +56,9 @@ class EventPersistence:
 
         try:
             self._db.add(model)
+            record_change(self._db, schemas.ChangeAction.CREATED, event.name, model.id)
 
             self._db.commit()
-            self._db.refresh(model)
         except Exception as e:
             self._log.error("Failed to insert event", error=repr(e))
             self._db.rollback()
@@ -34,6 +68,39 @@ class EventPersistence:
 
         return self._translation.event_model_to_schema(model=model)
 
+    def insert_events(self, events: Sequence[schemas.Event]) -> None:
+        """Insert events of any type in a single transaction.
+
+        The events are written with one bulk INSERT per type and table, rather
+        than flushed one by one, and are not read back, which keeps large imports
+        cheap.
+        """
+        self._log.debug("Inserting events", count=len(events))
+
+        if not events:
+            return
+
+        values_by_model: dict[type, list[dict[str, Any]]] = {}
+
+        for event in events:
+            model = _SCHEMA_TO_MODEL[event.name](event)
+            values_by_model.setdefault(type(model), []).append(
+                {"id": model.id, **model_column_values(model)}
+            )
+            mark_changed(self._db, event.name, model.time_start)
+            record_change(self._db, schemas.ChangeAction.CREATED, event.name, model.id)
+
+        try:
+            for model_class, values in values_by_model.items():
+                self._db.execute(insert(model_class), values)
+            self._db.commit()
+        except Exception as e:
+            self._log.error("Failed to insert events", error=repr(e))
+            self._db.rollback()
+            raise
+
+        self._log.debug("Events inserted successfully", count=len(events))
+
     def get_event(self, event_id: str) -> schemas.Event:
         """Retrieve a event by its ID."""
         self._log.debug("Retrieving event", event_id=event_id)
@@ -57,11 +124,15 @@ class EventPersistence:
         offset: int = 0,
         start_time: Optional[datetime.datetime] = None,
         end_time: Optional[datetime.datetime] = None,
-    ) -> tuple[int, Sequence[models.Event]]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> tuple[Optional[int], Sequence[models.Event], Optional[str]]:
         """List events with pagination and time window filtering.
 
         Returns raw models, not schemas, so that the caller can handle polymorphism
-        and optionally get the full model details.
+        and optionally get the full model details. The cursor for the next page is
+        returned alongside, and takes precedence over `offset` when passed back.
+        The total is None when `include_total` is False.
         """
         self._log.debug(
             "Listing events",
@@ -69,66 +140,219 @@ class EventPersistence:
             offset=offset,
             start_time=start_time,
             end_time=end_time,
+            cursor=cursor,
+            include_total=include_total,
         )
 
-        query = self._db.query(models.Event)
+        filters: list[ColumnElement[bool]] = []
 
         if start_time:
-            query = query.filter(models.Event.time_start >= start_time)
+            filters.append(models.Event.time_start >= start_time)
 
         if end_time:
-            query = query.filter(models.Event.time_start <= end_time)
+            filters.append(models.Event.time_start <= end_time)
 
-        total = query.count()
+        total = (
+            self._count_events(filters, start_time=start_time, end_time=end_time)
+            if include_total
+            else None
+        )
 
-        models_list = (
-            query.order_by(models.Event.time_start.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        # Load every subclass table in the same SELECT (LEFT OUTER JOINs) so that
+        # reading subclass columns later does not lazily issue one query per row.
+        event_entity = with_polymorphic(models.Event, "*")
+
+        models_list, next_cursor = paginate_newest_first(
+            self._db.query(event_entity).filter(*filters),
+            time_start_column=models.Event.time_start,
+            id_column=models.Event.id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
 
         if not models_list:
             self._log.info("No events found")
-            return 0, []
+            return (0 if include_total else None), [], None
         self._log.debug("Events listed successfully", count=len(models_list))
 
-        return total, models_list
+        return total, models_list, next_cursor
 
-    def update_event(self, event_id: str, event: schemas.Event) -> schemas.Event:
-        """Update an existing event."""
-        self._log.debug("Updating event", event_id=event_id, evt=event)
+    def export_events(
+        self,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+        event_types: Optional[Sequence[schemas.EventType]] = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> Iterator[Sequence[RowMapping]]:
+        """Stream all events with the columns of their subclass, oldest first.
+
+        Every subclass table is LEFT OUTER JOINed in one query, and a column that
+        several subclasses have (e.g. `amount_ml`) is read into a single key, see
+        `export_columns`. The rows are fetched from a server-side cursor
+        `batch_size` at a time, so memory use does not grow with the number of
+        events.
+
+        Yields:
+            Batches of at most `batch_size` rows, keyed by column.
+        """
+        self._log.debug(
+            "Exporting events",
+            start_time=start_time,
+            end_time=end_time,
+            event_types=event_types,
+            batch_size=batch_size,
+        )
 
-        try:
-            model = (
-                self._db.query(models.Event).filter(models.Event.id == event_id).first()
-            )
-        except LookupError as e:
-            self._log.error("Invalid event type", error=repr(e))
-            raise HTTPException(
-                detail=f"Invalid event type for ID {event_id}",
-                status_code=status.HTTP_400_BAD_REQUEST,
+        events = models.Event.__table__
+        joined = events
+        subclass_columns: dict[str, list[ColumnElement]] = {}
+
+        for mapper in models.Event.__mapper__.self_and_descendants:
+            table = mapper.local_table
+            if table is events:
+                continue
+            joined = joined.outerjoin(table, table.c.id == events.c.id)
+            for column in table.columns:
+                if column.key != "id":
+                    subclass_columns.setdefault(column.key, []).append(column)
+
+        # A row has values in at most one subclass table, so coalescing a shared
+        # column picks the value of the subclass the event belongs to.
+        query = (
+            select(
+                *events.columns,
+                *(
+                    (
+                        columns[0] if len(columns) == 1 else func.coalesce(*columns)
+                    ).label(key)
+                    for key, columns in subclass_columns.items()
+                ),
             )
+            .select_from(joined)
+            .order_by(events.c.time_start, events.c.id)
+        )
 
-        if not model:
-            self._log.error("Event not found", event_id=event_id)
-            raise HTTPException(
-                detail=f"Event with ID {event_id} not found",
-                status_code=status.HTTP_404_NOT_FOUND,
+        if start_time:
+            query = query.where(events.c.time_start >= start_time)
+
+        if end_time:
+            query = query.where(events.c.time_start <= end_time)
+
+        if event_types:
+            query = query.where(events.c.name.in_(event_types))
+
+        result = self._db.execute(query.execution_options(yield_per=batch_size))
+
+        try:
+            yield from result.mappings().partitions()
+        finally:
+            result.close()
+
+    def list_changes(
+        self, since: int = 0, limit: int = 500
+    ) -> tuple[list[tuple[models.EventChangeLog, Optional[models.Event]]], bool]:
+        """List the logged changes after `since`, oldest first.
+
+        Returns the changes, each with its event unless it was deleted, and whether
+        more changes follow.
+        """
+        self._log.debug("Listing changes", since=since, limit=limit)
+
+        changes = (
+            self._db.query(models.EventChangeLog)
+            .filter(models.EventChangeLog.seq > since)
+            .order_by(models.EventChangeLog.seq)
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        event_ids = [
+            change.event_id
+            for change in changes
+            if change.action != schemas.ChangeAction.DELETED
+        ]
+        events_by_id = {
+            event.id: event
+            for event in self._db.query(with_polymorphic(models.Event, "*")).filter(
+                models.Event.id.in_(event_ids)
             )
+        }
+
+        self._log.debug("Changes listed successfully", count=len(changes))
+
+        return [
+            (change, events_by_id.get(change.event_id)) for change in changes
+        ], has_more
+
+    def _count_events(
+        self,
+        filters: list[ColumnElement[bool]],
+        start_time: Optional[datetime.datetime],
+        end_time: Optional[datetime.datetime],
+    ) -> int:
+        """Count the events in a time window, served from the count cache if possible."""
+        household = self._db.info.get(HOUSEHOLD_KEY)
+        cache_key = (
+            household,
+            database_config(household).data_version(),
+            start_time,
+            end_time,
+        )
+        generation = event_count_cache.generation
+
+        total = event_count_cache.get(cache_key)
 
-        for key, value in event.model_dump().items():
-            if key != "id":  # Avoid changing the ID
-                set_attribute(model, key, value)
+        if total is not None:
+            self._log.debug("Event count served from cache", total=total)
+            return total
+
+        # Count against the base table only; the subclass tables are not needed
+        # to determine the number of matching events.
+        total = self._db.query(models.Event).filter(*filters).count()
+
+        event_count_cache.set(cache_key, total, generation)
+
+        return total
+
+    def update_event(self, event_id: str, event: schemas.Event) -> schemas.Event:
+        """Update the shared fields of an existing event of type `event.name`."""
+        self._log.debug("Updating event", event_id=event_id, evt=event)
+
+        model = self._translation.event_schema_to_model(schema=event)
+        model.id = event_id
+        # The event must already have the type named in the request; an event of
+        # another type is not found rather than changed into it.
+        model_class = class_mapper(models.Event).polymorphic_map[event.name].class_
 
         try:
+            previous_time_start = update_event_row(
+                self._db,
+                model_class,
+                event_id=event_id,
+                values=model_column_values(model),
+            )
+            if previous_time_start is not None:
+                mark_changed(self._db, event.name, previous_time_start)
+                mark_changed(self._db, event.name, model.time_start)
+                record_change(
+                    self._db, schemas.ChangeAction.UPDATED, event.name, event_id
+                )
             self._db.commit()
-            self._db.refresh(model)
         except Exception as e:
             self._log.error("Failed to update event", error=repr(e))
             self._db.rollback()
             raise
 
+        if previous_time_start is None:
+            self._log.error("Event not found", event_id=event_id)
+            raise HTTPException(
+                detail=f"Event with ID {event_id} not found",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+
         self._log.debug("Event updated successfully", model=model)
 
         return self._translation.event_model_to_schema(model=model)
@@ -137,23 +361,48 @@ class EventPersistence:
         """Delete a event by its ID."""
         self._log.debug("Deleting event", event_id=event_id)
 
-        model = self._db.query(models.Event).filter(models.Event.id == event_id).first()
+        try:
+            deleted = delete_event_row(self._db, models.Event, event_id=event_id)
+            if deleted is not None:
+                mark_changed(self._db, deleted.name, deleted.time_start)
+                record_change(
+                    self._db, schemas.ChangeAction.DELETED, deleted.name, deleted.id
+                )
+            self._db.commit()
+        except Exception as e:
+            self._log.error("Failed to delete event", error=repr(e))
+            self._db.rollback()
+            raise
 
-        if not model:
+        if deleted is None:
             self._log.error("Event not found", event_id=event_id)
             raise HTTPException(
                 detail=f"Event with ID {event_id} not found",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
+        self._log.debug("Event deleted successfully", event_id=event_id)
+
+        return None
+
+    def delete_events(self, event_ids: Sequence[str]) -> list[str]:
+        """Delete several events of any type in one transaction.
+
+        Returns the IDs that were deleted; IDs without an event are left out.
+        """
+        self._log.debug("Deleting events", count=len(event_ids))
+
         try:
-            self._db.delete(model)
+            deleted = delete_event_rows(self._db, models.Event, event_ids=event_ids)
+            for row in deleted:
+                mark_changed(self._db, row.name, row.time_start)
+                record_change(self._db, schemas.ChangeAction.DELETED, row.name, row.id)
             self._db.commit()
         except Exception as e:
-            self._log.error("Failed to delete event", error=repr(e))
+            self._log.error("Failed to delete events", error=repr(e))
             self._db.rollback()
             raise
 
-        self._log.debug("Event deleted successfully", event_id=event_id)
+        self._log.debug("Events deleted successfully", count=len(deleted))
 
-        return None
+        return [row.id for row in deleted]
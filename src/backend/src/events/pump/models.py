@@ -9,7 +9,9 @@ class PumpEvent(models.Event):
 
     __tablename__ = "pump_events"
 
-    id: Mapped[str] = mapped_column(ForeignKey("events.id"), primary_key=True)
+    id: Mapped[str] = mapped_column(
+        ForeignKey("events.id", ondelete="CASCADE"), primary_key=True
+    )
     amount_ml: Mapped[float] = mapped_column(nullable=False)
 
     __mapper_args__ = {"polymorphic_identity": EventType.PUMP.value}
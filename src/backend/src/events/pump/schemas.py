@@ -1,5 +1,5 @@
 from pydantic import Field
-from events.schemas import Event
+from events.schemas import Event, EventPatch
 from events.schemas import EventType
 
 
@@ -10,3 +10,19 @@ class PumpEvent(Event):
     description: str = Field(default="Pump event", frozen=True)
 
     amount_ml: float = Field(description="Amount pumped in milliliters", ge=0)
+
+
+class PumpEventBatchItem(PumpEvent):
+    """A pump event of a batch create; the server assigns the ID."""
+
+    id: str = ""
+
+
+class PumpEventPatch(EventPatch):
+    """Partial update of a pump event."""
+
+    non_nullable_fields = EventPatch.non_nullable_fields | {"amount_ml"}
+
+    amount_ml: float | None = Field(
+        default=None, description="Amount pumped in milliliters", ge=0
+    )
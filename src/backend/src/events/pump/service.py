@@ -1,8 +1,9 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from common.service import CommonService
 from sqlalchemy.orm import Session
 from events.pump.model_schema_translation import PumpModelSchemaTranslation
 from events.pump import schemas
+from events.schemas import BatchCreateResponse
 from ulid import ULID
 from events.pump.persistence import PumpPersistence
 
@@ -32,6 +33,19 @@ class PumpService(CommonService):
 
         return inserted_event
 
+    def create_pump_events(
+        self, events: Sequence[schemas.PumpEvent]
+    ) -> BatchCreateResponse[schemas.PumpEvent]:
+        """Create several pump events at once, inserted together in one transaction."""
+        self._log.debug("Creating pump events", count=len(events))
+
+        for event in events:
+            event.id = str(ULID())
+
+        inserted_events = self._persistence.insert_pump_events(events=events)
+
+        return BatchCreateResponse[schemas.PumpEvent](created=inserted_events)
+
     def get_pump_event(self, event_id: str) -> schemas.PumpEvent:
         """Retrieve a pump event by its ID."""
         self._log.debug("Retrieving pump event", event_id=event_id)
@@ -39,12 +53,19 @@ class PumpService(CommonService):
         return self._persistence.get_pump_event(event_id=event_id)
 
     def list_pump_events(
-        self, limit: int = 100, offset: int = 0
-    ) -> Sequence[schemas.PumpEvent]:
-        """List pump events with pagination."""
-        self._log.debug("Listing pump events", limit=limit, offset=offset)
+        self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None
+    ) -> tuple[Sequence[schemas.PumpEvent], Optional[str]]:
+        """List pump events with pagination.
 
-        return self._persistence.list_pump_events(limit=limit, offset=offset)
+        Returns the page and the cursor for the next page, if any.
+        """
+        self._log.debug(
+            "Listing pump events", limit=limit, offset=offset, cursor=cursor
+        )
+
+        return self._persistence.list_pump_events(
+            limit=limit, offset=offset, cursor=cursor
+        )
 
     def update_pump_event(
         self, event_id: str, event: schemas.PumpEvent
@@ -54,6 +75,14 @@ class PumpService(CommonService):
 
         return self._persistence.update_pump_event(event_id=event_id, event=event)
 
+    def patch_pump_event(
+        self, event_id: str, patch: schemas.PumpEventPatch
+    ) -> schemas.PumpEvent:
+        """Change only the given fields of an existing pump event."""
+        self._log.debug("Patching pump event", event_id=event_id, patch=patch)
+
+        return self._persistence.patch_pump_event(event_id=event_id, patch=patch)
+
     def delete_pump_event(self, event_id: str) -> None:
         """Delete a pump event by its ID."""
         self._log.debug("Deleting pump event", event_id=event_id)
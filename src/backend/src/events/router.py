@@ -1,17 +1,32 @@
 """Router for events."""
 
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from common.routing import TrustedResponseRoute
 import structlog
+from config import config
 from events.service import EventService
 from events import schemas
-from persistence.dependencies import get_db
+from persistence.change_feed import change_hub_for, watch_household
+from persistence.dependencies import (
+    conditional_get,
+    get_db,
+    get_db_read_only,
+    get_household,
+)
+from persistence.households import database_config, session_factory
+import asyncio
 import datetime
+import io
+import tempfile
 from events.feed.router import router as feed_router
 from events.diaper.router import router as diaper_router
 from events.pump.router import router as pump_router
 
-router = APIRouter()
+router = APIRouter(route_class=TrustedResponseRoute)
 
 log = structlog.get_logger()
 
@@ -27,14 +42,186 @@ def create_event(event: schemas.Event, db: Session = Depends(get_db)):
     return service.create_event(event=event)
 
 
-@router.get("/{event_id}", response_model=schemas.Event)
-def get_event(event_id: str, db: Session = Depends(get_db)):
+EXPORT_MEDIA_TYPES = {
+    schemas.ExportFormat.NDJSON: "application/x-ndjson",
+    schemas.ExportFormat.CSV: "text/csv",
+}
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_events(
+    export_format: schemas.ExportFormat = Query(
+        schemas.ExportFormat.NDJSON, alias="format"
+    ),
+    start_time: Optional[datetime.datetime] = Query(
+        None, description="ISO 8601 format e.g. 2023-01-01T12:00:00Z"
+    ),
+    end_time: Optional[datetime.datetime] = Query(
+        None, description="ISO 8601 format e.g. 2023-01-01T12:00:00Z"
+    ),
+    event_type: Optional[list[schemas.EventType]] = Query(
+        None, description="Only export these types. Repeat to pass several."
+    ),
+    household: Optional[str] = Depends(get_household),
+):
+    """Export events oldest first as NDJSON or CSV, streamed as they are read."""
+    SessionLocalReadonly = session_factory(household, readonly=True)
+
+    # The response body is sent after the request's dependencies are closed, so
+    # the export reads through its own session, kept open until the last row.
+    def stream():
+        with SessionLocalReadonly() as session:
+            yield from EventService(db=session).export_events(
+                export_format=export_format,
+                start_time=start_time,
+                end_time=end_time,
+                event_types=event_type,
+            )
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="events.{export_format.value}"'
+            )
+        },
+    )
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_changes(household: Optional[str] = Depends(get_household)):
+    """Push created, updated and deleted events as Server-Sent Events.
+
+    Each message is named after its action, carries an `EventChange` as JSON and
+    has its `seq` as ID. A `resync` message asks the client to catch up with
+    `GET /events/changes`, e.g. when it fell too far behind.
+    """
+    engine = database_config(household).engine
+    if engine is None:
+        raise HTTPException(
+            detail="The database is not available",
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+
+    change_hub = change_hub_for(household)
+    # Subscribed before the household is watched, so that no change is missed.
+    subscription = change_hub.subscribe()
+
+    if household is not None:
+        watch_household(household, engine)
+
+    async def messages():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    change = await asyncio.wait_for(
+                        subscription.get(),
+                        timeout=config.change_feed_heartbeat_seconds,
+                    )
+                except TimeoutError:
+                    # Keeps proxies from closing an idle connection.
+                    yield ": keep-alive\n\n"
+                    continue
+                # The `seq` doubles as the SSE event ID, so that a reconnecting
+                # client can sync from its Last-Event-ID.
+                event_id = f"id: {change.seq}\n" if change.seq is not None else ""
+                yield (
+                    f"{event_id}event: {change.action.value}\n"
+                    f"data: {change.model_dump_json()}\n\n"
+                )
+        finally:
+            change_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/changes",
+    response_model=schemas.EventChangesResponse,
+    dependencies=[Depends(conditional_get)],
+)
+def list_changes(
+    since: int = Query(
+        0,
+        ge=0,
+        description="`cursor` of the previous response, or the `seq` of the last change seen. 0 starts from the beginning.",
+    ),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db_read_only),
+):
+    """List the events created, updated or deleted since a cursor, oldest change first.
+
+    Each event appears once, with its latest change: upserts carry the event as it
+    is now, deletions only its ID and type.
+    """
+    service = EventService(db=db)
+    return service.list_changes(since=since, limit=limit)
+
+
+# Uploads larger than this are spooled to a temporary file instead of memory.
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+
+@router.post("/import", response_model=schemas.ImportReport)
+async def import_events(
+    request: Request,
+    import_format: schemas.ExportFormat = Query(
+        schemas.ExportFormat.NDJSON, alias="format"
+    ),
+    event_type: Optional[schemas.EventType] = Query(
+        None, description="Type of the rows that have no `name`."
+    ),
+    batch_size: Optional[int] = Query(
+        None, ge=1, le=10_000, description="Events inserted per transaction."
+    ),
+    db: Session = Depends(get_db),
+):
+    """Import events from an NDJSON or CSV request body, as written by the export.
+
+    Rows are validated against the schema of their type and inserted in batches,
+    one transaction each. Invalid rows are rejected and listed in the report.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+
+        lines = io.TextIOWrapper(
+            upload, encoding="utf-8-sig", errors="replace", newline=""
+        )
+
+        # The request body is read on the event loop, the import on the threadpool.
+        service = EventService(db=db)
+        return await run_in_threadpool(
+            service.import_events,
+            lines=lines,
+            import_format=import_format,
+            default_type=event_type,
+            batch_size=batch_size or config.import_batch_size,
+            max_errors=config.import_max_errors,
+        )
+
+
+@router.get(
+    "/{event_id}", response_model=schemas.Event, dependencies=[Depends(conditional_get)]
+)
+def get_event(event_id: str, db: Session = Depends(get_db_read_only)):
     """Retrieve a event by its ID."""
     service = EventService(db=db)
     return service.get_event(event_id=event_id)
 
 
-@router.get("/", response_model=schemas.EventListResponse)
+@router.get(
+    "/",
+    response_model=schemas.EventListResponse,
+    dependencies=[Depends(conditional_get)],
+)
 def list_events(
     limit: int = 100,
     offset: int = 0,
@@ -44,12 +231,25 @@ def list_events(
     end_time: datetime.datetime = Query(
         None, description="ISO 8601 format e.g. 2023-01-01T12:00:00Z"
     ),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None,
+        description="`next_cursor` from the previous page. Takes precedence over offset.",
+    ),
+    include_total: bool = Query(
+        True,
+        description="Count the events in the time window. Pass false on later pages to skip the count.",
+    ),
+    db: Session = Depends(get_db_read_only),
 ):
     """List events with pagination and time window filtering."""
     service = EventService(db=db)
     return service.list_events(
-        limit=limit, offset=offset, start_time=start_time, end_time=end_time
+        limit=limit,
+        offset=offset,
+        start_time=start_time,
+        end_time=end_time,
+        cursor=cursor,
+        include_total=include_total,
     )
 
 
@@ -60,6 +260,24 @@ def update_event(event_id: str, event: schemas.Event, db: Session = Depends(get_
     return service.update_event(event_id=event_id, event=event)
 
 
+@router.delete("/", response_model=schemas.BulkDeleteResponse)
+def delete_events(
+    ids: list[str] = Query(
+        ...,
+        min_length=1,
+        max_length=config.max_batch_size,
+        description="IDs of the events to delete, e.g. `?ids=a&ids=b`.",
+    ),
+    db: Session = Depends(get_db),
+):
+    """Delete several events of any type at once.
+
+    IDs that do not match an event are returned in `not_found`.
+    """
+    service = EventService(db=db)
+    return service.delete_events(event_ids=ids)
+
+
 @router.delete("/{event_id}")
 def delete_event(event_id: str, db: Session = Depends(get_db)):
     """Delete a event by its ID."""
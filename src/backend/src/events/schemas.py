@@ -1,6 +1,6 @@
-from pydantic import BaseModel, AwareDatetime
+from pydantic import AwareDatetime, BaseModel, ConfigDict, model_validator
 from enum import Enum
-from typing import Any, Optional, Sequence
+from typing import Any, ClassVar, Generic, Optional, Sequence, TypeVar
 
 
 class EventType(str, Enum):
@@ -12,6 +12,13 @@ class EventType(str, Enum):
     PUMP = "pump"
 
 
+class ExportFormat(str, Enum):
+    """Formats of event exports and imports."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class Event(BaseModel):
     """Base event with shared fields between all baby events."""
 
@@ -23,6 +30,27 @@ class Event(BaseModel):
     notes: str | None = None
 
 
+class EventPatch(BaseModel):
+    """Partial update of an event: only the fields present in the request change."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    # Fields that may be left out of a patch but not set to null.
+    non_nullable_fields: ClassVar[frozenset[str]] = frozenset({"time_start"})
+
+    time_start: AwareDatetime | None = None
+    time_end: AwareDatetime | None = None
+    notes: str | None = None
+
+    @model_validator(mode="after")
+    def _reject_null_for_non_nullable_fields(self) -> "EventPatch":
+        for field in sorted(self.model_fields_set & self.non_nullable_fields):
+            if getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+
+        return self
+
+
 class EventWithMetadataResponse(BaseModel):
     """Pydantic model for API responses"""
 
@@ -41,5 +69,84 @@ class EventWithMetadataResponse(BaseModel):
 class EventListResponse(BaseModel):
     """Response model for a list of events with total count."""
 
-    total: int
+    # None when the total was not requested (`include_total=false`).
+    total: Optional[int] = None
     events: Sequence[EventWithMetadataResponse]
+    # Opaque cursor for the next page, None on the last page.
+    next_cursor: Optional[str] = None
+
+
+class BulkDeleteResponse(BaseModel):
+    """Response model for a bulk delete."""
+
+    deleted: list[str]
+    not_found: list[str]
+
+
+EventT = TypeVar("EventT", bound=Event)
+
+
+class BatchCreateResponse(BaseModel, Generic[EventT]):
+    """Response model for a batch create: the created events."""
+
+    created: list[EventT]
+
+
+class ImportRowError(BaseModel):
+    """A row rejected by an import, with the reasons."""
+
+    # Line of the file the row starts on, counting from 1.
+    line: int
+    # None when the row could not be read at all.
+    row: Optional[dict[str, Any]] = None
+    errors: list[dict[str, Any]]
+
+
+class ImportReport(BaseModel):
+    """Outcome of an import."""
+
+    imported: int = 0
+    rejected: int = 0
+    # The first rejected rows; `errors_truncated` tells whether there are more.
+    errors: list[ImportRowError] = []
+    errors_truncated: bool = False
+
+
+class ChangeAction(str, Enum):
+    """What happened to an event, as announced on the change feed."""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    # Events changed in a way that was not announced one by one (e.g. by another
+    # process, or while the client fell behind); refetch what is shown.
+    RESYNC = "resync"
+
+
+class EventChange(BaseModel):
+    """A committed change to an event, pushed on the change feed."""
+
+    action: ChangeAction
+    # None for `resync`.
+    type: Optional[EventType] = None
+    id: Optional[str] = None
+    # Position in the change log; pass as `since` to `GET /events/changes` to get
+    # the changes after this one. None for `resync`.
+    seq: Optional[int] = None
+
+
+class SyncedEventChange(EventChange):
+    """A change returned by `GET /events/changes`."""
+
+    # The event as it is now; None when it was deleted.
+    event: Optional[EventWithMetadataResponse] = None
+
+
+class EventChangesResponse(BaseModel):
+    """A page of the change log."""
+
+    changes: list[SyncedEventChange]
+    # `seq` of the last change, or `since` when there are none: pass it as `since`
+    # to continue.
+    cursor: int
+    has_more: bool
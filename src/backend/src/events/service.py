@@ -1,4 +1,5 @@
-from typing import Optional, Sequence
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, cast
 
 from sqlalchemy import inspect
 from events import models
@@ -7,8 +8,41 @@ from sqlalchemy.orm import Session
 from events.model_schema_translation import EventModelSchemaTranslation
 from events import schemas
 from ulid import ULID
-from events.persistence import EventPersistence
+from events.importing import read_rows, validate_row
+from events.persistence import EventPersistence, export_columns
+from pydantic_core import to_json
+import csv
 import datetime
+import functools
+import io
+
+
+@functools.cache
+def _metadata_columns(event_type: schemas.EventType) -> tuple[str, ...]:
+    """Column keys of the model of an event type that are not fields of the base
+    `Event`."""
+    base_fields = schemas.Event.model_fields.keys()
+    mapper = inspect(models.Event).polymorphic_map[event_type]
+
+    return tuple(
+        column.key for column in mapper.columns if column.key not in base_fields
+    )
+
+
+def _export_value(value: Any) -> Any:
+    """Plain JSON/CSV value of a column value read for the export."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime.datetime):
+        return value.replace(tzinfo=datetime.UTC).isoformat().replace("+00:00", "Z")
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    """CSV cell of a column value read for the export; booleans as in JSON."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return _export_value(value)
 
 
 class EventService(CommonService):
@@ -45,12 +79,12 @@ class EventService(CommonService):
     def _events_to_pydantic_with_metadata(
         self, events: Sequence[models.Event]
     ) -> list[schemas.EventWithMetadataResponse]:
-        base_fields = schemas.Event.model_fields.keys()
-
+        # The values come straight from the database, which already enforces the
+        # types, so the responses are constructed without validating them again.
         result = []
         for event in events:
             # Extract base fields
-            base_data = {
+            base_data: dict[str, Any] = {
                 "id": event.id,
                 "name": event.name,
                 "description": event.description,
@@ -63,17 +97,17 @@ class EventService(CommonService):
 
             # Extract additional fields
             metadata = {}
-            mapper = inspect(event.__class__)
-            for column in mapper.columns:
-                if column.key not in base_fields:
-                    value = getattr(event, column.key)
-                    if value is not None:
-                        metadata[column.key] = value
+            for key in _metadata_columns(event.name):
+                value = getattr(event, key)
+                if value is not None:
+                    metadata[key] = value
 
             if metadata:
                 base_data["metadata"] = metadata
 
-            result.append(schemas.EventWithMetadataResponse(**base_data))
+            result.append(
+                schemas.EventWithMetadataResponse.model_construct(**base_data)
+            )
 
         return result
 
@@ -83,6 +117,8 @@ class EventService(CommonService):
         offset: int = 0,
         start_time: Optional[datetime.datetime] = None,
         end_time: Optional[datetime.datetime] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> schemas.EventListResponse:
         """List events with pagination and time window filtering."""
         self._log.debug(
@@ -91,15 +127,202 @@ class EventService(CommonService):
             offset=offset,
             start_time=start_time,
             end_time=end_time,
+            cursor=cursor,
+            include_total=include_total,
         )
 
-        total, events = self._persistence.list_events(
-            limit=limit, offset=offset, start_time=start_time, end_time=end_time
+        total, events, next_cursor = self._persistence.list_events(
+            limit=limit,
+            offset=offset,
+            start_time=start_time,
+            end_time=end_time,
+            cursor=cursor,
+            include_total=include_total,
         )
 
         events = self._events_to_pydantic_with_metadata(events=events)
 
-        return schemas.EventListResponse(total=total, events=events)
+        return schemas.EventListResponse(
+            total=total, events=events, next_cursor=next_cursor
+        )
+
+    def export_events(
+        self,
+        export_format: schemas.ExportFormat = schemas.ExportFormat.NDJSON,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+        event_types: Optional[Sequence[schemas.EventType]] = None,
+    ) -> Iterator[bytes]:
+        """Export events oldest first, encoded batch by batch.
+
+        NDJSON has one object per event with the base fields and the columns of
+        the event's type. CSV has one header with the base fields and the columns
+        of all types; columns of other types are left empty.
+
+        Yields:
+            The encoded export, one chunk per batch of rows read from the database.
+        """
+        self._log.debug(
+            "Exporting events",
+            export_format=export_format,
+            start_time=start_time,
+            end_time=end_time,
+            event_types=event_types,
+        )
+
+        base_keys = tuple(schemas.Event.model_fields)
+        type_keys = export_columns()
+        batches = self._persistence.export_events(
+            start_time=start_time, end_time=end_time, event_types=event_types
+        )
+
+        if export_format == schemas.ExportFormat.CSV:
+            header = base_keys + tuple(
+                dict.fromkeys(key for keys in type_keys.values() for key in keys)
+            )
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(header)
+
+            for batch in batches:
+                writer.writerows(
+                    [_csv_value(row[key]) for key in header] for row in batch
+                )
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+            # Only the header when nothing matched.
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+            return
+
+        for batch in batches:
+            yield b"".join(
+                to_json(
+                    {
+                        key: _export_value(row[key])
+                        for key in base_keys + type_keys[row["name"]]
+                    }
+                )
+                + b"\n"
+                for row in batch
+            )
+
+    def import_events(
+        self,
+        lines: Iterable[str],
+        import_format: schemas.ExportFormat = schemas.ExportFormat.NDJSON,
+        default_type: Optional[schemas.EventType] = None,
+        batch_size: int = 1000,
+        max_errors: int = 1000,
+        on_rejected: Optional[Callable[[schemas.ImportRowError], None]] = None,
+        on_batch: Optional[Callable[[schemas.ImportReport], None]] = None,
+    ) -> schemas.ImportReport:
+        """Import events from a file, committing them `batch_size` at a time.
+
+        Rows that cannot be read or fail validation are rejected and the import
+        goes on; every other row is imported as a new event with a new ID. Only the
+        current batch is held in memory, and at most `max_errors` rejected rows.
+
+        Args:
+            lines: Lines of the file, see `events.importing.read_rows`.
+            import_format: Format of the file.
+            default_type: Type of rows that have no `name`.
+            batch_size: Events inserted per transaction.
+            max_errors: Rejected rows kept in the returned report.
+            on_rejected: Called with every rejected row.
+            on_batch: Called with the running totals after every committed batch.
+
+        Returns:
+            The numbers of imported and rejected rows, and the first rejected rows.
+        """
+        self._log.debug(
+            "Importing events",
+            import_format=import_format,
+            default_type=default_type,
+            batch_size=batch_size,
+        )
+
+        report = schemas.ImportReport()
+        batch: list[schemas.Event] = []
+
+        def reject(error: schemas.ImportRowError) -> None:
+            report.rejected += 1
+            if len(report.errors) < max_errors:
+                report.errors.append(error)
+            else:
+                report.errors_truncated = True
+            if on_rejected:
+                on_rejected(error)
+
+        def insert_batch() -> None:
+            self._persistence.insert_events(events=batch)
+            report.imported += len(batch)
+            batch.clear()
+            self._log.info(
+                "Imported batch of events",
+                imported=report.imported,
+                rejected=report.rejected,
+            )
+            if on_batch:
+                on_batch(report)
+
+        for line, row, error in read_rows(lines, import_format):
+            if row is None:
+                # `read_rows` yields the error of every row it cannot read.
+                error = cast(dict[str, Any], error)
+                reject(schemas.ImportRowError(line=line, errors=[error]))
+                continue
+
+            event, errors = validate_row(row, default_type=default_type)
+            if event is None:
+                reject(schemas.ImportRowError(line=line, row=row, errors=errors))
+                continue
+
+            batch.append(event)
+
+            if len(batch) >= batch_size:
+                insert_batch()
+
+        if batch:
+            insert_batch()
+
+        return report
+
+    def list_changes(
+        self, since: int = 0, limit: int = 500
+    ) -> schemas.EventChangesResponse:
+        """List the events changed since the change `since`, oldest change first."""
+        self._log.debug("Listing changes", since=since, limit=limit)
+
+        changes, has_more = self._persistence.list_changes(since=since, limit=limit)
+
+        events = self._events_to_pydantic_with_metadata(
+            events=[event for _, event in changes if event is not None]
+        )
+        events_by_id = {event.id: event for event in events}
+
+        synced = []
+        for change, _ in changes:
+            event = events_by_id.get(change.event_id)
+            synced.append(
+                schemas.SyncedEventChange(
+                    # Deleted after the log was read; its tombstone comes in a
+                    # later page.
+                    action=change.action if event else schemas.ChangeAction.DELETED,
+                    type=change.event_type,
+                    id=change.event_id,
+                    seq=change.seq,
+                    event=event,
+                )
+            )
+
+        return schemas.EventChangesResponse(
+            changes=synced,
+            cursor=changes[-1][0].seq if changes else since,
+            has_more=has_more,
+        )
 
     def update_event(self, event_id: str, event: schemas.Event) -> schemas.Event:
         """Update an existing event."""
@@ -112,3 +335,15 @@ class EventService(CommonService):
         self._log.debug("Deleting event", event_id=event_id)
 
         self._persistence.delete_event(event_id=event_id)
+
+    def delete_events(self, event_ids: Sequence[str]) -> schemas.BulkDeleteResponse:
+        """Delete several events by their IDs, reporting the IDs that did not exist."""
+        self._log.debug("Deleting events", count=len(event_ids))
+
+        deleted = set(self._persistence.delete_events(event_ids=event_ids))
+        requested = list(dict.fromkeys(event_ids))
+
+        return schemas.BulkDeleteResponse(
+            deleted=[event_id for event_id in requested if event_id in deleted],
+            not_found=[event_id for event_id in requested if event_id not in deleted],
+        )
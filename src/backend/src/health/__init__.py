@@ -0,0 +1 @@
+"""Module for reporting service health."""
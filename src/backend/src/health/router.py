@@ -0,0 +1,52 @@
+"""Router for health checks."""
+
+from fastapi import APIRouter
+from common.routing import TrustedResponseRoute
+from sqlalchemy import Engine
+from sqlalchemy.pool import QueuePool
+
+from health import schemas
+from persistence.database import db_config
+
+router = APIRouter(route_class=TrustedResponseRoute)
+
+
+def _pool_status(name: str, engine: Engine) -> schemas.PoolStatus:
+    pool = engine.pool
+
+    if not isinstance(pool, QueuePool):
+        return schemas.PoolStatus(engine=name, pool=type(pool).__name__)
+
+    return schemas.PoolStatus(
+        engine=name,
+        pool=type(pool).__name__,
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        # QueuePool counts overflow from -size upwards; only report connections
+        # opened beyond `size`.
+        overflow=max(pool.overflow(), 0),
+    )
+
+
+@router.get("/db", response_model=schemas.DatabaseHealth)
+async def get_database_health():
+    """Report live connection pool usage, for sizing the pool settings."""
+    pools = []
+
+    engines = [
+        ("primary", db_config.engine),
+        ("readonly", db_config.readonly_engine),
+    ]
+
+    seen_pools = set()
+
+    for name, engine in engines:
+        # Read-only engines share the primary pool unless reads are split off.
+        if engine is None or id(engine.pool) in seen_pools:
+            continue
+
+        seen_pools.add(id(engine.pool))
+        pools.append(_pool_status(name, engine))
+
+    return schemas.DatabaseHealth(pools=pools)
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PoolStatus(BaseModel):
+    """Live connection counts of one engine's connection pool.
+
+    The counts are None for pool types that do not track them, e.g. the single
+    shared connection used for in-memory SQLite.
+    """
+
+    engine: str
+    pool: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+
+
+class DatabaseHealth(BaseModel):
+    """Connection pool status of every configured database engine."""
+
+    pools: list[PoolStatus]
@@ -1,13 +1,55 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from events.router import router as events_router
 from stats.router import router as stats_router
+from health.router import router as health_router
 from fastapi.middleware.cors import CORSMiddleware
+from common.compression import CompressionMiddleware
+from common.idempotency import REPLAYED_HEADER, IdempotencyMiddleware
 from config import config
+from persistence.change_feed import stop_household_watchers, watch_other_writers
+from persistence.database import db_config
+from persistence.households import household_databases, household_mode
+from persistence.dependencies import conditional_get
+from persistence.pagination import NEXT_CURSOR_HEADER
 from structlog import get_logger
 
 logger = get_logger()
 
-app = FastAPI(root_path=config.root_path)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Report the effective database settings once at startup, watch for writes
+    of other processes for the change feed while running, and close the household
+    databases on shutdown."""
+    watcher = None
+
+    # In household mode the database of `config.database_url` is not used.
+    if db_config.engine is not None and not household_mode():
+        db_config.report_sqlite_settings(db_config.engine)
+
+        if db_config.is_sqlite_file and config.change_feed_poll_seconds > 0:
+            watcher = asyncio.create_task(
+                watch_other_writers(db_config.engine, config.change_feed_poll_seconds)
+            )
+
+    yield
+
+    if watcher is not None:
+        watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await watcher
+
+    await stop_household_watchers()
+    household_databases.close_all()
+
+
+app = FastAPI(root_path=config.root_path, lifespan=lifespan)
+
+# Innermost, so that stored responses are replayed through CORS and compression.
+app.add_middleware(IdempotencyMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,9 +57,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "PUT", "PATCH", "DELETE", "POST"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=[NEXT_CURSOR_HEADER, REPLAYED_HEADER],
 )
 
 logger.info("CORS middleware configured", allow_origins=config.allow_origins)
 
+if household_mode():
+    logger.info(
+        "Household mode enabled",
+        database_url=config.household_database_url,
+        header=config.household_header,
+    )
+
+if config.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.compression_minimum_size,
+        gzip_level=config.compression_gzip_level,
+        brotli_quality=config.compression_brotli_quality,
+    )
+
+# The JSON GET routes of the events revalidate by ETag one by one, while exports
+# and the change stream always send the live state; all statistics revalidate.
 app.include_router(events_router, prefix="/events", tags=["events"])
-app.include_router(stats_router, prefix="/stats", tags=["stats"])
+app.include_router(
+    stats_router,
+    prefix="/stats",
+    tags=["stats"],
+    dependencies=[Depends(conditional_get)],
+)
+app.include_router(health_router, prefix="/health", tags=["health"])
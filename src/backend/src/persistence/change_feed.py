@@ -0,0 +1,371 @@
+"""Log and live fan-out of committed event changes.
+
+Persistence classes record every event they create, update or delete with
+`record_change`, next to `mark_changed`. Before the session commits, the changes
+are written to the `event_changes` log (`events.models.EventChangeLog`) in the same
+transaction, which numbers them by `seq`; `GET /events/changes` serves the log to
+clients that sync incrementally. Only the latest change of each event is kept, and
+a deleted event keeps its row as a tombstone. Once committed, the changes are
+published to `change_hub`; a rollback drops them.
+
+Every subscriber, e.g. an open `GET /events/stream`, reads from its own queue of at
+most `config.change_feed_queue_size` changes. Publishing never waits for a
+subscriber: when a queue is full, its changes are replaced by a single `resync`,
+which tells that client to refetch, or to sync from the last `seq` it saw, instead
+of slowing down everyone else.
+
+Writes committed by other processes, such as another worker or the import CLI, are
+published by `watch_other_writers`: on SQLite it polls `PRAGMA data_version`, which
+changes whenever another connection commits, and publishes the logged changes that
+this process did not publish itself.
+
+The log numbers changes in commit order as long as writes are serialized, as they
+are on SQLite.
+
+In household mode (see `persistence.households`) every household database has its
+own log, hub (`change_hub_for`) and watcher (`watch_household`), so subscribers
+only receive the changes of their household.
+"""
+
+import asyncio
+import datetime
+import math
+import threading
+from typing import Optional
+
+from sqlalchemy import Connection, Engine, delete, event, func, insert, select
+from sqlalchemy.orm import Session
+from structlog import get_logger
+
+from config import config
+from events.models import EventChangeLog
+from events.schemas import ChangeAction, EventChange, EventType
+from persistence.households import HOUSEHOLD_KEY
+
+log = get_logger()
+
+# `Session.info` key of the changes recorded in the current transaction.
+CHANGES_KEY = "change_feed_changes"
+
+RESYNC = EventChange(action=ChangeAction.RESYNC)
+
+
+def record_change(
+    db: Session, action: ChangeAction, event_type: EventType | str, event_id: str
+) -> None:
+    """Have a change to event `event_id` logged and published when `db` commits."""
+    db.info.setdefault(CHANGES_KEY, []).append(
+        EventChange(action=action, type=EventType(event_type), id=event_id)
+    )
+
+
+class Subscription:
+    """The queue of changes of one subscriber, read on its event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self._loop = loop
+        self._queue: asyncio.Queue[EventChange] = asyncio.Queue(queue_size)
+
+    def deliver(self, changes: list[EventChange]) -> None:
+        """Queue `changes`; safe to call from any thread."""
+        self._loop.call_soon_threadsafe(self._put, changes)
+
+    def _put(self, changes: list[EventChange]) -> None:
+        for change in changes:
+            try:
+                self._queue.put_nowait(change)
+            except asyncio.QueueFull:
+                # Too far behind to catch up change by change.
+                while not self._queue.empty():
+                    self._queue.get_nowait()
+                self._queue.put_nowait(RESYNC)
+
+    async def get(self) -> EventChange:
+        """Wait for the next change."""
+        return await self._queue.get()
+
+
+class ChangeHub:
+    """Publishes committed changes to every subscription."""
+
+    def __init__(self, queue_size: int):
+        """
+        Args:
+            queue_size (int): Changes a subscriber may fall behind before it is
+                sent a `resync` instead.
+        """
+        self._queue_size = queue_size
+        self._subscriptions: set[Subscription] = set()
+        # `seq` of the published changes, while `watch_other_writers` needs them.
+        self._published: Optional[set[int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        """Start receiving changes on the running event loop."""
+        subscription = Subscription(asyncio.get_running_loop(), self._queue_size)
+
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop receiving changes."""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, changes: list[EventChange]) -> None:
+        """Send `changes` to every subscription."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            if self._published is not None:
+                self._published.update(
+                    change.seq for change in changes if change.seq is not None
+                )
+
+        for subscription in subscriptions:
+            subscription.deliver(changes)
+
+    def track_published(self, enabled: bool) -> None:
+        """Start or stop remembering the `seq` of the published changes."""
+        with self._lock:
+            self._published = set() if enabled else None
+
+    def take_published(self, up_to: float) -> set[int]:
+        """Forget and return the remembered `seq`s of at most `up_to`."""
+        with self._lock:
+            if not self._published:
+                return set()
+            taken = {seq for seq in self._published if seq <= up_to}
+            self._published -= taken
+            return taken
+
+
+change_hub = ChangeHub(queue_size=config.change_feed_queue_size)
+
+_household_hubs: dict[str, ChangeHub] = {}
+_household_hubs_lock = threading.Lock()
+
+
+def change_hub_for(household: Optional[str]) -> ChangeHub:
+    """The hub of a household's changes, or `change_hub` for None."""
+    if household is None:
+        return change_hub
+
+    with _household_hubs_lock:
+        hub = _household_hubs.get(household)
+
+        if hub is None:
+            hub = _household_hubs[household] = ChangeHub(
+                queue_size=config.change_feed_queue_size
+            )
+
+        return hub
+
+
+@event.listens_for(Session, "before_commit")
+def _write_change_log(session: Session) -> None:
+    """Log the latest recorded change of each event, in the committing transaction."""
+    changes = session.info.get(CHANGES_KEY)
+
+    if not changes:
+        return
+
+    latest: dict[str, EventChange] = {}
+    for change in changes:
+        latest.pop(change.id, None)
+        latest[change.id] = change
+
+    changed_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+    table = EventChangeLog.__table__
+
+    session.execute(delete(table).where(table.c.event_id.in_(list(latest))))
+    seqs = session.execute(
+        insert(table).returning(table.c.seq, sort_by_parameter_order=True),
+        [
+            {
+                "event_id": change.id,
+                "event_type": change.type,
+                "action": change.action,
+                "changed_at": changed_at,
+            }
+            for change in latest.values()
+        ],
+    ).scalars()
+
+    session.info[CHANGES_KEY] = [
+        change.model_copy(update={"seq": seq})
+        for change, seq in zip(latest.values(), seqs)
+    ]
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session) -> None:
+    """Publish the changes of the session once they are committed."""
+    changes = session.info.pop(CHANGES_KEY, None)
+
+    if changes:
+        change_hub_for(session.info.get(HOUSEHOLD_KEY)).publish(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session: Session) -> None:
+    """Rolled back changes never happened."""
+    session.info.pop(CHANGES_KEY, None)
+
+
+def last_seq(db: Session | Connection) -> int:
+    """`seq` of the latest logged change, or 0 before the first.
+
+    Every committed write to an event logs a change with a higher `seq`, whichever
+    process made it, so this also serves as the version of the data.
+    """
+    table = EventChangeLog.__table__
+    return db.execute(select(func.coalesce(func.max(table.c.seq), 0))).scalar_one()
+
+
+def _last_seq(engine: Engine) -> int:
+    with engine.connect() as connection:
+        return last_seq(connection)
+
+
+def _logged_changes(engine: Engine, since: int, limit: int) -> list[EventChange]:
+    """Up to `limit` logged changes after `since`, oldest first."""
+    table = EventChangeLog.__table__
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(table.c.seq, table.c.event_id, table.c.event_type, table.c.action)
+            .where(table.c.seq > since)
+            .order_by(table.c.seq)
+            .limit(limit)
+        )
+        return [
+            EventChange(
+                action=row.action, type=row.event_type, id=row.event_id, seq=row.seq
+            )
+            for row in rows
+        ]
+
+
+async def watch_other_writers(
+    engine: Engine,
+    interval: float,
+    hub: ChangeHub = change_hub,
+    until_idle: bool = False,
+) -> None:
+    """Publish the changes that other processes commit to the SQLite database.
+
+    Runs until cancelled, polling only while there are subscribers. When other
+    processes logged more changes than a subscriber queue holds, a `resync` is
+    published instead.
+
+    Args:
+        engine: Engine of the SQLite database.
+        interval: Seconds between polls.
+        hub: Hub of the changes to the database.
+        until_idle: Return once the hub has no subscribers.
+    """
+    # A connection of its own: PRAGMA data_version ignores the commits of the
+    # connection that reads it.
+    connection = await asyncio.to_thread(engine.raw_connection)
+    connection.detach()
+
+    def read_version() -> int:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("PRAGMA data_version")
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+
+        return row[0] if row is not None else 0
+
+    limit = config.change_feed_queue_size
+    database_version: Optional[int] = None
+    last_seq = 0
+    hub.track_published(True)
+
+    try:
+        while True:
+            await asyncio.sleep(interval)
+
+            if not hub.has_subscribers:
+                if until_idle:
+                    return
+                database_version = None
+                hub.take_published(up_to=math.inf)
+                continue
+
+            current = await asyncio.to_thread(read_version)
+
+            if database_version is None:
+                last_seq = await asyncio.to_thread(_last_seq, engine)
+            elif current != database_version:
+                changes = await asyncio.to_thread(
+                    _logged_changes, engine, last_seq, limit + 1
+                )
+
+                if len(changes) > limit:
+                    log.debug("Many changes by another process")
+                    hub.publish([RESYNC])
+                    last_seq = await asyncio.to_thread(_last_seq, engine)
+                    hub.take_published(up_to=last_seq)
+                elif changes:
+                    # Logged changes always have their `seq`.
+                    assert changes[-1].seq is not None
+                    last_seq = changes[-1].seq
+                    published = hub.take_published(up_to=last_seq)
+                    remote = [c for c in changes if c.seq not in published]
+                    if remote:
+                        log.debug("Changes by another process", count=len(remote))
+                        hub.publish(remote)
+
+            database_version = current
+    finally:
+        hub.track_published(False)
+        connection.close()
+
+
+_household_watchers: dict[str, asyncio.Task] = {}
+
+
+def watch_household(household: str, engine: Engine) -> None:
+    """Have the changes other processes commit for a household published.
+
+    Starts a `watch_other_writers` task for the household on the running event loop
+    unless one is running; it ends once the household has no subscribers. Call it
+    after subscribing to the household's hub.
+
+    Args:
+        household: The household.
+        engine: Engine of the household's database.
+    """
+    if engine.dialect.name != "sqlite" or config.change_feed_poll_seconds <= 0:
+        return
+
+    watcher = _household_watchers.get(household)
+
+    if watcher is None or watcher.done():
+        _household_watchers[household] = asyncio.create_task(
+            watch_other_writers(
+                engine,
+                config.change_feed_poll_seconds,
+                hub=change_hub_for(household),
+                until_idle=True,
+            )
+        )
+
+
+async def stop_household_watchers() -> None:
+    """Cancel the watchers started by `watch_household`."""
+    watchers = list(_household_watchers.values())
+    _household_watchers.clear()
+
+    for watcher in watchers:
+        watcher.cancel()
+
+    await asyncio.gather(*watchers, return_exceptions=True)
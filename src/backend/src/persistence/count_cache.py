@@ -0,0 +1,115 @@
+"""In-process cache of event counts.
+
+Counting the events in a time window is a full range scan, and the history page
+asks for the same total on every page it loads. Counts are cached per time window
+and the whole cache is dropped whenever any session commits, so a write through any
+persistence class invalidates it. A count taken before an invalidation but stored
+after it is discarded, see `EventCountCache.generation`.
+
+Writes committed by other processes, e.g. the import CLI, are caught on SQLite
+files by keying counts on the database's `DatabaseConfig.data_version`. For other
+databases they are not seen, and entries expiring after
+`config.event_count_cache_ttl_seconds` bounds how stale a count can be.
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import config
+
+# (household, database data version, start_time, end_time); the household is None
+# outside household mode.
+CountCacheKey = tuple[
+    Optional[str], int, Optional[datetime.datetime], Optional[datetime.datetime]
+]
+
+
+class EventCountCache:
+    """A small LRU cache of event counts keyed by household and time window."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of time windows to remember.
+            ttl_seconds (float): How long a count stays valid. 0 disables the cache.
+        """
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[CountCacheKey, tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """The number of invalidations so far.
+
+        Read it before counting and pass it to `set`, so that a count that an
+        invalidation overtook is not cached.
+        """
+        return self._generation
+
+    def get(self, key: CountCacheKey) -> Optional[int]:
+        """Return the cached count for `key`, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires_at, count = entry
+
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+            return count
+
+    def set(self, key: CountCacheKey, count: int, generation: int) -> None:
+        """Remember the count for `key`.
+
+        Args:
+            key: The household and time window counted.
+            count: The number of events.
+            generation: `generation` read before counting. The count is dropped if
+                the cache was invalidated since, as it may predate the write.
+        """
+        if self._ttl_seconds <= 0 or self._max_entries <= 0:
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, count)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Forget all cached counts, and counts still being taken."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+event_count_cache = EventCountCache(
+    max_entries=config.event_count_cache_size,
+    ttl_seconds=config.event_count_cache_ttl_seconds,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_event_counts(session: Session) -> None:
+    """Drop cached counts whenever any session commits a write."""
+    event_count_cache.invalidate()
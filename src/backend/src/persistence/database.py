@@ -21,10 +21,13 @@ Example Usage:
 ```
 """
 
+import threading
 from structlog import get_logger
-from typing import Tuple
+from typing import Optional, Tuple
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import PoolProxiedConnection
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from config import config
@@ -34,6 +37,59 @@ log = get_logger()
 Base = declarative_base()
 
 
+def sqlite_pragmas() -> dict[str, str | int]:
+    """The SQLite tuning profile from `config`, as PRAGMA name to value."""
+    return {
+        "journal_mode": config.sqlite_journal_mode,
+        "synchronous": config.sqlite_synchronous,
+        "cache_size": config.sqlite_cache_size,
+        "mmap_size": config.sqlite_mmap_size,
+        "temp_store": config.sqlite_temp_store,
+        "busy_timeout": config.sqlite_busy_timeout_ms,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the SQLite tuning profile to a freshly opened DBAPI connection.
+
+    Foreign keys are also enforced, which SQLite does not do by default, so that
+    deleting an event cascades to its subclass row.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+def _apply_sqlite_readonly_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the SQLite tuning profile to a read-only connection and forbid writes.
+
+    The journal mode is a property of the database file and changing it needs write
+    access, so it is left to the read-write connections.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            if name != "journal_mode":
+                cursor.execute(f"PRAGMA {name}={value}")
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def _is_in_memory_sqlite(database_url: str) -> bool:
+    """Whether `database_url` is an in-memory SQLite database."""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
 class DatabaseConfig:
     """Handles the configuration of the database connection.
 
@@ -41,55 +97,235 @@ class DatabaseConfig:
     and provides methods to get a SQLAlchemy engine and sessionmaker.
     """
 
-    def __init__(self):
+    def __init__(self, database_url: Optional[str] = None):
         """Initializes DatabaseConfig with the database URL from an environment variable.
 
+        Args:
+            database_url: URL of another database, e.g. a household's (see
+                `persistence.households`). Its read-only URL is derived from it
+                rather than taken from `config`.
+
         Raises:
             DatabaseCreationException: If the required environment variable for the database URL is not set.
         """
-        database_url = config.database_url
+        is_configured = database_url is None
+        database_url = database_url or config.database_url
 
         log.info("Creating database connection", conn_str=database_url)
 
         self.database_url = database_url
+        self.read_database_url = self._get_read_database_url(
+            config.read_database_url if is_configured else None
+        )
 
-    def get_engine(self):
+        # Set by `get_session`.
+        self.engine: Optional[Engine] = None
+        self.readonly_engine: Optional[Engine] = None
+
+        # Connection of `data_version`, opened on first use.
+        self._version_connection: Optional[PoolProxiedConnection] = None
+        self._version_lock = threading.Lock()
+
+    @property
+    def is_sqlite_file(self) -> bool:
+        """Whether the primary database is a SQLite file, which other processes can
+        write to as well."""
+        return make_url(
+            self.database_url
+        ).get_backend_name() == "sqlite" and not _is_in_memory_sqlite(self.database_url)
+
+    def _get_read_database_url(self, read_database_url: Optional[str]) -> Optional[str]:
+        """Returns the URL for a separate read-only connection pool, if reads get one.
+
+        Reads go to `read_database_url` when set. A SQLite file database otherwise
+        gets its own query-only pool on the same file, so that reads do not queue
+        behind writers for pooled connections. Other databases share the primary
+        pool.
+        """
+        if read_database_url:
+            return read_database_url
+
+        is_sqlite = make_url(self.database_url).get_backend_name() == "sqlite"
+
+        if is_sqlite and not _is_in_memory_sqlite(self.database_url):
+            return self.database_url
+
+        return None
+
+    @staticmethod
+    def _pool_options(database_url: str) -> dict:
+        """Returns the connection pool arguments from `config` for `create_engine`.
+
+        In-memory SQLite databases are served by a single shared connection rather
+        than a QueuePool, so they get no sizing options.
+        """
+        if _is_in_memory_sqlite(database_url):
+            return {}
+
+        return {
+            "pool_size": config.db_pool_size,
+            "max_overflow": config.db_max_overflow,
+            "pool_timeout": config.db_pool_timeout,
+            "pool_recycle": config.db_pool_recycle,
+            "pool_pre_ping": config.db_pool_pre_ping,
+        }
+
+    def get_engine(
+        self, database_url: Optional[str] = None, readonly: bool = False
+    ) -> Engine:
         """Creates and returns a SQLAlchemy engine.
 
+        Args:
+            database_url: URL to connect to. Defaults to the primary database.
+            readonly: Forbid writes on SQLite connections of this engine.
+
         Returns:
             A SQLAlchemy engine.
 
         Raises:
             DatabaseCreationException: If the engine cannot be created.
         """
+        database_url = database_url or self.database_url
+
         try:
-            engine = create_engine(self.database_url)
-            return engine
+            engine = create_engine(database_url, **self._pool_options(database_url))
         except Exception as e:
             log.error(f"Failed to create engine: {e}")
             raise RuntimeError("Failed to create database engine.") from e
 
-    def get_session(self) -> Tuple[sessionmaker, sessionmaker]:
+        self._configure_sqlite(engine, readonly=readonly)
+
+        return engine
+
+    @staticmethod
+    def _configure_sqlite(engine: Engine, readonly: bool = False) -> None:
+        """Registers the SQLite tuning profile on every new connection of `engine`.
+
+        Does nothing for other databases.
+        """
+        if engine.dialect.name != "sqlite":
+            return
+
+        event.listen(
+            engine,
+            "connect",
+            _apply_sqlite_readonly_pragmas if readonly else _apply_sqlite_pragmas,
+        )
+
+    @staticmethod
+    def report_sqlite_settings(engine: Engine) -> None:
+        """Logs the PRAGMA values actually in effect on a connection of `engine`.
+
+        SQLite silently ignores some settings, e.g. WAL on an in-memory database, so
+        the values are read back rather than echoed from the configuration.
+        """
+        if engine.dialect.name != "sqlite":
+            return
+
+        with engine.connect() as connection:
+            settings = {
+                name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in sqlite_pragmas()
+            }
+
+        log.info("SQLite settings in effect", **settings)
+
+    def get_session(
+        self, info: Optional[dict] = None
+    ) -> Tuple[sessionmaker, sessionmaker]:
         """Creates and returns both a regular and read-only SQLAlchemy sessionmaker.
 
+        Args:
+            info: Initial `Session.info` of every session, e.g. its household.
+
         Returns:
             Tuple[sessionmaker, sessionmaker]: (sessionmaker, readonly-sessionmaker)
         """
         engine = self.get_engine()
 
-        # Create a "Sub-engine" that is a shallow-copy of the original engine but with a
-        # different isolation level.
-        #   Note: `READ COMMITTED` may be too low a level of isolation. `REPEATABLE READ` might be considered,
-        #   but it should be noted that performance could be degraded due to increased locking.
-        readonly_engine = engine.execution_options(isolation_level="READ COMMITTED")
+        if self.read_database_url:
+            log.info(
+                "Creating read-only database connection",
+                conn_str=self.read_database_url,
+            )
+            readonly_engine = self.get_engine(self.read_database_url, readonly=True)
+        elif engine.dialect.name == "sqlite":
+            # In-memory database; a second engine would open a different database.
+            readonly_engine = engine
+        else:
+            # Create a "Sub-engine" that is a shallow-copy of the original engine but with a
+            # different isolation level.
+            #   Note: `READ COMMITTED` may be too low a level of isolation. `REPEATABLE READ` might be considered,
+            #   but it should be noted that performance could be degraded due to increased locking.
+            readonly_engine = engine.execution_options(isolation_level="READ COMMITTED")
 
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.engine = engine
+        self.readonly_engine = readonly_engine
+
+        # Objects are not expired on commit: the persistence classes build their
+        # responses from the values they just wrote instead of re-reading them.
+        SessionLocal = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=engine,
+            expire_on_commit=False,
+            info=info,
+        )
         SessionLocalReadonly = sessionmaker(
-            autocommit=False, autoflush=False, bind=readonly_engine
+            autocommit=False,
+            autoflush=False,
+            bind=readonly_engine,
+            expire_on_commit=False,
+            info=info,
         )
 
         return SessionLocal, SessionLocalReadonly
 
+    def data_version(self) -> int:
+        """The `PRAGMA data_version` of a SQLite file database.
+
+        SQLite changes it whenever a connection other than the reading one commits
+        to the file, so unlike a counter kept in process it also counts the writes
+        of other processes, e.g. the import CLI. It is read on a connection of its
+        own that never writes; in WAL mode that only reads the shared-memory index,
+        about 11 µs.
+
+        Returns:
+            The version, or 0 for other databases, whose writes are only counted
+            in process.
+        """
+        with self._version_lock:
+            if self._version_connection is None:
+                if self.engine is None or not self.is_sqlite_file:
+                    return 0
+
+                self._version_connection = self.engine.raw_connection()
+                self._version_connection.detach()
+
+            cursor = self._version_connection.cursor()
+            try:
+                cursor.execute("PRAGMA data_version")
+                row = cursor.fetchone()
+            finally:
+                cursor.close()
+
+        return row[0] if row is not None else 0
+
+    def dispose(self) -> None:
+        """Closes the pooled connections of all engines.
+
+        Connections still checked out are closed when they are returned, so
+        sessions in use are not interrupted.
+        """
+        with self._version_lock:
+            if self._version_connection is not None:
+                self._version_connection.close()
+                self._version_connection = None
+
+        for engine in {self.engine, self.readonly_engine}:
+            if engine is not None:
+                engine.dispose()
+
 
 # Usage
 db_config = DatabaseConfig()
@@ -9,31 +9,75 @@ Example:
     from persistence.dependencies import get_db, get_db_read_only
 
     @app.get("/items/")
-    async def read_items(db: Session = Depends(get_db_read_only)):
+    def read_items(db: Session = Depends(get_db_read_only)):
         items = db.query(Item).all()
         return items
 
     @app.post("/items/")
-    async def create_item(item: Item, db: Session = Depends(get_db)):
+    def create_item(item: Item, db: Session = Depends(get_db)):
         db.add(item)
         db.commit()
         return item
     ```
+
+In household mode (see `persistence.households`) both open the session on the
+database of the household named by the request, as resolved by `get_household`.
+
+`conditional_get` makes a JSON GET route answer ``304 Not Modified`` when nothing
+was written since the client fetched it:
+
+    ```python
+    @router.get("/items/", dependencies=[Depends(conditional_get)])
+    def read_items(db: Session = Depends(get_db_read_only)): ...
+    ```
 """
 
-from typing import Generator
+import hashlib
+from typing import Generator, Optional
 
 
+from fastapi import Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from persistence.database import SessionLocal, SessionLocalReadonly
+from config import config
+from persistence.change_feed import last_seq
+from persistence.households import (
+    household_mode,
+    is_valid_household,
+    session_factory,
+)
 
 from structlog import get_logger
 
 log = get_logger()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_household(request: Request) -> Optional[str]:
+    """Get the household a request is for.
+
+    Returns:
+        The household ID in household mode, None otherwise.
+
+    Raises:
+        HTTPException: 400 if the household header is missing or malformed.
+    """
+    if not household_mode():
+        return None
+
+    household = request.headers.get(config.household_header)
+
+    if household is None or not is_valid_household(household):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{config.household_header} header missing or invalid",
+        )
+
+    return household
+
+
+def get_db(
+    household: Optional[str] = Depends(get_household),
+) -> Generator[Session, None, None]:
     """Get database session.
 
     Closes session on error and when request finished.
@@ -41,7 +85,7 @@ def get_db() -> Generator[Session, None, None]:
     Yields:
         db: sqlalchemy orm database session
     """
-    db = SessionLocal()
+    db = session_factory(household)()
     try:
         yield db
     finally:
@@ -49,7 +93,9 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_db_read_only() -> Generator[Session, None, None]:
+def get_db_read_only(
+    household: Optional[str] = Depends(get_household),
+) -> Generator[Session, None, None]:
     """Get a readonly database session.
 
     Closes session on error and when request finished.
@@ -57,9 +103,62 @@ def get_db_read_only() -> Generator[Session, None, None]:
     Yields:
         db: sqlalchemy orm database session
     """
-    db = SessionLocalReadonly()
+    db = session_factory(household, readonly=True)()
     try:
         yield db
     finally:
         log.debug("Closing readonly database session")
         db.close()
+
+
+def _etag(request: Request, household: Optional[str], version: int) -> str:
+    """Weak ETag of the data `version` for the household, path and query of
+    `request`."""
+    query = sorted(request.query_params.multi_items())
+    digest = hashlib.blake2b(
+        repr((household, request.url.path, query)).encode(), digest_size=8
+    ).hexdigest()
+
+    return f'W/"{version}-{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag`, using weak comparison."""
+    opaque_tag = etag.removeprefix("W/")
+
+    return any(
+        tag == "*" or tag.removeprefix("W/") == opaque_tag
+        for tag in (tag.strip() for tag in if_none_match.split(","))
+    )
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    household: Optional[str] = Depends(get_household),
+    db: Session = Depends(get_db_read_only),
+) -> None:
+    """Answer a GET with 304 Not Modified if the client's copy is still current.
+
+    The ETag is derived from the `seq` of the latest logged change (see
+    `persistence.change_feed.last_seq`) and the request's path and query
+    parameters. The change log lives in the database, so a write by any worker or
+    process changes the ETag, and reading it is a single lookup of the highest
+    primary key, on the session the route reads with. It is taken before the route
+    reads anything: a write committed in between only makes the next request miss.
+    Other methods pass through unchanged.
+
+    Raises:
+        HTTPException: 304 when the If-None-Match header matches the current ETag.
+    """
+    if request.method != "GET":
+        return
+
+    etag = _etag(request, household, last_seq(db))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
@@ -0,0 +1,90 @@
+"""Direct DELETE statements for events stored with joined-table inheritance.
+
+Deleting through the ORM loads the event first and then deletes its subclass and
+base rows one by one. The subclass tables reference ``events.id`` with
+``ON DELETE CASCADE``, so deleting the base row is enough: the database removes the
+subclass row in the same statement. ``RETURNING`` tells whether the event existed,
+along with the type and time of what was deleted, which the rollups and the change
+log need (see `stats.rollups` and `persistence.change_feed`). On databases without
+``DELETE ... RETURNING`` (see `Dialect.delete_returning`) those are read with a
+SELECT just before the DELETE, in the same transaction.
+
+Example:
+    ```python
+    if delete_event_row(db, models.PumpEvent, event_id) is None:
+        ...  # No pump event with that ID.
+    ```
+"""
+
+from typing import Any, Optional, Sequence, cast
+
+from sqlalchemy import ColumnElement, Row, Table, delete, select
+from sqlalchemy.orm import Mapper, Session, class_mapper
+
+
+def _returned_columns(base_table: Table) -> tuple:
+    return base_table.c.id, base_table.c.name, base_table.c.time_start
+
+
+def _delete_returning(
+    db: Session, base_table: Table, *criteria: ColumnElement[bool]
+) -> list[Row]:
+    """Deletes the events matching `criteria` and returns their
+    ``(id, name, time_start)``."""
+    if db.get_bind().dialect.delete_returning:
+        return list(
+            db.execute(
+                delete(base_table)
+                .where(*criteria)
+                .returning(*_returned_columns(base_table))
+            )
+        )
+
+    deleted = list(db.execute(select(*_returned_columns(base_table)).where(*criteria)))
+    if deleted:
+        db.execute(
+            delete(base_table).where(base_table.c.id.in_([row.id for row in deleted]))
+        )
+
+    return deleted
+
+
+def delete_event_row(db: Session, model_class: type, event_id: str) -> Optional[Row]:
+    """Deletes one event, without reading it first.
+
+    Args:
+        model_class: The event model. For a subclass, only an event of that type is
+            deleted.
+
+    Returns:
+        Optional[Row]: ``(id, name, time_start)`` of the deleted event, or None if
+            there was no such event.
+    """
+    mapper: Mapper[Any] = class_mapper(model_class)
+    base_table = cast(Table, mapper.base_mapper.local_table)
+
+    criteria = [base_table.c.id == event_id]
+
+    if mapper is not mapper.base_mapper:
+        criteria.append(base_table.c.name == mapper.polymorphic_identity)
+
+    deleted = _delete_returning(db, base_table, *criteria)
+
+    return deleted[0] if deleted else None
+
+
+def delete_event_rows(
+    db: Session, model_class: type, event_ids: Sequence[str]
+) -> list[Row]:
+    """Deletes several events of any type in one statement.
+
+    Returns:
+        list[Row]: ``(id, name, time_start)`` of each deleted event; IDs without an
+            event are left out.
+    """
+    if not event_ids:
+        return []
+
+    base_table = cast(Table, class_mapper(model_class).base_mapper.local_table)
+
+    return _delete_returning(db, base_table, base_table.c.id.in_(set(event_ids)))
@@ -0,0 +1,294 @@
+"""Direct UPDATE statements for events stored with joined-table inheritance.
+
+Updating through the ORM first loads the event with a SELECT across the base and
+subclass tables, then flushes an UPDATE per table. These helpers instead write each
+column straight to the table that holds it, and detect a missing event from the
+affected rows rather than from a prior SELECT.
+
+Both also report the `time_start` the event had before the update, which the rollups
+need to recompute the day an event moved away from (see `stats.rollups`). SQLite
+cannot return the values a row had before an UPDATE, so it is read in a statement
+that runs anyway before the base table changes, usually the subclass table's
+``UPDATE ... RETURNING``.
+
+On databases without ``UPDATE ... RETURNING`` (see `Dialect.update_returning`) the
+event is read first, which also tells whether it exists, then updated with plain
+UPDATE statements and, for `patch_event_row`, read again.
+
+Example:
+    ```python
+    patched = patch_event_row(
+        db, models.PumpEvent, event_id, values={"notes": "Left side only"}
+    )
+    if patched is None:
+        ...  # No pump event with that ID.
+    ```
+"""
+
+import datetime
+from typing import Any, NamedTuple, Optional, cast
+
+from sqlalchemy import Executable, ScalarSelect, Table, select, update
+from sqlalchemy.orm import Mapper, Session, class_mapper
+
+# Columns that identify an event and are never changed by an update.
+IMMUTABLE_COLUMNS = frozenset({"id", "name"})
+
+# Label of the previous `time_start` in the rows read before an update.
+_PREVIOUS_TIME_START = "previous_time_start"
+
+
+class PatchedRow(NamedTuple):
+    """An event after `patch_event_row`."""
+
+    # All column values of the event after the update.
+    values: dict[str, Any]
+    # `time_start` before the update, i.e. the day the event may have moved from.
+    previous_time_start: datetime.datetime
+
+
+def _tables(model_class: type) -> tuple[Table, Table]:
+    """Returns the (base table, subclass table) of an event subclass."""
+    mapper: Mapper[Any] = class_mapper(model_class)
+    return (
+        cast(Table, mapper.base_mapper.local_table),
+        cast(Table, mapper.local_table),
+    )
+
+
+def _split_values(
+    model_class: type, values: dict[str, Any]
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Splits column values into those of the base table and the subclass table.
+
+    Raises:
+        ValueError: If a key is not a writable column of `model_class`.
+    """
+    base_table, subclass_table = _tables(model_class)
+    base_values: dict[str, Any] = {}
+    subclass_values: dict[str, Any] = {}
+
+    for key, value in values.items():
+        if key in IMMUTABLE_COLUMNS:
+            raise ValueError(f"Column {key!r} cannot be updated")
+        if key in subclass_table.c:
+            subclass_values[key] = value
+        elif key in base_table.c:
+            base_values[key] = value
+        else:
+            raise ValueError(f"{model_class.__name__} has no column {key!r}")
+
+    return base_values, subclass_values
+
+
+def model_column_values(model: Any) -> dict[str, Any]:
+    """Returns the writable column values of a (transient) model instance."""
+    return {
+        attr.key: getattr(model, attr.key)
+        for attr in class_mapper(type(model)).column_attrs
+        if attr.key not in IMMUTABLE_COLUMNS
+    }
+
+
+def _stored_time_start(base_table: Table, event_id: str) -> ScalarSelect[Any]:
+    """`time_start` as stored for the event, as a subquery.
+
+    In the RETURNING clause of an UPDATE of the subclass table it still reads the
+    value from before the update: that statement does not change the base table.
+    """
+    return (
+        select(base_table.c.time_start)
+        .where(base_table.c.id == event_id)
+        .scalar_subquery()
+    )
+
+
+def _update_returning(db: Session) -> bool:
+    """Whether the database of `db` supports ``UPDATE ... RETURNING``."""
+    return db.get_bind().dialect.update_returning
+
+
+def _typed_time_start(
+    db: Session, model_class: type, event_id: str
+) -> Optional[datetime.datetime]:
+    """`time_start` of the event, or None if there is no event of that type."""
+    base_table, _ = _tables(model_class)
+
+    return db.execute(
+        select(base_table.c.time_start).where(
+            base_table.c.id == event_id,
+            base_table.c.name == class_mapper(model_class).polymorphic_identity,
+        )
+    ).scalar()
+
+
+def _read_event(
+    db: Session, model_class: type, event_id: str
+) -> Optional[dict[str, Any]]:
+    """All column values of the event, or None if there is no event of that type."""
+    base_table, subclass_table = _tables(model_class)
+
+    current = (
+        db.execute(
+            select(base_table, *(c for c in subclass_table.c if c.key != "id"))
+            .join_from(
+                base_table, subclass_table, base_table.c.id == subclass_table.c.id
+            )
+            .where(
+                base_table.c.id == event_id,
+                base_table.c.name == class_mapper(model_class).polymorphic_identity,
+            )
+        )
+        .mappings()
+        .first()
+    )
+
+    return None if current is None else dict(current)
+
+
+def update_event_row(
+    db: Session, model_class: type, event_id: str, values: dict[str, Any]
+) -> Optional[datetime.datetime]:
+    """Overwrites the columns in `values` of one event, without reading it first.
+
+    The statement that checks the event exists also writes to it: the subclass
+    table is updated first, since a row there means the event has the right type.
+    Only when no subclass column changes, or the database has no
+    ``UPDATE ... RETURNING``, is the event read first, for its previous
+    `time_start`.
+
+    Returns:
+        Optional[datetime]: `time_start` of the event before the update, or None if
+            there is no event of type `model_class` with that ID, in which case
+            nothing was written.
+    """
+    base_table, subclass_table = _tables(model_class)
+    base_values, subclass_values = _split_values(model_class, values)
+
+    if subclass_values and _update_returning(db):
+        previous_time_start = db.execute(
+            update(subclass_table)
+            .where(subclass_table.c.id == event_id)
+            .values(subclass_values)
+            .returning(_stored_time_start(base_table, event_id))
+        ).scalar()
+    else:
+        previous_time_start = _typed_time_start(db, model_class, event_id)
+
+        if previous_time_start is not None and subclass_values:
+            db.execute(
+                update(subclass_table)
+                .where(subclass_table.c.id == event_id)
+                .values(subclass_values)
+            )
+
+    if previous_time_start is None:
+        return None
+
+    if base_values:
+        db.execute(
+            update(base_table).where(base_table.c.id == event_id).values(base_values)
+        )
+
+    return previous_time_start
+
+
+def patch_event_row(
+    db: Session, model_class: type, event_id: str, values: dict[str, Any]
+) -> Optional[PatchedRow]:
+    """Updates only the columns in `values` of one event and returns its new state.
+
+    Each table that has a changed column gets a single ``UPDATE ... RETURNING``; the
+    columns of a table that is not changed are read with one SELECT. The subclass
+    table is written or read first, together with the previous `time_start`.
+    Without ``UPDATE ... RETURNING`` the event is read before and after plain
+    UPDATE statements instead.
+
+    Returns:
+        Optional[PatchedRow]: The event after the update, or None if there is no
+            event of type `model_class` with that ID.
+    """
+    base_table, subclass_table = _tables(model_class)
+    base_values, subclass_values = _split_values(model_class, values)
+    identity = class_mapper(model_class).polymorphic_identity
+    previous_time_start = _stored_time_start(base_table, event_id).label(
+        _PREVIOUS_TIME_START
+    )
+
+    if not base_values and not subclass_values:
+        current = _read_event(db, model_class, event_id)
+        if current is None:
+            return None
+        return PatchedRow(current, current["time_start"])
+
+    if not _update_returning(db):
+        previous = _typed_time_start(db, model_class, event_id)
+        if previous is None:
+            return None
+
+        for table, table_values in (
+            (subclass_table, subclass_values),
+            (base_table, base_values),
+        ):
+            if table_values:
+                db.execute(
+                    update(table).where(table.c.id == event_id).values(table_values)
+                )
+
+        current = _read_event(db, model_class, event_id)
+        if current is None:
+            return None
+        return PatchedRow(current, previous)
+
+    query: Executable
+    if subclass_values:
+        query = (
+            update(subclass_table)
+            .where(subclass_table.c.id == event_id)
+            .values(subclass_values)
+            .returning(*subclass_table.c, previous_time_start)
+        )
+    else:
+        query = (
+            select(
+                subclass_table,
+                base_table.c.time_start.label(_PREVIOUS_TIME_START),
+            )
+            .join_from(
+                subclass_table,
+                base_table,
+                (base_table.c.id == subclass_table.c.id)
+                & (base_table.c.name == identity),
+            )
+            .where(subclass_table.c.id == event_id)
+        )
+
+    row = db.execute(query).mappings().first()
+    if row is None:
+        return None
+    patched = dict(row)
+    previous = patched.pop(_PREVIOUS_TIME_START)
+
+    if base_values:
+        base_row = (
+            db.execute(
+                update(base_table)
+                .where(base_table.c.id == event_id)
+                .values(base_values)
+                .returning(*base_table.c)
+            )
+            .mappings()
+            .first()
+        )
+    else:
+        base_row = (
+            db.execute(select(base_table).where(base_table.c.id == event_id))
+            .mappings()
+            .first()
+        )
+
+    if base_row is None:
+        return None
+    patched.update(base_row)
+
+    return PatchedRow(patched, previous)
@@ -0,0 +1,255 @@
+"""Routing of requests to per-household databases.
+
+By default every request is served from the database of `config.database_url`. In
+household mode, enabled by setting `config.household_database_url`, every household
+has a database of its own, so that households neither share SQLite's write lock nor
+grow one file together. Requests name their household in the header
+`config.household_header`, and `persistence.dependencies.get_db` opens sessions on
+that household's database.
+
+The engines and sessionmakers of a household are created on its first request and
+kept in an LRU of at most `config.household_cache_size` households; a household
+unused for `config.household_idle_seconds` has its connections closed on a later
+lookup. Sessions of a household database carry the household ID in
+`Session.info[HOUSEHOLD_KEY]`, which keeps the per-process caches and the change
+feed of households apart.
+
+Household databases are created and migrated with Alembic, see `migrations/env.py`.
+A household whose SQLite file does not exist is unknown: its requests are answered
+with 404 rather than creating an empty file.
+"""
+
+import glob
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from structlog import get_logger
+
+from config import config
+from persistence.database import (
+    DatabaseConfig,
+    SessionLocal,
+    SessionLocalReadonly,
+    _is_in_memory_sqlite,
+    db_config,
+)
+
+log = get_logger()
+
+# `Session.info` key of the household a session belongs to.
+HOUSEHOLD_KEY = "household"
+
+# Placeholder for the household ID in `config.household_database_url`.
+HOUSEHOLD_PLACEHOLDER = "{household}"
+
+# Household IDs end up in file names, so they are restricted to a safe alphabet.
+HOUSEHOLD_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_-]{0,63}")
+
+
+def household_mode() -> bool:
+    """Whether every household has a database of its own."""
+    return config.household_database_url is not None
+
+
+def is_valid_household(household: str) -> bool:
+    """Whether `household` is a well-formed household ID."""
+    return HOUSEHOLD_ID_PATTERN.fullmatch(household) is not None
+
+
+def _household_database_url_template() -> str:
+    """`config.household_database_url`, with its placeholder.
+
+    Raises:
+        RuntimeError: If household mode is not enabled.
+    """
+    if config.household_database_url is None:
+        raise RuntimeError("Household mode is not enabled")
+
+    return config.household_database_url
+
+
+def household_database_url(household: str) -> str:
+    """The database URL of `household`.
+
+    Raises:
+        RuntimeError: If household mode is not enabled.
+    """
+    return _household_database_url_template().replace(HOUSEHOLD_PLACEHOLDER, household)
+
+
+def sqlite_file(database_url: str) -> Optional[str]:
+    """The path of a SQLite database file, or None for other databases."""
+    url = make_url(database_url)
+
+    if url.get_backend_name() != "sqlite" or _is_in_memory_sqlite(database_url):
+        return None
+
+    return url.database
+
+
+def list_households() -> list[str]:
+    """The households that have a database, found by their SQLite files.
+
+    Raises:
+        RuntimeError: If household mode is not enabled, or the household databases
+            are not SQLite files, which cannot be listed.
+    """
+    path = sqlite_file(_household_database_url_template())
+
+    if path is None or HOUSEHOLD_PLACEHOLDER not in path:
+        raise RuntimeError(
+            "Household databases can only be listed when they are SQLite files "
+            f"named after the household; name them instead: {path}"
+        )
+
+    prefix, _, suffix = path.partition(HOUSEHOLD_PLACEHOLDER)
+    pattern = re.compile(re.escape(prefix) + "(.+)" + re.escape(suffix))
+    matches = (pattern.fullmatch(p) for p in glob.glob(glob.escape(prefix) + "*"))
+
+    return sorted(
+        m.group(1) for m in matches if m is not None and is_valid_household(m.group(1))
+    )
+
+
+class HouseholdDatabase:
+    """The engines and sessionmakers of one household's database."""
+
+    def __init__(self, household: str):
+        """
+        Create the engines of a household; they connect on first use.
+
+        Args:
+            household (str): The household ID.
+        """
+        self.household = household
+        self.db_config = DatabaseConfig(household_database_url(household))
+
+        info = {HOUSEHOLD_KEY: household}
+        self.sessionmaker, self.readonly_sessionmaker = self.db_config.get_session(
+            info=info
+        )
+        self.used_at = time.monotonic()
+
+
+class HouseholdDatabases:
+    """An LRU of household databases that closes the idle ones."""
+
+    def __init__(self, max_entries: int, idle_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of households with open engines.
+            idle_seconds (float): How long the engines of an unused household stay
+                open.
+        """
+        self._max_entries = max(max_entries, 1)
+        self._idle_seconds = idle_seconds
+        self._entries: OrderedDict[str, HouseholdDatabase] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, household: str) -> HouseholdDatabase:
+        """The database of `household`, creating its engines if needed.
+
+        Raises:
+            HTTPException: 404 if the household has no database file.
+        """
+        with self._lock:
+            evicted = self._evict_idle()
+            database = self._entries.get(household)
+
+            if database is None:
+                path = sqlite_file(household_database_url(household))
+
+                if path is not None and not os.path.exists(path):
+                    self._dispose(evicted)
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Unknown household: {household}",
+                    )
+
+                log.debug("Opening household database", household=household)
+                database = HouseholdDatabase(household)
+                self._entries[household] = database
+
+                while len(self._entries) > self._max_entries:
+                    evicted.append(self._entries.popitem(last=False)[1])
+
+            database.used_at = time.monotonic()
+            self._entries.move_to_end(household)
+
+        self._dispose(evicted)
+
+        return database
+
+    def _evict_idle(self) -> list[HouseholdDatabase]:
+        """Remove the households unused for `idle_seconds`, oldest first."""
+        evicted = []
+        cutoff = time.monotonic() - self._idle_seconds
+
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.used_at >= cutoff:
+                break
+            evicted.append(self._entries.popitem(last=False)[1])
+
+        return evicted
+
+    def _dispose(self, databases: list[HouseholdDatabase]) -> None:
+        for database in databases:
+            log.debug("Closing household database", household=database.household)
+            database.db_config.dispose()
+
+    def close_all(self) -> None:
+        """Close the engines of all households."""
+        with self._lock:
+            evicted = list(self._entries.values())
+            self._entries.clear()
+
+        self._dispose(evicted)
+
+
+household_databases = HouseholdDatabases(
+    max_entries=config.household_cache_size,
+    idle_seconds=config.household_idle_seconds,
+)
+
+
+def session_factory(household: Optional[str], readonly: bool = False) -> sessionmaker:
+    """The sessionmaker of a household's database.
+
+    Args:
+        household: The household, or None for the database of `config.database_url`.
+        readonly: Return the sessionmaker of the read-only connection pool.
+
+    Raises:
+        HTTPException: 404 if the household has no database file.
+    """
+    if household is None:
+        return SessionLocalReadonly if readonly else SessionLocal
+
+    database = household_databases.get(household)
+
+    return database.readonly_sessionmaker if readonly else database.sessionmaker
+
+
+def database_config(household: Optional[str]) -> DatabaseConfig:
+    """The `DatabaseConfig` of a household's database.
+
+    Args:
+        household: The household, or None for the database of `config.database_url`.
+
+    Raises:
+        HTTPException: 404 if the household has no database file.
+    """
+    if household is None:
+        return db_config
+
+    return household_databases.get(household).db_config
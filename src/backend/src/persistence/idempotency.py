@@ -0,0 +1,255 @@
+"""Stored responses of requests sent with an `Idempotency-Key`.
+
+A key is reserved in the `idempotency_keys` table before its request runs, and the
+response is stored under it once the request has been answered, see
+`common.idempotency.IdempotencyMiddleware`. Stored responses are also kept in an
+in-memory LRU, so that a retried request is usually answered without touching the
+database. Keys expire after `config.idempotency_ttl_seconds`; a reservation whose
+request never completed, e.g. because the process died, is given up after
+`PENDING_TIMEOUT_SECONDS`.
+
+The table is written through its own connections rather than a `Session`, so that
+storing responses is not taken for a change of the events: it neither invalidates
+the event count cache nor shows up on the change log, from which the ETags of
+conditional GETs are derived. In household mode
+every household database has its own table, so keys are scoped to the household.
+"""
+
+import datetime
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import (
+    DateTime,
+    Engine,
+    LargeBinary,
+    String,
+    Text,
+    delete,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column
+
+from config import config
+from persistence.database import Base
+
+# Seconds after which the reservation of a request that never completed lapses.
+PENDING_TIMEOUT_SECONDS = 60
+
+# Seconds between deletions of the expired keys from the table.
+PURGE_INTERVAL_SECONDS = 60
+
+
+class IdempotencyRecord(Base):
+    """The response to the first request sent with an idempotency key."""
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # Hash of the method, path and body of the request.
+    fingerprint: Mapped[Optional[str]] = mapped_column(nullable=True)
+    # The response; all None while the request is still running.
+    status_code: Mapped[Optional[int]] = mapped_column(nullable=True)
+    headers: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), index=True
+    )
+
+
+class StoredResponse(NamedTuple):
+    """A response stored under an idempotency key."""
+
+    fingerprint: str
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+# (database URL, idempotency key) of a response kept in memory.
+CacheKey = tuple[str, str]
+
+
+class Pending:
+    """A reservation of a key whose request is still running."""
+
+
+def _now() -> datetime.datetime:
+    """The current UTC time, naive as stored in the database."""
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+class IdempotencyStore:
+    """Reserves idempotency keys and stores the responses to their requests."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the store.
+
+        Every method takes the engine of the database holding the
+        `idempotency_keys` table the key belongs to.
+
+        Args:
+            max_entries (int): Maximum number of responses kept in memory.
+            ttl_seconds (float): How long a key is remembered.
+        """
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[CacheKey, tuple[float, StoredResponse]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        # When the expired keys of each database were last deleted.
+        self._purged_at: dict[str, float] = {}
+
+    def _cached(self, key: CacheKey) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires_at, response = entry
+
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+            return response
+
+    def _cache(self, key: CacheKey, response: StoredResponse, age: float = 0) -> None:
+        if self._max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_seconds - age, response)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, engine: Engine, key: str) -> StoredResponse | Pending | None:
+        """The stored response of `key`, its pending reservation, or None."""
+        response = self._cached((str(engine.url), key))
+
+        if response is not None:
+            return response
+
+        table = IdempotencyRecord.__table__
+        with engine.connect() as connection:
+            row = connection.execute(
+                select(table).where(table.c.key == key)
+            ).one_or_none()
+
+        if row is None:
+            return None
+
+        age = (_now() - row.created_at).total_seconds()
+
+        if row.status_code is None:
+            return None if age > PENDING_TIMEOUT_SECONDS else Pending()
+
+        if age > self._ttl_seconds:
+            return None
+
+        response = StoredResponse(
+            fingerprint=row.fingerprint,
+            status_code=row.status_code,
+            headers=[
+                (name.encode("latin-1"), value.encode("latin-1"))
+                for name, value in json.loads(row.headers)
+            ],
+            body=row.body,
+        )
+        self._cache((str(engine.url), key), response, age=age)
+
+        return response
+
+    def reserve(self, engine: Engine, key: str) -> bool:
+        """Reserve `key` for a request about to run.
+
+        Takes over an expired key, or a reservation that lapsed.
+
+        Returns:
+            bool: False if another request holds or completed the key.
+        """
+        table = IdempotencyRecord.__table__
+        now = _now()
+        ttl_cutoff = now - datetime.timedelta(seconds=self._ttl_seconds)
+        pending_cutoff = now - datetime.timedelta(seconds=PENDING_TIMEOUT_SECONDS)
+
+        with engine.begin() as connection:
+            database = str(engine.url)
+            if (
+                time.monotonic() - self._purged_at.get(database, -math.inf)
+                > PURGE_INTERVAL_SECONDS
+            ):
+                self._purged_at[database] = time.monotonic()
+                connection.execute(delete(table).where(table.c.created_at < ttl_cutoff))
+
+            # Take over a lapsed reservation or an expired key, if it is one.
+            connection.execute(
+                delete(table).where(
+                    table.c.key == key,
+                    (table.c.created_at < ttl_cutoff)
+                    | (
+                        table.c.status_code.is_(None)
+                        & (table.c.created_at < pending_cutoff)
+                    ),
+                )
+            )
+
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(table).values(key=key, created_at=now))
+            except IntegrityError:
+                return False
+
+        return True
+
+    def complete(self, engine: Engine, key: str, response: StoredResponse) -> None:
+        """Store the response to the request that reserved `key`."""
+        table = IdempotencyRecord.__table__
+
+        with engine.begin() as connection:
+            connection.execute(
+                update(table)
+                .where(table.c.key == key)
+                .values(
+                    fingerprint=response.fingerprint,
+                    status_code=response.status_code,
+                    headers=json.dumps(
+                        [
+                            (name.decode("latin-1"), value.decode("latin-1"))
+                            for name, value in response.headers
+                        ]
+                    ),
+                    body=response.body,
+                )
+            )
+
+        self._cache((str(engine.url), key), response)
+
+    def release(self, engine: Engine, key: str) -> None:
+        """Give up the reservation of `key`, so that the request can be retried."""
+        table = IdempotencyRecord.__table__
+
+        with engine.begin() as connection:
+            connection.execute(
+                delete(table).where(table.c.key == key, table.c.status_code.is_(None))
+            )
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=config.idempotency_cache_size,
+    ttl_seconds=config.idempotency_ttl_seconds,
+)
@@ -0,0 +1,98 @@
+"""Keyset (cursor) pagination helpers.
+
+Events are always listed newest first, ordered by ``(time_start, id)``. Rather than
+skipping rows with ``OFFSET`` (which gets slower the deeper the page), a client can
+pass back the opaque cursor returned with the previous page, and the next page
+starts strictly after that ``(time_start, id)`` position.
+
+Example:
+    ```python
+    query = db.query(models.PumpEvent)
+    rows, next_cursor = paginate_newest_first(
+        query,
+        time_start_column=models.PumpEvent.time_start,
+        id_column=models.PumpEvent.id,
+        limit=100,
+        cursor=cursor,
+    )
+    ```
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+# Response header carrying the next page cursor on endpoints that return a bare list.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(time_start: datetime.datetime, event_id: str) -> str:
+    """Encode a ``(time_start, id)`` position into an opaque cursor string."""
+    payload = json.dumps([time_start.isoformat(), event_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, str]:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        time_start, event_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(time_start), str(event_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise HTTPException(
+            detail=f"Invalid cursor {cursor!r}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        ) from e
+
+
+def paginate_newest_first(
+    query: Query,
+    time_start_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> tuple[list[Any], Optional[str]]:
+    """Fetch one page of `query` ordered by ``(time_start, id)`` descending.
+
+    When `cursor` is given it takes precedence over `offset`. One extra row is
+    fetched to find out whether another page exists, so that the last page
+    returns no cursor.
+
+    Returns:
+        tuple[list, Optional[str]]: (rows, cursor for the next page or None)
+    """
+    if cursor:
+        cursor_time_start, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                time_start_column < cursor_time_start,
+                and_(time_start_column == cursor_time_start, id_column < cursor_id),
+            )
+        )
+        offset = 0
+
+    rows = (
+        query.order_by(time_start_column.desc(), id_column.desc())
+        .offset(offset)
+        .limit(limit + 1)
+        .all()
+    )
+
+    if limit <= 0 or len(rows) <= limit:
+        return rows[: max(limit, 0)], None
+
+    rows = rows[:limit]
+    last = rows[-1]
+
+    return rows, encode_cursor(last.time_start, last.id)
@@ -0,0 +1,203 @@
+"""Column-wise computations shared by the per-type statistics.
+
+The statistics persistence classes select only the columns a statistic needs and
+return them as `array.array` columns: one contiguous, typed buffer per column
+instead of one ORM object (or even one row tuple) per event. Times are selected as
+UTC epoch seconds, so no `datetime` objects are built either.
+
+The functions here work on whole columns at once. Without numpy that means
+C-implemented building blocks over the buffers: comprehensions, `zip`,
+`itertools.accumulate` and `groupby`, `collections.Counter` and `bisect` on the
+sorted values.
+"""
+
+import datetime
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate, groupby
+from operator import itemgetter
+from typing import Iterable, Optional, Sequence, cast
+
+from stats import schemas
+
+SECONDS_PER_DAY = 86400
+
+# Upper bin edges of the histograms; the last bin is open-ended.
+INTERVAL_EDGES_MINUTES = (30, 60, 90, 120, 180, 240, 360, 480, 720)
+DURATION_EDGES_MINUTES = (5, 10, 15, 20, 30, 45, 60)
+AMOUNT_EDGES_ML = (25, 50, 75, 100, 150, 200, 300)
+
+_EPOCH_DAY = datetime.date(1970, 1, 1)
+
+# Parts of the (day, value) pairs of `daily_sums`.
+_DAY = itemgetter(0)
+_VALUE = itemgetter(1)
+
+
+def to_columns(rows: Sequence[Sequence], typecodes: str) -> tuple[array, ...]:
+    """Transpose result rows into one `array` per column.
+
+    Args:
+        rows: Result rows, all of the same length.
+        typecodes: One `array` typecode per column, e.g. ``"dd"`` for two float
+            columns. NULLs in a float column become NaN.
+    """
+    if not rows:
+        return tuple(array(typecode) for typecode in typecodes)
+
+    return tuple(
+        array(typecode, _without_nulls(column) if typecode in "fd" else column)
+        for typecode, column in zip(typecodes, zip(*rows))
+    )
+
+
+def _without_nulls(column: Sequence[Optional[float]]) -> Sequence[float]:
+    if None not in column:
+        return cast(Sequence[float], column)
+
+    return [math.nan if value is None else value for value in column]
+
+
+def day_numbers(epoch_seconds: array) -> array:
+    """The UTC day of each time, as days since 1970-01-01."""
+    return array("q", [int(seconds // SECONDS_PER_DAY) for seconds in epoch_seconds])
+
+
+def day_span(days: Sequence[int]) -> tuple[int, int]:
+    """First day and number of days from the first to the last of sorted `days`."""
+    if not days:
+        return 0, 0
+
+    return days[0], days[-1] - days[0] + 1
+
+
+def day_dates(first_day: int, day_count: int) -> list[datetime.date]:
+    """The dates of `day_count` consecutive day numbers starting at `first_day`."""
+    return [
+        _EPOCH_DAY + datetime.timedelta(days=day)
+        for day in range(first_day, first_day + day_count)
+    ]
+
+
+def daily_counts(days: Iterable[int], first_day: int, day_count: int) -> array:
+    """Number of entries per day, for every day of the span (0 for empty days)."""
+    counts = Counter(days)
+    return array("q", [counts[day] for day in range(first_day, first_day + day_count)])
+
+
+def daily_category_counts(
+    days: Iterable[int],
+    codes: Iterable[int],
+    category_count: int,
+    first_day: int,
+    day_count: int,
+) -> list[array]:
+    """Like `daily_counts`, separately for each category code in
+    ``range(category_count)``; other codes are not counted."""
+    counts = Counter(zip(codes, days))
+    return [
+        array(
+            "q", [counts[code, day] for day in range(first_day, first_day + day_count)]
+        )
+        for code in range(category_count)
+    ]
+
+
+def daily_sums(
+    days: Iterable[int], values: Iterable[float], first_day: int, day_count: int
+) -> array:
+    """Sum of `values` per day, for every day of the span (0 for empty days).
+
+    Runs of equal days are summed at once with `math.fsum`, so `days` in time order,
+    as the statistics select them, cost one step per day rather than per value. Any
+    order gives the same sums.
+    """
+    totals = array("d", bytes(8 * day_count))
+
+    for day, pairs in groupby(zip(days, values), _DAY):
+        totals[day - first_day] += math.fsum(map(_VALUE, pairs))
+
+    return totals
+
+
+def trailing_means(values: Sequence[float], window: int) -> array:
+    """Mean of each value and the `window - 1` values before it.
+
+    Computed from prefix sums, so the cost does not depend on `window`. The first
+    values, which have fewer predecessors, are averaged over what is there.
+    """
+    prefix = array("d", accumulate(values, initial=0.0))
+
+    return array(
+        "d",
+        [
+            (prefix[end] - prefix[max(0, end - window)]) / min(end, window)
+            for end in range(1, len(prefix))
+        ],
+    )
+
+
+def is_known(values: Iterable[float]) -> list[bool]:
+    """Whether each value is not NaN, e.g. to `itertools.compress` columns."""
+    return [not math.isnan(value) for value in values]
+
+
+def gaps_minutes(sorted_epoch_seconds: array) -> array:
+    """Minutes between each time and the one before it."""
+    return array(
+        "d",
+        [
+            (later - earlier) / 60
+            for earlier, later in zip(sorted_epoch_seconds, sorted_epoch_seconds[1:])
+        ],
+    )
+
+
+def _percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Linearly interpolated percentile of non-empty sorted values."""
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (
+        position - lower
+    )
+
+
+def distribution(
+    values: Iterable[float], edges: Sequence[float]
+) -> schemas.Distribution:
+    """Summarize values with percentiles and a histogram.
+
+    Args:
+        values: The values, in any order.
+        edges: Increasing upper bounds (exclusive) of the histogram bins. The first
+            bin has no lower bound, and a last, open-ended bin holds the values at
+            or above the last edge.
+    """
+    sorted_values = sorted(values)
+
+    if not sorted_values:
+        return schemas.Distribution(count=0, histogram=[])
+
+    # Bin counts are differences of the insertion points of the edges.
+    positions = [0, *(bisect_left(sorted_values, edge) for edge in edges)]
+    positions.append(len(sorted_values))
+    lowers: list[Optional[float]] = [None, *edges]
+    uppers: list[Optional[float]] = [*edges, None]
+
+    return schemas.Distribution(
+        count=len(sorted_values),
+        mean=math.fsum(sorted_values) / len(sorted_values),
+        p10=_percentile(sorted_values, 0.1),
+        median=_percentile(sorted_values, 0.5),
+        p90=_percentile(sorted_values, 0.9),
+        histogram=[
+            schemas.HistogramBin(
+                lower=lower, upper=upper, count=positions[i + 1] - positions[i]
+            )
+            for i, (lower, upper) in enumerate(zip(lowers, uppers))
+        ],
+    )
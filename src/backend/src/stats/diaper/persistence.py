@@ -0,0 +1,59 @@
+from array import array
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from structlog import get_logger
+
+from events.diaper.models import DiaperEvent
+from events.diaper.schemas import DiaperType
+from events.models import Event
+from stats.columns import to_columns
+from stats.persistence import category_codes, epoch_seconds
+
+
+class DiaperStatsPersistence:
+    def __init__(self, db: Session):
+        self._log = get_logger()
+        self._db = db
+
+    def get_diaper_columns(
+        self, start_date: datetime | None, end_date: datetime | None
+    ) -> tuple[array, array]:
+        """Retrieve the time and type of the diaper changes within a date range.
+
+        Returns:
+            Columns ``(time_start, diaper_type)`` in chronological order, with
+            ``time_start`` in UTC epoch seconds and ``diaper_type`` as the position
+            of the type in `DiaperType`.
+        """
+        self._log.debug(
+            "Retrieving diaper columns for stats",
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+        events = Event.__table__
+        diaper_events = DiaperEvent.__table__
+
+        query = (
+            select(
+                epoch_seconds(events.c.time_start, self._db.get_bind().dialect.name),
+                category_codes(diaper_events.c.diaper_type, list(DiaperType)),
+            )
+            .join_from(events, diaper_events, events.c.id == diaper_events.c.id)
+            .order_by(events.c.time_start, events.c.id)
+        )
+
+        if start_date:
+            query = query.where(events.c.time_start >= start_date)
+        if end_date:
+            query = query.where(events.c.time_start <= end_date)
+
+        times, diaper_types = to_columns(self._db.execute(query).all(), "db")
+
+        self._log.debug(
+            "Diaper columns for stats retrieved successfully", count=len(times)
+        )
+
+        return times, diaper_types
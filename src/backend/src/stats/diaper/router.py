@@ -0,0 +1,32 @@
+"""Router for diaper statistics."""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from common.routing import TrustedResponseRoute
+from pydantic import AwareDatetime
+from stats.diaper.service import DiaperStatsService
+from stats.diaper import schemas
+from persistence.dependencies import get_db_read_only
+
+router = APIRouter(route_class=TrustedResponseRoute)
+
+
+@router.get("/", response_model=schemas.DiaperStatistic)
+def get_diaper_statistic(
+    start_date: Optional[AwareDatetime] = Query(
+        None, description="Only changes at or after this time"
+    ),
+    end_date: Optional[AwareDatetime] = Query(
+        None, description="Only changes at or before this time"
+    ),
+    rolling_days: int = Query(
+        7, ge=1, le=365, description="Number of days of the rolling daily mean"
+    ),
+    db: Session = Depends(get_db_read_only),
+):
+    """Daily diaper changes per type with a rolling mean, and the interval distribution."""
+    service = DiaperStatsService(db=db)
+    return service.get_diaper_statistic(
+        start_date=start_date, end_date=end_date, rolling_days=rolling_days
+    )
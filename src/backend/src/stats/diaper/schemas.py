@@ -0,0 +1,27 @@
+import datetime
+
+from pydantic import BaseModel
+
+from stats.schemas import Distribution
+
+
+class DiaperDailyStatistic(BaseModel):
+    """Diaper changes of one day (UTC)."""
+
+    day: datetime.date
+    change_count: int
+    # `change_count` split by `DiaperType`.
+    pee_count: int
+    poop_count: int
+    both_count: int
+    # Mean daily changes over this day and the days before it, see `rolling_days`.
+    rolling_change_count: float
+
+
+class DiaperStatistic(BaseModel):
+    """Diaper change frequency within a date range."""
+
+    rolling_days: int
+    # Every day from the first to the last change, including days without any.
+    days: list[DiaperDailyStatistic]
+    interval_minutes: Distribution
@@ -0,0 +1,86 @@
+from pydantic import AwareDatetime
+from sqlalchemy.orm import Session
+
+from common.service import CommonService
+from events.diaper.schemas import DiaperType
+from stats import columns
+from stats.diaper import schemas
+from stats.diaper.persistence import DiaperStatsPersistence
+
+
+class DiaperStatsService(CommonService):
+    """Service for diaper statistics."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize the DiaperStatsService with a database session.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        super().__init__(db)
+        self._persistence = DiaperStatsPersistence(db=db)
+
+    def get_diaper_statistic(
+        self,
+        start_date: AwareDatetime | None,
+        end_date: AwareDatetime | None,
+        rolling_days: int,
+    ) -> schemas.DiaperStatistic:
+        """Get daily diaper change counts per type, their rolling mean and the
+        interval distribution."""
+        self._log.debug(
+            "Getting diaper statistic",
+            start_date=start_date,
+            end_date=end_date,
+            rolling_days=rolling_days,
+        )
+
+        times, diaper_types = self._persistence.get_diaper_columns(
+            start_date=start_date, end_date=end_date
+        )
+
+        days = columns.day_numbers(times)
+        first_day, day_count = columns.day_span(days)
+        change_counts = columns.daily_counts(days, first_day, day_count)
+        type_counts = dict(
+            zip(
+                DiaperType,
+                columns.daily_category_counts(
+                    days, diaper_types, len(DiaperType), first_day, day_count
+                ),
+            )
+        )
+        rolling_counts = columns.trailing_means(change_counts, rolling_days)
+
+        return schemas.DiaperStatistic(
+            rolling_days=rolling_days,
+            days=[
+                schemas.DiaperDailyStatistic(
+                    day=day,
+                    change_count=change_count,
+                    pee_count=pee_count,
+                    poop_count=poop_count,
+                    both_count=both_count,
+                    rolling_change_count=rolling_count,
+                )
+                for (
+                    day,
+                    change_count,
+                    pee_count,
+                    poop_count,
+                    both_count,
+                    rolling_count,
+                ) in zip(
+                    columns.day_dates(first_day, day_count),
+                    change_counts,
+                    type_counts[DiaperType.PEE],
+                    type_counts[DiaperType.POOP],
+                    type_counts[DiaperType.BOTH],
+                    rolling_counts,
+                )
+            ],
+            interval_minutes=columns.distribution(
+                columns.gaps_minutes(times), columns.INTERVAL_EDGES_MINUTES
+            ),
+        )
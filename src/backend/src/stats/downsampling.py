@@ -0,0 +1,79 @@
+"""Downsampling of chart series.
+
+A chart is at most a few thousand pixels wide, so sending it more points than that
+only costs bandwidth and rendering time. Plain decimation (every n-th point) would
+drop exactly the outliers a chart is meant to show. Largest-Triangle-Three-Buckets
+(LTTB, Steinarsson 2013) instead splits the series into buckets and keeps from each
+the real point that forms the largest triangle with the point kept before it and
+the average of the next bucket, which preserves peaks and dips.
+"""
+
+from typing import Callable, Sequence, TypeVar
+
+PointT = TypeVar("PointT")
+
+
+def largest_triangle_three_buckets(
+    points: Sequence[PointT],
+    max_points: int,
+    x: Callable[[PointT], float],
+    y: Callable[[PointT], float],
+) -> list[PointT]:
+    """Select at most `max_points` of `points` that keep the shape of the series.
+
+    Args:
+        points: The series, ordered by `x`.
+        max_points: Number of points to keep; at least 3. The first and last points
+            are always kept.
+        x: Position of a point along the x axis, e.g. its timestamp.
+        y: Value of a point that the kept shape is based on.
+
+    Returns:
+        list: A subsequence of `points`, in order.
+    """
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+
+    if len(points) <= max_points:
+        return list(points)
+
+    xs = [x(point) for point in points]
+    ys = [y(point) for point in points]
+
+    # The first and last points are kept as is; the others are split evenly into
+    # `max_points - 2` buckets.
+    bucket_size = (len(points) - 2) / (max_points - 2)
+    selected = [0]
+
+    for bucket in range(max_points - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the next bucket; for the last bucket that is the last point.
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, len(points))
+        next_count = next_end - next_start
+        average_x = sum(xs[next_start:next_end]) / next_count
+        average_y = sum(ys[next_start:next_end]) / next_count
+
+        previous_x = xs[selected[-1]]
+        previous_y = ys[selected[-1]]
+
+        best_index = start
+        best_area = -1.0
+
+        for index in range(start, end):
+            # Twice the triangle area; the factor does not change the comparison.
+            area = abs(
+                (previous_x - average_x) * (ys[index] - previous_y)
+                - (previous_x - xs[index]) * (average_y - previous_y)
+            )
+            if area > best_area:
+                best_area = area
+                best_index = index
+
+        selected.append(best_index)
+
+    selected.append(len(points) - 1)
+
+    return [points[index] for index in selected]
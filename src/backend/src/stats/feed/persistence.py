@@ -0,0 +1,69 @@
+from array import array
+from datetime import datetime
+
+from sqlalchemy import case, select
+from sqlalchemy.orm import Session
+from structlog import get_logger
+
+from events.feed.models import FeedBreastEvent
+from events.feed.schemas import BreastSide
+from events.models import Event
+from stats.columns import to_columns
+from stats.persistence import category_codes, epoch_seconds, minutes_between
+
+
+class FeedStatsPersistence:
+    def __init__(self, db: Session):
+        self._log = get_logger()
+        self._db = db
+
+    def get_breast_feed_columns(
+        self, start_date: datetime | None, end_date: datetime | None
+    ) -> tuple[array, array, array]:
+        """Retrieve the time, duration and side of the breastfeeds within a date range.
+
+        Returns:
+            Columns ``(time_start, duration_minutes, side)`` in chronological order,
+            with ``time_start`` in UTC epoch seconds and ``side`` as the position of
+            the side in `BreastSide`. ``duration_minutes`` is NaN for feeds without
+            an end time, or with one before the start.
+        """
+        self._log.debug(
+            "Retrieving breast feed columns for stats",
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+        dialect_name = self._db.get_bind().dialect.name
+        events = Event.__table__
+        breast_feeds = FeedBreastEvent.__table__
+
+        query = (
+            select(
+                epoch_seconds(events.c.time_start, dialect_name),
+                case(
+                    (
+                        events.c.time_end >= events.c.time_start,
+                        minutes_between(
+                            events.c.time_end, events.c.time_start, dialect_name
+                        ),
+                    )
+                ),
+                category_codes(breast_feeds.c.side, list(BreastSide)),
+            )
+            .join_from(events, breast_feeds, events.c.id == breast_feeds.c.id)
+            .order_by(events.c.time_start, events.c.id)
+        )
+
+        if start_date:
+            query = query.where(events.c.time_start >= start_date)
+        if end_date:
+            query = query.where(events.c.time_start <= end_date)
+
+        times, durations, sides = to_columns(self._db.execute(query).all(), "ddb")
+
+        self._log.debug(
+            "Breast feed columns for stats retrieved successfully", count=len(times)
+        )
+
+        return times, durations, sides
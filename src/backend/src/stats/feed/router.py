@@ -0,0 +1,33 @@
+"""Router for feed statistics."""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from common.routing import TrustedResponseRoute
+from pydantic import AwareDatetime
+from stats.feed.service import FeedStatsService
+from stats.feed import schemas
+from persistence.dependencies import get_db_read_only
+
+router = APIRouter(route_class=TrustedResponseRoute)
+
+
+@router.get("/breast", response_model=schemas.BreastFeedStatistic)
+def get_breast_feed_statistic(
+    start_date: Optional[AwareDatetime] = Query(
+        None, description="Only feeds starting at or after this time"
+    ),
+    end_date: Optional[AwareDatetime] = Query(
+        None, description="Only feeds starting at or before this time"
+    ),
+    rolling_days: int = Query(
+        7, ge=1, le=365, description="Number of days of the rolling daily mean"
+    ),
+    db: Session = Depends(get_db_read_only),
+):
+    """Daily breastfeeds per side and durations with a rolling mean, and the duration
+    and interval distributions."""
+    service = FeedStatsService(db=db)
+    return service.get_breast_feed_statistic(
+        start_date=start_date, end_date=end_date, rolling_days=rolling_days
+    )
@@ -0,0 +1,30 @@
+import datetime
+
+from pydantic import BaseModel
+
+from stats.schemas import Distribution
+
+
+class BreastFeedDailyStatistic(BaseModel):
+    """Breastfeeds of one day (UTC)."""
+
+    day: datetime.date
+    feed_count: int
+    # `feed_count` split by `BreastSide`.
+    left_count: int
+    right_count: int
+    both_count: int
+    # Total duration of the feeds that have an end time.
+    duration_minutes: float
+    # Mean daily duration over this day and the days before it, see `rolling_days`.
+    rolling_duration_minutes: float
+
+
+class BreastFeedStatistic(BaseModel):
+    """Breastfeeding durations and sides within a date range."""
+
+    rolling_days: int
+    # Every day from the first to the last feed, including days without any.
+    days: list[BreastFeedDailyStatistic]
+    duration_minutes: Distribution
+    interval_minutes: Distribution
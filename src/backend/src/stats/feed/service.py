@@ -0,0 +1,100 @@
+from itertools import compress
+
+from pydantic import AwareDatetime
+from sqlalchemy.orm import Session
+
+from common.service import CommonService
+from events.feed.schemas import BreastSide
+from stats import columns
+from stats.feed import schemas
+from stats.feed.persistence import FeedStatsPersistence
+
+
+class FeedStatsService(CommonService):
+    """Service for breastfeeding statistics."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize the FeedStatsService with a database session.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        super().__init__(db)
+        self._persistence = FeedStatsPersistence(db=db)
+
+    def get_breast_feed_statistic(
+        self,
+        start_date: AwareDatetime | None,
+        end_date: AwareDatetime | None,
+        rolling_days: int,
+    ) -> schemas.BreastFeedStatistic:
+        """Get daily breastfeed counts per side and durations, the rolling mean of
+        the durations and the duration and interval distributions."""
+        self._log.debug(
+            "Getting breast feed statistic",
+            start_date=start_date,
+            end_date=end_date,
+            rolling_days=rolling_days,
+        )
+
+        times, durations, sides = self._persistence.get_breast_feed_columns(
+            start_date=start_date, end_date=end_date
+        )
+
+        days = columns.day_numbers(times)
+        first_day, day_count = columns.day_span(days)
+        feed_counts = columns.daily_counts(days, first_day, day_count)
+        side_counts = dict(
+            zip(
+                BreastSide,
+                columns.daily_category_counts(
+                    days, sides, len(BreastSide), first_day, day_count
+                ),
+            )
+        )
+
+        has_duration = columns.is_known(durations)
+        known_durations = list(compress(durations, has_duration))
+        daily_durations = columns.daily_sums(
+            compress(days, has_duration), known_durations, first_day, day_count
+        )
+        rolling_durations = columns.trailing_means(daily_durations, rolling_days)
+
+        return schemas.BreastFeedStatistic(
+            rolling_days=rolling_days,
+            days=[
+                schemas.BreastFeedDailyStatistic(
+                    day=day,
+                    feed_count=feed_count,
+                    left_count=left_count,
+                    right_count=right_count,
+                    both_count=both_count,
+                    duration_minutes=duration,
+                    rolling_duration_minutes=rolling_duration,
+                )
+                for (
+                    day,
+                    feed_count,
+                    left_count,
+                    right_count,
+                    both_count,
+                    duration,
+                    rolling_duration,
+                ) in zip(
+                    columns.day_dates(first_day, day_count),
+                    feed_counts,
+                    side_counts[BreastSide.LEFT],
+                    side_counts[BreastSide.RIGHT],
+                    side_counts[BreastSide.BOTH],
+                    daily_durations,
+                    rolling_durations,
+                )
+            ],
+            duration_minutes=columns.distribution(
+                known_durations, columns.DURATION_EDGES_MINUTES
+            ),
+            interval_minutes=columns.distribution(
+                columns.gaps_minutes(times), columns.INTERVAL_EDGES_MINUTES
+            ),
+        )
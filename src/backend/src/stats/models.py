@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Enum
+from sqlalchemy.orm import Mapped, mapped_column
+from events.schemas import EventType
+from persistence.database import Base
+from stats.schemas import RollupGranularity
+
+
+class EventRollup(Base):
+    """Per-hour and per-day aggregates of each event type.
+
+    Maintained by `stats.rollups` whenever events change, so that statistics over
+    long ranges read one row per bucket instead of every event.
+    """
+
+    __tablename__ = "event_rollups"
+
+    granularity: Mapped[RollupGranularity] = mapped_column(
+        Enum(RollupGranularity), primary_key=True
+    )
+    event_type: Mapped[EventType] = mapped_column(Enum(EventType), primary_key=True)
+    # Start of the hour or day, of the event times as stored (see `stats.rollups`).
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+
+    event_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    amount_ml: Mapped[float] = mapped_column(nullable=False, default=0)
+    formula_ml: Mapped[float] = mapped_column(nullable=False, default=0)
+    breast_milk_ml: Mapped[float] = mapped_column(nullable=False, default=0)
+    pee_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    poop_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    both_count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<EventRollup(granularity={self.granularity}, event_type={self.event_type}, bucket_start={self.bucket_start})>"
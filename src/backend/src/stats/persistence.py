@@ -1,41 +1,184 @@
-from typing import Sequence
+from typing import Any, Optional, Sequence
+from enum import Enum
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Row,
+    case,
+    extract,
+    func,
+    literal,
+    select,
+    type_coerce,
+)
 from sqlalchemy.orm import Session
 from structlog import get_logger
+from events.models import Event
 from events.feed.models import FeedBottleEvent
+from events.schemas import EventType
+from stats.models import EventRollup
+from stats.schemas import RollupGranularity
 from datetime import datetime
 
 
+def minutes_between(
+    later: ColumnElement, earlier: ColumnElement, dialect_name: str
+) -> ColumnElement[float]:
+    """SQL expression for the minutes from `earlier` to `later`.
+
+    Typed as a float, so that databases whose `extract` returns a numeric, e.g.
+    PostgreSQL, also give floats rather than `Decimal`s.
+    """
+    if dialect_name == "sqlite":
+        # SQLite stores datetimes as text; julianday() turns them into fractional
+        # days. Rounded to the millisecond to drop floating point noise.
+        minutes = (
+            func.round((func.julianday(later) - func.julianday(earlier)) * 86400000)
+            / 60000.0
+        )
+    else:
+        minutes = extract("epoch", later - earlier) / 60.0
+
+    return type_coerce(minutes, Float())
+
+
+def epoch_seconds(column: ColumnElement, dialect_name: str) -> ColumnElement[float]:
+    """SQL expression for a (naive UTC) datetime column as seconds since the epoch.
+
+    Lets statistics select times as plain floats instead of building a `datetime`
+    per row; typed as a float like `minutes_between`.
+    """
+    seconds: ColumnElement[Any]
+    if dialect_name == "sqlite":
+        # 2440587.5 is the Julian day of 1970-01-01T00:00:00. Rounded to the
+        # millisecond, like `minutes_between`.
+        seconds = func.round((func.julianday(column) - 2440587.5) * 86400000) / 1000.0
+    else:
+        seconds = extract("epoch", column)
+
+    return type_coerce(seconds, Float())
+
+
+def category_codes(
+    column: ColumnElement, categories: Sequence[Enum]
+) -> ColumnElement[int]:
+    """SQL expression for the position of a column's value in `categories`.
+
+    Lets statistics select enum columns into integer arrays. Values that are not in
+    `categories` become -1.
+    """
+    # Bound with the column's type, so e.g. an `Enum` column compares stored names.
+    return case(
+        {
+            literal(category, column.type): code
+            for code, category in enumerate(categories)
+        },
+        value=column,
+        else_=-1,
+    )
+
+
 class StatsPersistence:
     def __init__(self, db: Session):
         self._log = get_logger()
         self._db = db
 
-    def get_bottle_feed_events(
+    def get_bottle_feed_intervals(
         self, start_date: datetime | None, end_date: datetime | None
-    ) -> Sequence[FeedBottleEvent]:
-        """Retrieve bottle feed events within a date range."""
+    ) -> Sequence[Row[tuple[datetime, int, Optional[float]]]]:
+        """Retrieve bottle feeds within a date range with the time since the previous one.
+
+        Only the three columns the statistic needs are selected, and the interval is
+        computed by the database with ``LAG(time_start)``, so no ORM objects are built.
+
+        Returns:
+            Rows of ``(time_start, amount_ml, minutes_since_previous)`` in chronological
+            order. ``minutes_since_previous`` is None for the first feed in the range.
+        """
         self._log.debug(
-            "Retrieving bottle feed events for stats",
+            "Retrieving bottle feed intervals for stats",
             start_date=start_date,
             end_date=end_date,
         )
 
-        query = self._db.query(FeedBottleEvent)
+        events = Event.__table__
+        bottle_feeds = FeedBottleEvent.__table__
+
+        previous_time_start = func.lag(events.c.time_start).over(
+            order_by=(events.c.time_start, events.c.id)
+        )
+
+        query = (
+            select(
+                events.c.time_start,
+                bottle_feeds.c.amount_ml,
+                minutes_between(
+                    events.c.time_start,
+                    previous_time_start,
+                    self._db.get_bind().dialect.name,
+                ).label("minutes_since_previous"),
+            )
+            .join_from(events, bottle_feeds, events.c.id == bottle_feeds.c.id)
+            .order_by(events.c.time_start, events.c.id)
+        )
 
         if start_date:
-            query = query.filter(FeedBottleEvent.time_start >= start_date)
+            query = query.where(events.c.time_start >= start_date)
         if end_date:
-            query = query.filter(FeedBottleEvent.time_start <= end_date)
+            query = query.where(events.c.time_start <= end_date)
 
-        models_list = query.order_by(FeedBottleEvent.time_start.asc()).all()
+        rows = self._db.execute(query).all()
 
-        if not models_list:
+        if not rows:
             self._log.info("No bottle feed events found for stats")
             return []
 
         self._log.debug(
-            "Bottle feed events for stats retrieved successfully",
-            count=len(models_list),
+            "Bottle feed intervals for stats retrieved successfully", count=len(rows)
+        )
+
+        return rows
+
+    def get_rollups(
+        self,
+        granularity: RollupGranularity,
+        start_date: datetime | None,
+        end_date: datetime | None,
+        event_type: EventType | None = None,
+    ) -> Sequence[Row]:
+        """Retrieve the rollup rows of the buckets starting within a date range.
+
+        Reads only the rollup table, so the cost grows with the number of buckets in
+        the range rather than the number of events.
+
+        Returns:
+            Rows of the `event_rollups` columns, ordered by bucket and event type.
+        """
+        self._log.debug(
+            "Retrieving event rollups",
+            granularity=granularity,
+            start_date=start_date,
+            end_date=end_date,
+            event_type=event_type,
         )
 
-        return models_list
+        rollups = EventRollup.__table__
+
+        query = (
+            select(rollups)
+            .where(rollups.c.granularity == granularity)
+            .order_by(rollups.c.bucket_start, rollups.c.event_type)
+        )
+
+        if event_type:
+            query = query.where(rollups.c.event_type == event_type)
+        if start_date:
+            query = query.where(rollups.c.bucket_start >= start_date)
+        if end_date:
+            query = query.where(rollups.c.bucket_start <= end_date)
+
+        rows = self._db.execute(query).all()
+
+        self._log.debug("Event rollups retrieved successfully", count=len(rows))
+
+        return rows
@@ -0,0 +1,57 @@
+from array import array
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from structlog import get_logger
+
+from events.models import Event
+from events.pump.models import PumpEvent
+from stats.columns import to_columns
+from stats.persistence import epoch_seconds
+
+
+class PumpStatsPersistence:
+    def __init__(self, db: Session):
+        self._log = get_logger()
+        self._db = db
+
+    def get_pump_columns(
+        self, start_date: datetime | None, end_date: datetime | None
+    ) -> tuple[array, array]:
+        """Retrieve the time and amount of the pump sessions within a date range.
+
+        Returns:
+            Columns ``(time_start, amount_ml)`` in chronological order, with
+            ``time_start`` in UTC epoch seconds.
+        """
+        self._log.debug(
+            "Retrieving pump columns for stats",
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+        events = Event.__table__
+        pump_events = PumpEvent.__table__
+
+        query = (
+            select(
+                epoch_seconds(events.c.time_start, self._db.get_bind().dialect.name),
+                pump_events.c.amount_ml,
+            )
+            .join_from(events, pump_events, events.c.id == pump_events.c.id)
+            .order_by(events.c.time_start, events.c.id)
+        )
+
+        if start_date:
+            query = query.where(events.c.time_start >= start_date)
+        if end_date:
+            query = query.where(events.c.time_start <= end_date)
+
+        times, amounts = to_columns(self._db.execute(query).all(), "dd")
+
+        self._log.debug(
+            "Pump columns for stats retrieved successfully", count=len(times)
+        )
+
+        return times, amounts
@@ -0,0 +1,25 @@
+import datetime
+
+from pydantic import BaseModel
+
+from stats.schemas import Distribution
+
+
+class PumpDailyStatistic(BaseModel):
+    """Pump sessions of one day (UTC)."""
+
+    day: datetime.date
+    session_count: int
+    amount_ml: float
+    # Mean daily amount over this day and the days before it, see `rolling_days`.
+    rolling_amount_ml: float
+
+
+class PumpStatistic(BaseModel):
+    """Pump output within a date range."""
+
+    rolling_days: int
+    # Every day from the first to the last session, including days without any.
+    days: list[PumpDailyStatistic]
+    amount_ml: Distribution
+    interval_minutes: Distribution
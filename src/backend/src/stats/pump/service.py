@@ -0,0 +1,68 @@
+from pydantic import AwareDatetime
+from sqlalchemy.orm import Session
+
+from common.service import CommonService
+from stats import columns
+from stats.pump import schemas
+from stats.pump.persistence import PumpStatsPersistence
+
+
+class PumpStatsService(CommonService):
+    """Service for pump statistics."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize the PumpStatsService with a database session.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        super().__init__(db)
+        self._persistence = PumpStatsPersistence(db=db)
+
+    def get_pump_statistic(
+        self,
+        start_date: AwareDatetime | None,
+        end_date: AwareDatetime | None,
+        rolling_days: int,
+    ) -> schemas.PumpStatistic:
+        """Get daily pump totals, their rolling mean and the amount and interval
+        distributions."""
+        self._log.debug(
+            "Getting pump statistic",
+            start_date=start_date,
+            end_date=end_date,
+            rolling_days=rolling_days,
+        )
+
+        times, amounts = self._persistence.get_pump_columns(
+            start_date=start_date, end_date=end_date
+        )
+
+        days = columns.day_numbers(times)
+        first_day, day_count = columns.day_span(days)
+        session_counts = columns.daily_counts(days, first_day, day_count)
+        daily_amounts = columns.daily_sums(days, amounts, first_day, day_count)
+        rolling_amounts = columns.trailing_means(daily_amounts, rolling_days)
+
+        return schemas.PumpStatistic(
+            rolling_days=rolling_days,
+            days=[
+                schemas.PumpDailyStatistic(
+                    day=day,
+                    session_count=session_count,
+                    amount_ml=amount_ml,
+                    rolling_amount_ml=rolling_amount_ml,
+                )
+                for day, session_count, amount_ml, rolling_amount_ml in zip(
+                    columns.day_dates(first_day, day_count),
+                    session_counts,
+                    daily_amounts,
+                    rolling_amounts,
+                )
+            ],
+            amount_ml=columns.distribution(amounts, columns.AMOUNT_EDGES_ML),
+            interval_minutes=columns.distribution(
+                columns.gaps_minutes(times), columns.INTERVAL_EDGES_MINUTES
+            ),
+        )
@@ -0,0 +1,240 @@
+"""Maintenance of the event rollup table.
+
+The persistence classes call `mark_changed` with the type and time of every event
+they insert, update or delete. Just before the session commits, each marked
+(event type, day) is recomputed from the raw events: the day row and the hour
+rows of that day are replaced in the same transaction as the change itself. A day
+holds few events, so a write costs one indexed range read no matter how much history
+the rollups cover. Recomputing rather than adding deltas also means an update or
+delete never needs the old values of the columns it changed, only the day an event
+moved away from, which `persistence.direct_update` reports.
+
+Hours and days are those of `time_start` as stored. Events store the time a client
+sent without its UTC offset, and the API returns it as UTC, so the buckets are UTC
+hours and days as long as clients send UTC times; no conversion happens here.
+
+`rebuild` recomputes every rollup. The migration that adds the table backfills it
+with the same sums; run `rebuild` only if the rollups were lost or corrupted:
+
+```sh
+PYTHONPATH=src python -m stats.rollups
+```
+"""
+
+import datetime
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from sqlalchemy import Select, delete, event, insert, select
+from sqlalchemy.orm import Session
+from structlog import get_logger
+
+from events.diaper.models import DiaperEvent
+from events.feed.models import FeedBottleEvent, FeedBreastEvent
+from events.models import Event
+from events.pump.models import PumpEvent
+from events.schemas import EventType
+from stats.models import EventRollup
+from stats.schemas import RollupGranularity
+
+log = get_logger()
+
+# `Session.info` key of the (event type, day) pairs to recompute on commit.
+CHANGED_DAYS_KEY = "rollups_changed_days"
+
+# Event columns the rollups are computed from. Updates that change none of them
+# leave the rollups as they are.
+ROLLUP_COLUMNS = frozenset({"time_start", "amount_ml", "is_formula", "diaper_type"})
+
+_SUBCLASS_MODELS = {
+    EventType.FEED_BOTTLE: FeedBottleEvent,
+    EventType.FEED_BREAST: FeedBreastEvent,
+    EventType.DIAPER_CHANGE: DiaperEvent,
+    EventType.PUMP: PumpEvent,
+}
+
+_TOTAL_COLUMNS = (
+    "event_count",
+    "amount_ml",
+    "formula_ml",
+    "breast_milk_ml",
+    "pee_count",
+    "poop_count",
+    "both_count",
+)
+
+_ONE_DAY = datetime.timedelta(days=1)
+
+
+def _start_of_day(time_start: datetime.datetime) -> datetime.datetime:
+    """The day of an event time as stored (naive, offset dropped) in the database."""
+    return time_start.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def mark_changed(
+    db: Session, event_type: EventType | str, time_start: datetime.datetime
+) -> None:
+    """Have the rollups of the day of `time_start` recomputed when `db` commits."""
+    db.info.setdefault(CHANGED_DAYS_KEY, set()).add(
+        (EventType(event_type), _start_of_day(time_start))
+    )
+
+
+def _source_query(event_type: EventType) -> Select:
+    """Select the time and rollup columns of all events of `event_type`."""
+    events = Event.__table__
+    subclass_table = _SUBCLASS_MODELS[event_type].__table__
+    columns = [column for column in subclass_table.c if column.key in ROLLUP_COLUMNS]
+
+    return (
+        select(events.c.time_start, *columns)
+        .join_from(events, subclass_table, events.c.id == subclass_table.c.id)
+        .where(events.c.name == event_type)
+    )
+
+
+def _aggregate(event_type: EventType, rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Sum `rows` of `_source_query` into hour and day rollup rows."""
+    buckets: dict[tuple[RollupGranularity, datetime.datetime], dict[str, Any]] = {}
+
+    for row in rows:
+        time_start = row.time_start.replace(tzinfo=None)
+        hour = time_start.replace(minute=0, second=0, microsecond=0)
+
+        for granularity, bucket_start in (
+            (RollupGranularity.HOUR, hour),
+            (RollupGranularity.DAY, hour.replace(hour=0)),
+        ):
+            totals = buckets.get((granularity, bucket_start))
+            if totals is None:
+                totals = dict.fromkeys(_TOTAL_COLUMNS, 0)
+                totals.update(
+                    granularity=granularity,
+                    event_type=event_type,
+                    bucket_start=bucket_start,
+                )
+                buckets[(granularity, bucket_start)] = totals
+
+            totals["event_count"] += 1
+
+            if event_type == EventType.FEED_BOTTLE:
+                totals["amount_ml"] += row.amount_ml
+                totals["formula_ml" if row.is_formula else "breast_milk_ml"] += (
+                    row.amount_ml
+                )
+            elif event_type == EventType.PUMP:
+                totals["amount_ml"] += row.amount_ml
+            elif event_type == EventType.DIAPER_CHANGE:
+                totals[f"{row.diaper_type.value}_count"] += 1
+
+    return list(buckets.values())
+
+
+def _refresh_days(
+    db: Session,
+    event_type: EventType,
+    first_day: datetime.datetime,
+    last_day: datetime.datetime,
+) -> None:
+    """Recompute the rollups of `event_type` for the days `first_day`..`last_day`."""
+    events = Event.__table__
+    rollups = EventRollup.__table__
+    end = last_day + _ONE_DAY
+
+    rows = db.execute(
+        _source_query(event_type).where(
+            events.c.time_start >= first_day, events.c.time_start < end
+        )
+    )
+    values = _aggregate(event_type, rows)
+
+    db.execute(
+        delete(rollups).where(
+            rollups.c.event_type == event_type,
+            rollups.c.bucket_start >= first_day,
+            rollups.c.bucket_start < end,
+        )
+    )
+
+    if values:
+        db.execute(insert(rollups), values)
+
+
+def _consecutive_runs(
+    days: Iterable[datetime.datetime],
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Group days into (first, last) runs of consecutive days."""
+    runs: list[tuple[datetime.datetime, datetime.datetime]] = []
+
+    for day in sorted(days):
+        if runs and day - runs[-1][1] <= _ONE_DAY:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+
+    return runs
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_changed_rollups(session: Session) -> None:
+    """Recompute the rollups of the days marked on `session` before it commits."""
+    changed: Optional[set] = session.info.pop(CHANGED_DAYS_KEY, None)
+
+    if not changed:
+        return
+
+    # `before_commit` runs before the commit flushes; the recomputation must see
+    # events that were only added to the session.
+    session.flush()
+
+    for event_type in _SUBCLASS_MODELS:
+        days = [day for changed_type, day in changed if changed_type == event_type]
+
+        for first_day, last_day in _consecutive_runs(days):
+            _refresh_days(session, event_type, first_day, last_day)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_rollups(session: Session) -> None:
+    """Drop the marks of a rolled back transaction; its changes are gone."""
+    session.info.pop(CHANGED_DAYS_KEY, None)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute all rollups from the raw events. The caller commits.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    db.execute(delete(EventRollup.__table__))
+
+    written = 0
+    for event_type in _SUBCLASS_MODELS:
+        values = _aggregate(event_type, db.execute(_source_query(event_type)))
+
+        if values:
+            db.execute(insert(EventRollup.__table__), values)
+        written += len(values)
+
+    return written
+
+
+def main() -> None:
+    """Rebuild the rollups of the configured database, or in household mode of
+    every household database."""
+    from persistence.households import household_mode, list_households, session_factory
+
+    households = list_households() if household_mode() else [None]
+
+    for household in households:
+        SessionLocal = session_factory(household)
+
+        with SessionLocal() as db:
+            written = rebuild(db)
+            db.commit()
+
+        log.info("Rebuilt event rollups", rows=written, household=household)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,27 @@
 """Router for statistics."""
 
-from typing import Optional
+from typing import Optional, Sequence
 from fastapi import APIRouter, Depends, Query
-from pydantic import AwareDatetime
 from sqlalchemy.orm import Session
+from common.routing import TrustedResponseRoute
+from pydantic import AwareDatetime
 import structlog
 from stats.service import StatsService
+from events.schemas import EventType
 from stats import schemas
-from persistence.dependencies import get_db
+from persistence.dependencies import get_db_read_only
+from stats.feed.router import router as feed_router
+from stats.diaper.router import router as diaper_router
+from stats.pump.router import router as pump_router
 
-router = APIRouter()
+router = APIRouter(route_class=TrustedResponseRoute)
 
 log = structlog.get_logger()
 
+router.include_router(feed_router, prefix="/feed", tags=["feed"])
+router.include_router(diaper_router, prefix="/diaper", tags=["diaper"])
+router.include_router(pump_router, prefix="/pump", tags=["pump"])
+
 
 @router.get("/feeds", response_model=list[schemas.BottleFeedStatistic])
 def get_feed_statistic(
@@ -23,8 +32,77 @@ def get_feed_statistic(
     end_date: Optional[AwareDatetime] = Query(
         None, description="End date in ISO 8601 format (YYYY-MM-DD)"
     ),
-    db: Session = Depends(get_db),
+    max_points: Optional[int] = Query(
+        None,
+        ge=3,
+        le=10_000,
+        description="Downsample the series to at most this many feeds, keeping its "
+        "peaks and dips; the full series when omitted",
+    ),
+    db: Session = Depends(get_db_read_only),
 ):
     """Retrieve a feed statistic by its ID."""
     service = StatsService(db=db)
-    return service.get_feed_statistic(start_date=start_date, end_date=end_date)
+    return service.get_feed_statistic(
+        start_date=start_date, end_date=end_date, max_points=max_points
+    )
+
+
+def _get_rollups(
+    granularity: schemas.RollupGranularity,
+    start_date: Optional[AwareDatetime],
+    end_date: Optional[AwareDatetime],
+    event_type: Optional[EventType],
+    db: Session,
+) -> Sequence[schemas.EventRollup]:
+    service = StatsService(db=db)
+    return service.get_rollups(
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+        event_type=event_type,
+    )
+
+
+@router.get("/daily", response_model=list[schemas.EventRollup])
+def get_daily_rollups(
+    start_date: Optional[AwareDatetime] = Query(
+        None, description="Only days starting at or after this time"
+    ),
+    end_date: Optional[AwareDatetime] = Query(
+        None, description="Only days starting at or before this time"
+    ),
+    event_type: Optional[EventType] = Query(
+        None, description="Only this event type; all types when omitted"
+    ),
+    db: Session = Depends(get_db_read_only),
+):
+    """Per-day event counts and totals, read from the rollup table.
+
+    Days are those of the stored event times, which the API returns as UTC.
+    """
+    return _get_rollups(
+        schemas.RollupGranularity.DAY, start_date, end_date, event_type, db
+    )
+
+
+@router.get("/hourly", response_model=list[schemas.EventRollup])
+def get_hourly_rollups(
+    start_date: Optional[AwareDatetime] = Query(
+        None, description="Only hours starting at or after this time"
+    ),
+    end_date: Optional[AwareDatetime] = Query(
+        None, description="Only hours starting at or before this time"
+    ),
+    event_type: Optional[EventType] = Query(
+        None, description="Only this event type; all types when omitted"
+    ),
+    db: Session = Depends(get_db_read_only),
+):
+    """Per-hour event counts and totals, read from the rollup table.
+
+    Hours are those of the stored event times, which the API returns as UTC.
+    """
+    return _get_rollups(
+        schemas.RollupGranularity.HOUR, start_date, end_date, event_type, db
+    )
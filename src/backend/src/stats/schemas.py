@@ -1,7 +1,55 @@
+from enum import Enum
+
 from pydantic import AwareDatetime, BaseModel
 
+from events.schemas import EventType
+
 
 class BottleFeedStatistic(BaseModel):
     time: AwareDatetime
     amount_ml: float
     time_since_last_feed_minutes: float
+
+
+class RollupGranularity(str, Enum):
+    """Size of the time buckets of the event rollups."""
+
+    HOUR = "hour"
+    DAY = "day"
+
+
+class EventRollup(BaseModel):
+    """Aggregates of the events of one type within one hour or day of their stored
+    times."""
+
+    bucket_start: AwareDatetime
+    event_type: EventType
+    event_count: int
+    # Bottle feeds and pump sessions: total millilitres.
+    amount_ml: float
+    # Bottle feeds only: `amount_ml` split by contents.
+    formula_ml: float
+    breast_milk_ml: float
+    # Diaper changes only: count per `DiaperType`.
+    pee_count: int
+    poop_count: int
+    both_count: int
+
+
+class HistogramBin(BaseModel):
+    """Number of values in [lower, upper); a missing bound is unbounded."""
+
+    lower: float | None
+    upper: float | None
+    count: int
+
+
+class Distribution(BaseModel):
+    """Summary of a set of values, e.g. the minutes between events."""
+
+    count: int
+    mean: float | None = None
+    p10: float | None = None
+    median: float | None = None
+    p90: float | None = None
+    histogram: list[HistogramBin]
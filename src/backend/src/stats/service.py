@@ -1,10 +1,12 @@
 import datetime
-from typing import Sequence
+from typing import Optional, Sequence
 
 from pydantic import AwareDatetime
 from common.service import CommonService
 from sqlalchemy.orm import Session
+from stats.downsampling import largest_triangle_three_buckets
 from stats.persistence import StatsPersistence
+from events.schemas import EventType
 from stats import schemas
 
 
@@ -22,30 +24,81 @@ class StatsService(CommonService):
         self._persistence = StatsPersistence(db=db)
 
     def get_feed_statistic(
-        self, start_date: AwareDatetime | None, end_date: AwareDatetime | None
+        self,
+        start_date: AwareDatetime | None,
+        end_date: AwareDatetime | None,
+        max_points: Optional[int] = None,
     ) -> Sequence[schemas.BottleFeedStatistic]:
-        """Get feed statistics."""
+        """Get feed statistics.
+
+        Args:
+            max_points: If set, the series is downsampled to at most this many feeds
+                with LTTB, keeping the peaks and dips of the amounts. The intervals
+                are computed before downsampling, so they stay the real time since
+                the previous feed.
+        """
         self._log.debug(
-            "Getting feed statistic", start_date=start_date, end_date=end_date
+            "Getting feed statistic",
+            start_date=start_date,
+            end_date=end_date,
+            max_points=max_points,
         )
 
-        events = self._persistence.get_bottle_feed_events(
+        rows = self._persistence.get_bottle_feed_intervals(
             start_date=start_date, end_date=end_date
         )
 
-        stats: list[schemas.BottleFeedStatistic] = []
-        for i, event in enumerate(events):
-            time_since_last = (
-                (event.time_start - events[i - 1].time_start).total_seconds() / 60
-                if i > 0
-                else 0
+        if max_points is not None and len(rows) > max_points:
+            rows = largest_triangle_three_buckets(
+                rows,
+                max_points,
+                x=lambda row: row.time_start.replace(tzinfo=datetime.UTC).timestamp(),
+                y=lambda row: row.amount_ml,
             )
-            stats.append(
-                schemas.BottleFeedStatistic(
-                    time=event.time_start.replace(tzinfo=datetime.UTC),
-                    amount_ml=event.amount_ml,
-                    time_since_last_feed_minutes=time_since_last,
-                )
+
+        return [
+            schemas.BottleFeedStatistic(
+                time=time_start.replace(tzinfo=datetime.UTC),
+                amount_ml=amount_ml,
+                time_since_last_feed_minutes=minutes_since_previous or 0,
             )
+            for time_start, amount_ml, minutes_since_previous in rows
+        ]
+
+    def get_rollups(
+        self,
+        granularity: schemas.RollupGranularity,
+        start_date: AwareDatetime | None,
+        end_date: AwareDatetime | None,
+        event_type: EventType | None = None,
+    ) -> Sequence[schemas.EventRollup]:
+        """Get per-hour or per-day event aggregates from the rollup table."""
+        self._log.debug(
+            "Getting event rollups",
+            granularity=granularity,
+            start_date=start_date,
+            end_date=end_date,
+            event_type=event_type,
+        )
 
-        return stats
+        rows = self._persistence.get_rollups(
+            granularity=granularity,
+            start_date=start_date,
+            end_date=end_date,
+            event_type=event_type,
+        )
+
+        return [
+            schemas.EventRollup(
+                bucket_start=row.bucket_start.replace(tzinfo=datetime.UTC),
+                event_type=row.event_type,
+                event_count=row.event_count,
+                amount_ml=row.amount_ml,
+                formula_ml=row.formula_ml,
+                breast_milk_ml=row.breast_milk_ml,
+                pee_count=row.pee_count,
+                poop_count=row.poop_count,
+                both_count=row.both_count,
+            )
+            for row in rows
+        ]
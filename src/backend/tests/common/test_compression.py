@@ -0,0 +1,73 @@
+import gzip
+from typing import Callable
+
+import brotli
+import pytest
+from fastapi.testclient import TestClient
+
+from common.compression import negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("deflate", None),
+        ("gzip", "gzip"),
+        ("br", "br"),
+        # Brotli wins a tie, since it compresses better.
+        ("gzip, deflate, br", "br"),
+        ("GZIP", "gzip"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("gzip; Q=0.2, br ; q=0.1", "gzip"),
+    ],
+)
+def test_picks_the_preferred_supported_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_zero_quality_refuses_an_encoding():
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0") is None
+
+
+def test_wildcard_covers_the_encodings_not_listed():
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("br;q=0, *") == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, *;q=0.8") == "br"
+    assert negotiate_encoding("*;q=0") is None
+
+
+def test_invalid_quality_refuses_an_encoding():
+    assert negotiate_encoding("br;q=high, gzip;q=0.1") == "gzip"
+
+
+def _raw_export(client: TestClient, accept_encoding: str) -> tuple[str, bytes]:
+    """Content-Encoding and undecoded body of a streamed export."""
+    with client.stream(
+        "GET", "/events/export", headers={"Accept-Encoding": accept_encoding}
+    ) as response:
+        assert response.status_code == 200
+        return response.headers.get("content-encoding", ""), b"".join(
+            response.iter_raw()
+        )
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)]
+)
+def test_streamed_export_decompresses_to_the_identity_body(
+    client: TestClient,
+    create_events: Callable[[int], list[str]],
+    encoding: str,
+    decompress: Callable[[bytes], bytes],
+):
+    create_events(200)
+    _, identity = _raw_export(client, "identity")
+
+    content_encoding, compressed = _raw_export(client, encoding)
+
+    assert content_encoding == encoding
+    assert len(compressed) < len(identity)
+    assert decompress(compressed) == identity
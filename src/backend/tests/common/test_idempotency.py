@@ -0,0 +1,64 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from common.idempotency import IDEMPOTENCY_KEY_HEADER, REPLAYED_HEADER
+from persistence.database import db_config
+from persistence.idempotency import idempotency_store
+
+PUMP = {"time_start": "2024-01-01T08:00:00Z", "amount_ml": 90}
+
+
+def _key() -> str:
+    # Stored responses outlive the tables, in the store's memory.
+    return str(uuid.uuid4())
+
+
+def test_retry_replays_the_first_response(client: TestClient):
+    headers = {IDEMPOTENCY_KEY_HEADER: _key()}
+
+    first = client.post("/events/pump/batch", json=[PUMP], headers=headers)
+    retry = client.post("/events/pump/batch", json=[PUMP], headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert REPLAYED_HEADER not in first.headers
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert retry.json() == first.json()
+    assert client.get("/events/").json()["total"] == 1
+
+
+def test_key_reused_for_a_different_body_is_rejected(client: TestClient):
+    headers = {IDEMPOTENCY_KEY_HEADER: _key()}
+    client.post("/events/pump/batch", json=[PUMP], headers=headers)
+
+    response = client.post(
+        "/events/pump/batch", json=[{**PUMP, "amount_ml": 60}], headers=headers
+    )
+
+    assert response.status_code == 422
+    assert client.get("/events/").json()["total"] == 1
+
+
+def test_retry_while_the_first_request_runs_is_a_conflict(client: TestClient):
+    key = _key()
+    assert db_config.engine is not None
+    assert idempotency_store.reserve(db_config.engine, key)
+
+    response = client.post(
+        "/events/pump/batch", json=[PUMP], headers={IDEMPOTENCY_KEY_HEADER: key}
+    )
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/events/").json()["total"] == 0
+
+
+def test_invalid_key_is_rejected(client: TestClient):
+    for key in ("", "k" * 256):
+        response = client.post(
+            "/events/pump/batch", json=[PUMP], headers={IDEMPOTENCY_KEY_HEADER: key}
+        )
+
+        assert response.status_code == 400
+
+    assert client.get("/events/").json()["total"] == 0
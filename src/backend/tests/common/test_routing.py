@@ -0,0 +1,32 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Field
+
+from common.routing import TrustedResponseRoute
+
+
+class Aliased(BaseModel):
+    amount_ml: int = Field(alias="amountMl")
+
+
+def _client() -> TestClient:
+    router = APIRouter(route_class=TrustedResponseRoute)
+
+    @router.get("/aliased", response_model=Aliased)
+    def aliased():
+        return Aliased(amountMl=1)
+
+    @router.get("/by-name", response_model=Aliased, response_model_by_alias=False)
+    def by_name():
+        return Aliased(amountMl=1)
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_fields_are_encoded_by_alias_as_fastapi_does():
+    client = _client()
+
+    assert client.get("/aliased").json() == {"amountMl": 1}
+    assert client.get("/by-name").json() == {"amount_ml": 1}
@@ -0,0 +1,143 @@
+"""Shared fixtures of the backend tests.
+
+The application modules read `config` when they are imported, so the tests point it
+at a scratch SQLite file, and make `src/` importable, before anything from `src/` is
+imported. Every test starts from empty tables.
+
+Run from `src/backend`:
+
+```sh
+python -m pytest -q
+```
+"""
+
+import datetime
+import os
+import sys
+import tempfile
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+os.environ["DATABASE_URL"] = (
+    f"sqlite:///{tempfile.mkdtemp(prefix='open-baby-test-')}/test.db"
+)
+os.environ.pop("HOUSEHOLD_DATABASE_URL", None)
+sys.path.insert(0, str(SRC_DIR))
+
+from sqlalchemy import Engine, event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from ulid import ULID  # noqa: E402
+
+from events.diaper.models import DiaperEvent  # noqa: E402
+from events.diaper.schemas import DiaperType  # noqa: E402
+from events.feed.models import FeedBottleEvent, FeedBreastEvent  # noqa: E402
+from events.models import Event, EventChangeLog  # noqa: E402, F401
+from events.pump.models import PumpEvent  # noqa: E402
+from persistence.count_cache import event_count_cache  # noqa: E402
+from persistence.database import Base, SessionLocal, db_config  # noqa: E402
+from persistence.idempotency import IdempotencyRecord  # noqa: E402, F401
+from stats.models import EventRollup  # noqa: E402, F401
+
+# One event of each type: its model and the columns of its subclass table.
+EVENT_ROWS: list[tuple[type[Event], dict[str, Any]]] = [
+    (
+        FeedBottleEvent,
+        {"description": "Bottle feeding event", "amount_ml": 120, "is_formula": True},
+    ),
+    (FeedBreastEvent, {"description": "Breastfeeding event", "side": "left"}),
+    (
+        DiaperEvent,
+        {"description": "Diaper change event", "diaper_type": DiaperType.PEE},
+    ),
+    (PumpEvent, {"description": "Pump event", "amount_ml": 80.5}),
+]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema() -> None:
+    Base.metadata.create_all(db_config.engine)
+
+
+@pytest.fixture(autouse=True)
+def empty_tables() -> Iterator[None]:
+    yield
+
+    with db_config.engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+    event_count_cache.invalidate()
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def count_statements() -> Callable[[Engine], AbstractContextManager[list[str]]]:
+    """Collect the SQL statements executed on an engine within a block."""
+
+    @contextmanager
+    def count(engine: Engine) -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return count
+
+
+@pytest.fixture
+def client() -> TestClient:
+    """A client of the application, without running its lifespan."""
+    from main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def create_events(db: Session) -> Callable[[int], list[str]]:
+    """Insert `count` events, cycling through the event types, an hour apart.
+
+    The rows are added straight to the session, so neither the change log nor the
+    rollups see them; tests of those write through the API.
+    """
+
+    def create(count: int) -> list[str]:
+        # Stored without an offset, as the persistence classes store UTC times.
+        start = datetime.datetime(2024, 1, 1)
+        events = []
+
+        for i in range(count):
+            model_class, columns = EVENT_ROWS[i % len(EVENT_ROWS)]
+            time_start = start + datetime.timedelta(hours=i)
+            events.append(
+                model_class(
+                    id=str(ULID()),
+                    time_start=time_start,
+                    time_end=time_start + datetime.timedelta(minutes=15),
+                    **columns,
+                )
+            )
+
+        db.add_all(events)
+        db.commit()
+
+        return [event.id for event in events]
+
+    return create
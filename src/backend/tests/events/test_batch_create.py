@@ -0,0 +1,66 @@
+from fastapi.testclient import TestClient
+
+from config import config
+
+
+def test_batch_items_need_no_id(client: TestClient):
+    response = client.post(
+        "/events/pump/batch",
+        json=[
+            {"time_start": "2024-01-01T08:00:00Z", "amount_ml": 90},
+            {"time_start": "2024-01-01T10:00:00Z", "amount_ml": 70},
+        ],
+    )
+
+    assert response.status_code == 200
+    created = response.json()["created"]
+    assert [event["amount_ml"] for event in created] == [90, 70]
+    assert all(event["id"] for event in created)
+
+
+def test_invalid_batch_item_rejects_the_batch(client: TestClient):
+    response = client.post(
+        "/events/pump/batch",
+        json=[
+            {"time_start": "2024-01-01T08:00:00Z", "amount_ml": 90},
+            {"time_start": "2024-01-01T09:00:00Z", "amount_ml": -1},
+        ],
+    )
+
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [
+        ["body", 1, "amount_ml"]
+    ]
+    assert client.get("/events/pump/").json() == []
+
+
+def test_batch_size_is_limited(client: TestClient):
+    event = {"time_start": "2024-01-01T08:00:00Z", "is_formula": True, "amount_ml": 1}
+
+    response = client.post(
+        "/events/feed/bottle/batch", json=[event] * (config.max_batch_size + 1)
+    )
+
+    assert response.status_code == 422
+
+
+def test_batch_item_ids_are_assigned_by_the_server(client: TestClient):
+    response = client.post(
+        "/events/diaper/batch",
+        json=[
+            {"id": "chosen", "time_start": "2024-01-01T08:00:00Z", "diaper_type": "pee"}
+        ],
+    )
+
+    [event] = response.json()["created"]
+    assert event["id"] != "chosen"
+    assert client.get(f"/events/diaper/{event['id']}").status_code == 200
+
+
+def test_batch_item_schema_is_documented(client: TestClient):
+    body = client.app.openapi()["paths"]["/events/feed/breast/batch"]["post"][
+        "requestBody"
+    ]["content"]["application/json"]["schema"]
+
+    assert body["items"] == {"$ref": "#/components/schemas/FeedBreastEventBatchItem"}
+    assert body["maxItems"] == config.max_batch_size
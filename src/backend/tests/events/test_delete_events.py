@@ -0,0 +1,60 @@
+from typing import Callable
+
+from fastapi.testclient import TestClient
+
+from persistence.database import db_config
+
+
+def test_bulk_delete_reports_missing_ids(
+    client: TestClient, create_events: Callable[[int], list[str]]
+):
+    event_ids = create_events(3)
+
+    response = client.delete(
+        "/events/", params={"ids": [event_ids[0], event_ids[2], "missing"]}
+    )
+
+    assert response.status_code == 200
+    assert sorted(response.json()["deleted"]) == sorted([event_ids[0], event_ids[2]])
+    assert response.json()["not_found"] == ["missing"]
+    assert [event["id"] for event in client.get("/events/").json()["events"]] == [
+        event_ids[1]
+    ]
+
+
+def test_typed_delete_only_deletes_its_type(
+    client: TestClient, create_events: Callable[[int], list[str]]
+):
+    # The first created event is a bottle feed.
+    [event_id] = create_events(1)
+
+    assert client.delete(f"/events/pump/{event_id}").status_code == 404
+    assert client.delete(f"/events/feed/bottle/{event_id}").status_code == 200
+    assert client.get(f"/events/feed/bottle/{event_id}").status_code == 404
+
+
+def test_deletes_without_delete_returning(
+    client: TestClient,
+    create_events: Callable[[int], list[str]],
+    count_statements,
+    monkeypatch,
+):
+    monkeypatch.setattr(db_config.engine.dialect, "delete_returning", False)
+    event_ids = create_events(4)
+
+    with count_statements(db_config.engine) as statements:
+        assert client.delete(f"/events/pump/{event_ids[0]}").status_code == 404
+        assert client.delete(f"/events/feed/bottle/{event_ids[0]}").status_code == 200
+        response = client.delete(
+            "/events/", params={"ids": [event_ids[1], event_ids[2], "missing"]}
+        )
+
+    assert sorted(response.json()["deleted"]) == sorted(event_ids[1:3])
+    assert response.json()["not_found"] == ["missing"]
+    assert [event["id"] for event in client.get("/events/").json()["events"]] == [
+        event_ids[3]
+    ]
+    assert [
+        change["action"] for change in client.get("/events/changes").json()["changes"]
+    ].count("deleted") == 3
+    assert not any("RETURNING" in s for s in statements if s.startswith("DELETE"))
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from typing import Callable
+
+from fastapi.testclient import TestClient
+
+# `create_events` starts at this time and cycles bottle feed, breast feed, diaper
+# change and pump, an hour apart.
+START = "2024-01-01T00:00:00Z"
+
+
+def _export(client: TestClient, **params) -> str:
+    response = client.get("/events/export", params=params)
+    assert response.status_code == 200
+    return response.text
+
+
+def test_ndjson_export_filters_by_type_and_time(
+    client: TestClient, create_events: Callable[[int], list[str]]
+):
+    event_ids = create_events(8)
+
+    lines = _export(
+        client,
+        event_type=["pump", "feed_bottle"],
+        start_time="2024-01-01T01:00:00Z",
+        end_time="2024-01-01T05:00:00Z",
+    ).splitlines()
+
+    pump, bottle = (json.loads(line) for line in lines)
+    assert [pump["id"], bottle["id"]] == event_ids[3:5]
+    assert pump["name"] == "pump"
+    assert pump["amount_ml"] == 80.5
+    assert "is_formula" not in pump
+    assert bottle["time_start"] == "2024-01-01T04:00:00Z"
+    assert (bottle["amount_ml"], bottle["is_formula"]) == (120, True)
+
+
+def test_csv_export_shares_columns_between_types(
+    client: TestClient, create_events: Callable[[int], list[str]]
+):
+    event_ids = create_events(4)
+
+    rows = list(csv.DictReader(io.StringIO(_export(client, format="csv"))))
+
+    assert [row["id"] for row in rows] == event_ids
+    assert rows[0]["time_start"] == START
+    assert [row["amount_ml"] for row in rows] == ["120", "", "", "80.5"]
+    assert [row["is_formula"] for row in rows] == ["true", "", "", ""]
+    assert [row["side"] for row in rows] == ["", "left", "", ""]
+    assert [row["diaper_type"] for row in rows] == ["", "", "pee", ""]
+
+
+def test_csv_export_of_nothing_is_only_the_header(
+    client: TestClient, create_events: Callable[[int], list[str]]
+):
+    create_events(4)
+
+    body = _export(client, format="csv", start_time="2025-01-01T00:00:00Z")
+
+    [header] = list(csv.reader(io.StringIO(body)))
+    assert header[:4] == ["id", "name", "description", "time_start"]
+    assert header.count("amount_ml") == 1
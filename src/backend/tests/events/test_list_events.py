@@ -0,0 +1,47 @@
+import pytest
+
+from events.service import EventService
+from persistence.count_cache import event_count_cache
+from persistence.database import SessionLocal, db_config
+
+
+@pytest.mark.parametrize("include_total", [False, True])
+def test_list_events_query_count_does_not_grow_with_limit(
+    create_events, count_statements, include_total
+):
+    create_events(16)
+    counts = []
+
+    for limit in (1, 4, 16):
+        event_count_cache.invalidate()
+        # A fresh session, so that no subclass row is already in its identity map.
+        with SessionLocal() as session, count_statements(db_config.engine) as sql:
+            response = EventService(db=session).list_events(
+                limit=limit, include_total=include_total
+            )
+
+        assert len(response.events) == limit
+        counts.append(len(sql))
+
+    # The page SELECT, plus the count when the total is asked for.
+    assert counts == [2 if include_total else 1] * len(counts)
+
+
+def test_list_events_loads_every_event_type(create_events):
+    create_events(8)
+
+    with SessionLocal() as session:
+        events = EventService(db=session).list_events(limit=8).events
+
+    assert {event.name for event in events} == {
+        "feed_bottle",
+        "feed_breast",
+        "diaper_change",
+        "pump",
+    }
+    # Subclass columns are read from the page SELECT, not loaded lazily.
+    assert all(
+        event.metadata and event.metadata["amount_ml"] == 80.5
+        for event in events
+        if event.name == "pump"
+    )
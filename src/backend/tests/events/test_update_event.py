@@ -0,0 +1,63 @@
+import datetime
+from typing import Callable
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from stats.models import EventRollup
+from stats.schemas import RollupGranularity
+
+
+def _body(**fields) -> dict:
+    return {
+        "id": "ignored",
+        "name": "feed_bottle",
+        "description": "Bottle feeding event",
+        "time_start": "2024-01-03T10:00:00Z",
+        "notes": "moved",
+        **fields,
+    }
+
+
+def _rollup_days(db: Session) -> dict[datetime.datetime, int]:
+    rows = db.execute(
+        select(EventRollup.bucket_start, EventRollup.event_count).where(
+            EventRollup.granularity == RollupGranularity.DAY
+        )
+    )
+    return {bucket_start: count for bucket_start, count in rows}
+
+
+def test_update_moves_event_and_its_rollups(client: TestClient, db: Session):
+    event_id = client.post(
+        "/events/feed/bottle",
+        json=_body(time_start="2024-01-01T08:00:00Z", amount_ml=120, is_formula=True),
+    ).json()["id"]
+    assert _rollup_days(db) == {datetime.datetime(2024, 1, 1): 1}
+
+    response = client.put(f"/events/{event_id}", json=_body())
+
+    assert response.status_code == 200
+    assert response.json()["id"] == event_id
+    assert response.json()["notes"] == "moved"
+
+    stored = client.get(f"/events/feed/bottle/{event_id}").json()
+    assert stored["notes"] == "moved"
+    assert stored["amount_ml"] == 120
+    assert _rollup_days(db) == {datetime.datetime(2024, 1, 3): 1}
+
+
+def test_update_of_another_type_is_not_found(
+    client: TestClient, create_events: Callable[[int], list[str]]
+):
+    [event_id] = create_events(1)
+
+    response = client.put(f"/events/{event_id}", json=_body(name="pump"))
+
+    assert response.status_code == 404
+    assert client.get(f"/events/feed/bottle/{event_id}").json()["notes"] is None
+
+
+def test_update_of_missing_event_is_not_found(client: TestClient):
+    assert client.put("/events/missing", json=_body()).status_code == 404
@@ -0,0 +1,131 @@
+import datetime
+from typing import Callable
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from persistence.database import db_config
+from stats.models import EventRollup
+from stats.schemas import RollupGranularity
+
+JAN_1 = datetime.datetime(2024, 1, 1)
+JAN_3 = datetime.datetime(2024, 1, 3)
+
+
+def _pump_days(db: Session) -> dict[datetime.datetime, float]:
+    rows = db.execute(
+        select(EventRollup.bucket_start, EventRollup.amount_ml).where(
+            EventRollup.granularity == RollupGranularity.DAY
+        )
+    )
+    return {bucket_start: amount_ml for bucket_start, amount_ml in rows}
+
+
+def _pump_event(client: TestClient) -> str:
+    response = client.post(
+        "/events/pump/",
+        json={"id": "", "time_start": "2024-01-01T08:00:00Z", "amount_ml": 50},
+    )
+    return response.json()["id"]
+
+
+def test_put_moves_rollups_without_reading_the_event_first(
+    client: TestClient, db: Session, count_statements
+):
+    event_id = _pump_event(client)
+
+    with count_statements(db_config.engine) as statements:
+        response = client.put(
+            f"/events/pump/{event_id}",
+            json={
+                "id": event_id,
+                "time_start": "2024-01-03T08:00:00Z",
+                "amount_ml": 70,
+            },
+        )
+
+    assert response.status_code == 200
+    assert _pump_days(db) == {JAN_3: 70}
+    first_update = next(i for i, s in enumerate(statements) if s.startswith("UPDATE"))
+    assert not any(s.startswith("SELECT") for s in statements[:first_update])
+
+
+def test_put_of_missing_event_is_not_found(client: TestClient):
+    response = client.put(
+        "/events/pump/missing",
+        json={"id": "", "time_start": "2024-01-03T08:00:00Z", "amount_ml": 70},
+    )
+
+    assert response.status_code == 404
+
+
+def test_patch_of_time_only_moves_rollups(client: TestClient, db: Session):
+    event_id = _pump_event(client)
+
+    response = client.patch(
+        f"/events/pump/{event_id}", json={"time_start": "2024-01-03T09:00:00Z"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["amount_ml"] == 50
+    assert _pump_days(db) == {JAN_3: 50}
+
+
+def test_patch_of_time_and_amount_moves_rollups(client: TestClient, db: Session):
+    event_id = _pump_event(client)
+
+    response = client.patch(
+        f"/events/pump/{event_id}",
+        json={"time_start": "2024-01-03T09:00:00Z", "amount_ml": 65},
+    )
+
+    assert response.json()["amount_ml"] == 65
+    assert response.json()["time_start"] == "2024-01-03T09:00:00Z"
+    assert _pump_days(db) == {JAN_3: 65}
+
+
+def test_patch_of_amount_keeps_the_day(client: TestClient, db: Session):
+    event_id = _pump_event(client)
+
+    response = client.patch(f"/events/pump/{event_id}", json={"amount_ml": 65})
+
+    assert response.json()["time_start"] == "2024-01-01T08:00:00Z"
+    assert _pump_days(db) == {JAN_1: 65}
+
+
+def test_patch_of_another_type_is_not_found(
+    client: TestClient, create_events: Callable[[int], list[str]]
+):
+    # The first created event is a bottle feed.
+    [event_id] = create_events(1)
+
+    for patch in ({"notes": "x"}, {"amount_ml": 1}, {}):
+        response = client.patch(f"/events/pump/{event_id}", json=patch)
+        assert response.status_code == 404, patch
+
+
+def test_updates_without_update_returning(
+    client: TestClient, db: Session, count_statements, monkeypatch
+):
+    monkeypatch.setattr(db_config.engine.dialect, "update_returning", False)
+    event_id = _pump_event(client)
+
+    with count_statements(db_config.engine) as statements:
+        put = client.put(
+            f"/events/pump/{event_id}",
+            json={
+                "id": event_id,
+                "time_start": "2024-01-03T08:00:00Z",
+                "amount_ml": 70,
+            },
+        )
+        patch = client.patch(f"/events/pump/{event_id}", json={"amount_ml": 65})
+        missing = client.patch("/events/pump/missing", json={"amount_ml": 65})
+
+    assert put.json()["amount_ml"] == 70
+    assert patch.json()["amount_ml"] == 65
+    assert patch.json()["time_start"] == "2024-01-03T08:00:00Z"
+    assert missing.status_code == 404
+    assert _pump_days(db) == {JAN_3: 65}
+    assert not any("RETURNING" in s for s in statements if s.startswith("UPDATE"))
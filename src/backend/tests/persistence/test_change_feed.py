@@ -0,0 +1,50 @@
+import asyncio
+import datetime
+import sqlite3
+
+from events.schemas import ChangeAction, EventChange, EventType
+from persistence.change_feed import ChangeHub, watch_other_writers
+from persistence.database import db_config
+
+
+def _log_change_elsewhere(event_id: str) -> None:
+    """Log a change on a connection of its own, as another process would."""
+    assert db_config.engine is not None
+    connection = sqlite3.connect(db_config.engine.url.database)
+    with connection:
+        connection.execute(
+            "INSERT INTO event_changes (event_id, event_type, action, changed_at)"
+            " VALUES (?, ?, ?, ?)",
+            (
+                event_id,
+                EventType.PUMP.name,
+                ChangeAction.CREATED.name,
+                datetime.datetime(2024, 1, 1).isoformat(" "),
+            ),
+        )
+    connection.close()
+
+
+def test_publishes_changes_of_other_processes():
+    async def watch() -> EventChange:
+        assert db_config.engine is not None
+        hub = ChangeHub(queue_size=10)
+        subscription = hub.subscribe()
+        watcher = asyncio.create_task(
+            watch_other_writers(db_config.engine, interval=0.01, hub=hub)
+        )
+        try:
+            # Let the watcher take the current end of the log first.
+            await asyncio.sleep(0.2)
+            _log_change_elsewhere("01HZZZZZZZZZZZZZZZZZZZZZZZ")
+            return await asyncio.wait_for(subscription.get(), timeout=5)
+        finally:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+
+    change = asyncio.run(watch())
+
+    assert change.action == ChangeAction.CREATED
+    assert change.type == EventType.PUMP
+    assert change.id == "01HZZZZZZZZZZZZZZZZZZZZZZZ"
+    assert change.seq is not None
@@ -0,0 +1,45 @@
+import sqlite3
+from typing import Callable
+
+from fastapi.testclient import TestClient
+
+from persistence.count_cache import EventCountCache
+from persistence.database import db_config
+
+KEY = (None, 0, None, None)
+
+
+def test_cached_count_is_served_until_invalidated():
+    cache = EventCountCache(max_entries=8, ttl_seconds=60)
+
+    cache.set(KEY, 3, cache.generation)
+    assert cache.get(KEY) == 3
+
+    cache.invalidate()
+    assert cache.get(KEY) is None
+
+
+def test_count_overtaken_by_invalidation_is_dropped():
+    cache = EventCountCache(max_entries=8, ttl_seconds=60)
+
+    generation = cache.generation
+    # A write commits while the count is being taken.
+    cache.invalidate()
+    cache.set(KEY, 3, generation)
+
+    assert cache.get(KEY) is None
+
+
+def test_write_by_another_process_is_counted(
+    client: TestClient, create_events: Callable[[int], list[str]]
+):
+    event_ids = create_events(3)
+    assert client.get("/events/").json()["total"] == 3
+
+    assert db_config.engine is not None
+    connection = sqlite3.connect(db_config.engine.url.database)
+    with connection:
+        connection.execute("DELETE FROM events WHERE id = ?", (event_ids[0],))
+    connection.close()
+
+    assert client.get("/events/").json()["total"] == 2
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from config import config
+from persistence import change_feed
+from persistence.households import (
+    household_database_url,
+    is_valid_household,
+    list_households,
+)
+
+
+@pytest.fixture
+def household_mode(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Give every household a SQLite file in a scratch directory."""
+    monkeypatch.setattr(
+        config, "household_database_url", f"sqlite:///{tmp_path}/{{household}}.db"
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize("household", ["a", "home", "Home-2", "a_b", "x" * 64])
+def test_valid_household_ids(household: str):
+    assert is_valid_household(household)
+
+
+@pytest.mark.parametrize(
+    "household",
+    ["", "-home", "_home", "home.db", "../home", "a/b", "a b", "x" * 65, "höme"],
+)
+def test_invalid_household_ids(household: str):
+    assert not is_valid_household(household)
+
+
+def test_household_urls_need_household_mode():
+    with pytest.raises(RuntimeError):
+        household_database_url("home")
+
+
+def test_households_are_listed_by_their_files(household_mode: Path):
+    for name in ("b", "a", "-bad", "c.txt"):
+        (household_mode / f"{name}.db").touch()
+    (household_mode / "d.txt").touch()
+
+    assert list_households() == ["a", "b"]
+
+
+def test_requests_need_a_valid_household(household_mode: Path, client: TestClient):
+    assert client.get("/events/").status_code == 400
+
+    for household in ("../db", "-home", "home.db", "x" * 65):
+        response = client.get("/events/", headers={config.household_header: household})
+        assert response.status_code == 400
+
+    # Well-formed, but without a database.
+    response = client.get("/events/", headers={config.household_header: "home"})
+    assert response.status_code == 404
+
+
+def test_change_stream_of_a_household_without_database(
+    household_mode: Path, client: TestClient
+):
+    response = client.get("/events/stream", headers={config.household_header: "home"})
+
+    assert response.status_code == 404
+    assert "home" not in change_feed._household_hubs
@@ -0,0 +1,56 @@
+import math
+from array import array
+
+import pytest
+
+from stats import columns
+
+
+def test_distribution_of_no_values():
+    distribution = columns.distribution([], edges=(10, 20))
+
+    assert distribution.count == 0
+    assert distribution.median is None
+    assert distribution.histogram == []
+
+
+def test_distribution_percentiles_are_interpolated():
+    distribution = columns.distribution([40, 10, 30, 20, 50], edges=())
+
+    assert distribution.count == 5
+    assert distribution.mean == 30
+    assert distribution.median == 30
+    assert distribution.p10 == pytest.approx(14)
+    assert distribution.p90 == pytest.approx(46)
+
+
+def test_distribution_histogram_bins_include_their_lower_edge():
+    distribution = columns.distribution([5, 10, 15, 20, 20, 99], edges=(10, 20))
+
+    assert [(b.lower, b.upper, b.count) for b in distribution.histogram] == [
+        (None, 10, 1),
+        (10, 20, 2),
+        (20, None, 3),
+    ]
+
+
+def test_to_columns_turns_null_floats_into_nan():
+    times, durations = columns.to_columns([(1.0, 2.5), (2.0, None)], "dd")
+
+    assert list(times) == [1.0, 2.0]
+    assert durations[0] == 2.5
+    assert math.isnan(durations[1])
+    assert columns.is_known(durations) == [True, False]
+
+
+def test_daily_sums_fill_empty_days_and_accept_any_order():
+    days = array("q", [3, 1, 3, 1, 5])
+    values = array("d", [1.5, 2.0, 0.5, 1.0, 4.0])
+
+    assert list(columns.daily_sums(days, values, first_day=1, day_count=5)) == [
+        3.0,
+        0.0,
+        2.0,
+        0.0,
+        4.0,
+    ]
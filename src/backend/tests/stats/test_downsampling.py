@@ -0,0 +1,43 @@
+import pytest
+
+from stats.downsampling import largest_triangle_three_buckets
+
+
+def _downsample(points: list[tuple[float, float]], max_points: int):
+    return largest_triangle_three_buckets(
+        points, max_points, x=lambda p: p[0], y=lambda p: p[1]
+    )
+
+
+def test_short_series_is_returned_unchanged():
+    points = [(0, 1), (1, 5), (2, 3)]
+
+    assert _downsample(points, 3) == points
+
+
+def test_too_few_points_requested_is_rejected():
+    with pytest.raises(ValueError):
+        _downsample([(0, 0), (1, 1), (2, 2), (3, 3)], 2)
+
+
+def test_keeps_endpoints_and_order_and_the_requested_count():
+    points = [(float(i), float(i % 7)) for i in range(100)]
+
+    selected = _downsample(points, 10)
+
+    assert len(selected) == 10
+    assert selected[0] == points[0]
+    assert selected[-1] == points[-1]
+    assert selected == sorted(selected)
+    assert set(selected) <= set(points)
+
+
+def test_keeps_spikes():
+    points = [(float(i), 0.0) for i in range(30)]
+    points[7] = (7.0, 50.0)
+    points[21] = (21.0, -40.0)
+
+    selected = _downsample(points, 5)
+
+    assert (7.0, 50.0) in selected
+    assert (21.0, -40.0) in selected
@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+
+
+def test_feed_statistic_reports_minutes_since_the_previous_feed(client: TestClient):
+    times = ["2024-01-01T08:00:00Z", "2024-01-01T10:30:00Z", "2024-01-01T11:15:30Z"]
+    client.post(
+        "/events/feed/bottle/batch",
+        json=[
+            {"time_start": time, "amount_ml": 100 + i, "is_formula": True}
+            for i, time in enumerate(times)
+        ],
+    )
+
+    response = client.get("/stats/feeds")
+
+    assert response.status_code == 200
+    assert [
+        (feed["amount_ml"], feed["time_since_last_feed_minutes"])
+        for feed in response.json()
+    ] == [(100, 0), (101, 150), (102, 45.5)]